@@ -1,26 +1,132 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
+import hashlib
 import os
+import time
+from app.services import metrics
 
 # Database path from .env or default
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/database/dashboard.db')
 
+# Storage profile: 'development' (single engine) or 'production' (WAL, reader pool + single writer)
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'development')
+PRODUCTION = DATABASE_PROFILE == 'production'
+
+# Statement logging (defaults to on in development, off in production)
+SQL_ECHO = os.getenv('SQL_ECHO', '0' if PRODUCTION else '1') == '1'
+
+# Production tuning, all overridable from .env
+DATABASE_READERS = int(os.getenv('DATABASE_READERS', '4'))  # read-only pooled connections
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable enough under WAL
+WRITE_BEGIN_RETRIES = int(os.getenv('WRITE_BEGIN_RETRIES', '5'))
+
 # Ensure directory exists
 os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
 
-# Create engine
-engine = create_engine(
-    f'sqlite:///{DATABASE_PATH}',
-    echo=True,  # Set to False in production
-    connect_args={'check_same_thread': False}  # Needed for SQLite
-)
+def _set_pragmas(dbapi_connection, readonly):
+    """Apply the production PRAGMAs to a fresh SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    if not readonly:
+        cursor.execute('PRAGMA journal_mode=WAL')  # persistent, stored in the db file
+    else:
+        cursor.execute('PRAGMA query_only=ON')
+    cursor.execute(f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}')
+    cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+    cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+    cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+    cursor.close()
+
+def _is_busy(error):
+    message = str(error.orig).lower()
+    return 'locked' in message or 'busy' in message
+
+def _configure_production_engine(target, readonly):
+    """Install connect/begin hooks that apply PRAGMAs and control transaction start"""
+
+    @event.listens_for(target, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        # Take over BEGIN from pysqlite so we decide when and how locks are taken
+        dbapi_connection.isolation_level = None
+        _set_pragmas(dbapi_connection, readonly)
+
+    @event.listens_for(target, 'begin')
+    def on_begin(conn):
+        if readonly:
+            conn.exec_driver_sql('BEGIN')  # consistent snapshot across a request's reads
+            return
+
+        # Writers take the write lock up front; busy_timeout covers short waits and
+        # the retry loop with backoff covers long checkpoints or other processes
+        for attempt in range(WRITE_BEGIN_RETRIES + 1):
+            try:
+                conn.exec_driver_sql('BEGIN IMMEDIATE')
+                return
+            except OperationalError as e:
+                if attempt == WRITE_BEGIN_RETRIES or not _is_busy(e):
+                    raise
+                time.sleep(0.05 * (2 ** attempt))
+
+def _instrument_engine(target):
+    """Time every statement and report it to the request metrics"""
+
+    @event.listens_for(target, 'before_cursor_execute')
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(target, 'after_cursor_execute')
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.record_query(statement, parameters, executemany, time.perf_counter() - context._query_started)
+
+if PRODUCTION:
+    # Single serialized writer connection for mutations
+    engine = create_engine(
+        f'sqlite:///{DATABASE_PATH}',
+        echo=SQL_ECHO,
+        pool_size=1,
+        max_overflow=0,
+        connect_args={'check_same_thread': False}
+    )
+    _configure_production_engine(engine, readonly=False)
+
+    # Pool of read-only connections for GET handlers
+    read_engine = create_engine(
+        f'sqlite:///file:{DATABASE_PATH}?mode=ro&uri=true',
+        echo=SQL_ECHO,
+        pool_size=DATABASE_READERS,
+        max_overflow=0,
+        connect_args={'check_same_thread': False}
+    )
+    _configure_production_engine(read_engine, readonly=True)
+else:
+    # Create engine
+    engine = create_engine(
+        f'sqlite:///{DATABASE_PATH}',
+        echo=SQL_ECHO,
+        connect_args={'check_same_thread': False}  # Needed for SQLite
+    )
+    read_engine = engine
+
+# Per-request statement counts/timings for Server-Timing and /api/metrics (SQL_METRICS=0 to disable)
+if metrics.SQL_METRICS:
+    _instrument_engine(engine)
+    if read_engine is not engine:
+        _instrument_engine(read_engine)
 
 # Create session factory
 db_session = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=engine)
 )
 
+# Session for read-only GET handlers (read-only connections in production)
+read_session = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+)
+
 # Create declarative base
 Base = declarative_base()
 Base.query = db_session.query_property()
@@ -33,20 +139,77 @@ def init_db():
 
     import app.models.tasks
     import app.models.projects
+    import app.models.rollups
+    import app.models.versions
     # import app.models.education
     # import app.models.calendar
-    # import app.models.water
-    # import app.models.weight
-    # import app.models.exercise
-    # import app.models.sleep
-    # import app.models.nutrition
+    import app.models.health  # water, weight, exercise, sleep and nutrition time series
     # import app.models.medications
     # import app.models.health_events
-    # import app.models.music
+    import app.models.music  # YouTube playlist mirror
+
+    # The schema checks below cost a query per table; skip them when the
+    # database was last set up by this exact set of models
+    version = schema_version()
+    with engine.connect() as conn:
+        if conn.exec_driver_sql('PRAGMA user_version').scalar() == version:
+            return
 
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     print("Database tables created successfully!")
 
+    # Full-text indexes and their triggers (built from the tables on first run)
+    from app.services import search
+    with engine.begin() as conn:
+        search.ensure_built(conn)
+
+    # Seed the task rollups and project counters for databases that predate them
+    from app.services import project_counters, task_rollups
+    task_rollups.ensure_built(db_session)
+    project_counters.ensure_built(db_session)
+    db_session.remove()
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+
+def schema_version():
+    """Fingerprint of the models' tables, columns and indexes (and the search DDL), stamped into PRAGMA user_version
+
+    Any model change yields a new value, so the next startup runs the schema
+    checks again. It is kept to 28 bits because user_version is a signed 32-bit int.
+    """
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+        parts.append(table.name)
+        parts += [f'{column.name} {column.type.compile(dialect=engine.dialect)}' for column in table.columns]
+        parts += sorted(
+            f'index {index.name} {",".join(column.name for column in index.columns)} {index.unique}'
+            for index in table.indexes
+        )
+
+    from app.services import search
+    parts += search.statements()
+    return int(hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:7], 16)
+
+def add_missing_columns():
+    """Add columns (and their indexes) that models gained after their table was created
+
+    create_all() only creates missing tables; new nullable columns on existing
+    tables are added here with ALTER TABLE so older databases keep working.
+    """
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+            missing = [column for column in table.columns if column.name not in existing]
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+            if missing:
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
+
 def shutdown_session(exception=None):
-    """Clean up database session"""
+    """Clean up database sessions"""
     db_session.remove()
+    read_session.remove()
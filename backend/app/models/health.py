@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, Float, PrimaryKeyConstraint
+from app.database import Base
+
+# Rollup resolutions in seconds
+HOUR = 3600
+DAY = 86400
+WEEK = 604800
+
+class HealthMetric(Base):
+    """A health time series: water, weight, exercise, sleep, nutrition (or e.g. nutrition.protein)"""
+    __tablename__ = 'health_metrics'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+    unit = Column(String(20))  # glasses, kg, minutes, hours, kcal, ...
+
+    def to_dict(self):
+        """Convert metric to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'unit': self.unit
+        }
+
+class HealthSample(Base):
+    """One reading, clustered by (metric, ts) in a WITHOUT ROWID table: three numbers per row, no extra index
+
+    ts is the reading's local wall-clock time as seconds since 1970-01-01, so
+    day and week buckets follow the user's calendar.
+    """
+    __tablename__ = 'health_samples'
+
+    metric_id = Column(Integer, nullable=False)
+    ts = Column(Integer, nullable=False)
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('metric_id', 'ts'),
+        {'sqlite_with_rowid': False},
+    )
+
+class HealthRollup(Base):
+    """count/sum/min/max of a metric per hour, day or week (Monday) bucket, maintained on every write"""
+    __tablename__ = 'health_rollups'
+
+    metric_id = Column(Integer, nullable=False)
+    resolution = Column(Integer, nullable=False)  # HOUR, DAY or WEEK
+    bucket = Column(Integer, nullable=False)  # bucket start, same clock as HealthSample.ts
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('metric_id', 'resolution', 'bucket'),
+        {'sqlite_with_rowid': False},
+    )
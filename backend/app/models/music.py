@@ -0,0 +1,71 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, PrimaryKeyConstraint
+from app.database import Base
+
+class YoutubeAccount(Base):
+    """Sync state of one signed-in YouTube account's playlist mirror"""
+    __tablename__ = 'youtube_accounts'
+
+    key = Column(String(32), primary_key=True)  # youtube_clients.credentials_key()
+    playlists_etag = Column(String(100))  # etag of the playlists list at the last sync (single-page lists only)
+    synced_at = Column(DateTime)
+    last_error = Column(Text)
+    retry_at = Column(DateTime)  # no automatic sync before this (quota exhausted, offline)
+
+    def to_dict(self):
+        """Convert sync state to dictionary for JSON serialization"""
+        return {
+            'syncedAt': self.synced_at.isoformat() if self.synced_at else None,
+            'lastError': self.last_error,
+            'retryAt': self.retry_at.isoformat() if self.retry_at else None
+        }
+
+class Playlist(Base):
+    __tablename__ = 'playlists'
+
+    id = Column(String(64), primary_key=True)  # YouTube playlist ID
+    owner = Column(String(32), nullable=False, index=True)  # YoutubeAccount.key
+    position = Column(Integer)  # order in the owner's playlist list
+    title = Column(String(200))
+    description = Column(Text)
+    thumbnail_url = Column(String(500))
+    item_count = Column(Integer)
+    etag = Column(String(100))  # playlist resource etag at the last sync
+    items_etag = Column(String(100))  # etag of its first playlistItems page at the last sync
+    synced_at = Column(DateTime)  # when its tracks were last fetched
+
+    def to_dict(self):
+        """Convert playlist to the Music tab's playlist format"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description or '',
+            'thumbnailUrl': self.thumbnail_url or '',
+            'itemCount': self.item_count,
+            'youtubePlaylistId': self.id
+        }
+
+class Track(Base):
+    """A video that appears in at least one mirrored playlist"""
+    __tablename__ = 'tracks'
+
+    video_id = Column(String(32), primary_key=True)
+    title = Column(String(200))
+    description = Column(Text)
+    thumbnail = Column(String(500))
+    channel_title = Column(String(200))
+    duration = Column(String(20))  # ISO 8601, e.g. PT3M30S
+    view_count = Column(Integer)
+    details_at = Column(DateTime)  # when duration and view_count were fetched
+
+class PlaylistTrack(Base):
+    """Playlist membership, clustered by (playlist, position) so a playlist reads in order"""
+    __tablename__ = 'playlist_tracks'
+
+    playlist_id = Column(String(64), nullable=False)
+    position = Column(Integer, nullable=False)
+    video_id = Column(String(32), nullable=False, index=True)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('playlist_id', 'position'),
+        {'sqlite_with_rowid': False},
+    )
@@ -16,6 +16,9 @@ class Project(Base):
     is_main = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
+    version = Column(Integer, index=True)  # 'projects' change version of the last write
+    task_count = Column(Integer, default=0)  # maintained by app.services.project_counters
+    completed_count = Column(Integer, default=0)
 
     # Relationship to project tasks
     tasks = relationship('ProjectTask', back_populates='project', cascade='all, delete-orphan')
@@ -32,7 +35,9 @@ class Project(Base):
             'obsidian_link': self.obsidian_link,
             'is_main': self.is_main,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'task_count': self.task_count,
+            'completed_count': self.completed_count
         }
 
         if include_tasks:
@@ -48,6 +53,7 @@ class ProjectTask(Base):
     title = Column(String(200), nullable=False)
     completed = Column(Boolean, default=False)
     order = Column(Integer, default=0)
+    version = Column(Integer, index=True)  # 'projects' change version of the last write
 
     # Relationship to parent project
     project = relationship('Project', back_populates='tasks')
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Date
+from app.database import Base
+
+class TaskStatusCount(Base):
+    """Number of tasks per status, maintained on every task write"""
+    __tablename__ = 'task_status_counts'
+
+    status = Column(String(20), primary_key=True)  # '' stands for tasks without a status
+    count = Column(Integer, nullable=False, default=0)
+
+class TaskDailyCompletion(Base):
+    """Number of tasks completed per day (keyed by completed_at date)"""
+    __tablename__ = 'task_daily_completions'
+
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
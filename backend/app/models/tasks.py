@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, Index, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
@@ -15,6 +16,14 @@ class Task(Base):
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    version = Column(Integer, index=True)  # 'tasks' change version of the last write
+    series_id = Column(Integer)  # TaskSeries this occurrence was materialized from
+    occurrence_date = Column(Date)  # the series occurrence it stands for (date may be moved)
+
+    __table_args__ = (
+        Index('ix_tasks_series_occurrence', 'series_id', 'occurrence_date', unique=True),
+        Index('ix_tasks_occurrence_date', 'occurrence_date'),
+    )
 
     def to_dict(self):
         """Convert task to dictionary for JSON serialization"""
@@ -28,5 +37,58 @@ class Task(Base):
             'priority': self.priority,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'series_id': self.series_id,
+            'occurrence_date': self.occurrence_date.isoformat() if self.occurrence_date else None
         }
+
+class TaskSeries(Base):
+    """Recurrence rule for a Daily/Weekly/Monthly task, stored once per series
+
+    Occurrences are expanded on demand by app.services.recurrence; a Task row
+    is only written for an occurrence once it is completed or edited.
+    """
+    __tablename__ = 'task_series'
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
+    category = Column(String(50), nullable=False)  # Daily, Weekly, Monthly
+    interval = Column(Integer, default=1)  # every N days/weeks/months
+    weekdays = Column(Integer)  # Weekly: bit mask, bit 0 = Monday (default: start_date's weekday)
+    month_day = Column(Integer)  # Monthly: 1-31, or -1 = last day, -8 = 7 days before it (default: start_date's day)
+    start_date = Column(Date, nullable=False, index=True)
+    end_date = Column(Date, nullable=True)  # last possible occurrence, inclusive
+    time = Column(Time, nullable=True)
+    priority = Column(Integer, default=0)
+    notes = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, index=True)  # 'tasks' change version of the last write
+
+    skips = relationship('TaskSeriesSkip', back_populates='series', cascade='all, delete-orphan')
+
+    def to_dict(self):
+        """Convert series to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'category': self.category,
+            'interval': self.interval,
+            'weekdays': [day for day in range(7) if self.weekdays & (1 << day)] if self.weekdays else None,
+            'month_day': self.month_day,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'time': self.time.isoformat() if self.time else None,
+            'priority': self.priority,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'skipped_dates': sorted(skip.occurrence_date.isoformat() for skip in self.skips)
+        }
+
+class TaskSeriesSkip(Base):
+    """An occurrence removed from its series (its task was deleted), so expansion no longer generates it"""
+    __tablename__ = 'task_series_skips'
+
+    series_id = Column(Integer, ForeignKey('task_series.id'), primary_key=True)
+    occurrence_date = Column(Date, primary_key=True)
+
+    series = relationship('TaskSeries', back_populates='skips')
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class ChangeVersion(Base):
+    """Monotonically increasing change counter per table, bumped on every write"""
+    __tablename__ = 'change_versions'
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta sync clients can drop it from their mirror"""
+    __tablename__ = 'tombstones'
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # task, task_series, project, project_task
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, index=True)  # table version of the delete
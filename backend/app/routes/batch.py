@@ -0,0 +1,120 @@
+from flask import Blueprint, request, jsonify
+from app.database import db_session
+from app.services import mutations, project_queries
+
+# Create blueprint
+batch_bp = Blueprint('batch', __name__)
+
+# Upper bound on operations per batch request
+MAX_OPERATIONS = 500
+
+
+def resolve_ref(value, results):
+    """Resolve "$N" to the id created by operation N, so later operations can refer to it
+
+    Only earlier operations (0 <= N < the current index) can be referred to.
+    """
+    if isinstance(value, str) and value.startswith('$'):
+        index = value[1:]
+        if not index.isdigit() or int(index) >= len(results):
+            raise mutations.MutationError(f'Invalid reference {value}: must name an earlier operation')
+        try:
+            return results[int(index)]['result']['id']
+        except (KeyError, TypeError):
+            raise mutations.MutationError(f'Invalid reference {value}: operation {index} has no id')
+    return value
+
+
+def apply_operation(operation, results):
+    """Apply one operation without committing; returns (status, result)"""
+    if not isinstance(operation, dict):
+        raise mutations.MutationError('Each operation must be an object')
+    op = operation.get('op')
+    entity = operation.get('entity')
+    data = operation.get('data') or {}
+    if not isinstance(data, dict):
+        raise mutations.MutationError('data must be an object')
+    item_id = resolve_ref(operation.get('id'), results)
+    project_id = resolve_ref(operation.get('project_id'), results)
+
+    if entity == 'task':
+        if op == 'create':
+            return 201, mutations.create_task(db_session, data).to_dict()
+        if op == 'update':
+            return 200, mutations.update_task(db_session, item_id, data).to_dict()
+        if op == 'complete':
+            return 200, mutations.complete_task(db_session, item_id).to_dict()
+        if op == 'delete':
+            mutations.delete_task(db_session, item_id)
+            return 200, {'id': item_id, 'deleted': True}
+
+    elif entity == 'task_series':
+        if op == 'create':
+            return 201, mutations.create_series(db_session, data).to_dict()
+        if op == 'update':
+            return 200, mutations.update_series(db_session, item_id, data).to_dict()
+        if op == 'delete':
+            mutations.delete_series(db_session, item_id)
+            return 200, {'id': item_id, 'deleted': True}
+
+    elif entity == 'project':
+        if op == 'create':
+            project = mutations.create_project(db_session, data)
+            return 201, project_queries.fetch_project(db_session, project.id)
+        if op == 'update':
+            mutations.update_project(db_session, item_id, data)
+            db_session.flush()
+            return 200, project_queries.fetch_project(db_session, item_id)
+        if op == 'delete':
+            mutations.delete_project(db_session, item_id)
+            return 200, {'id': item_id, 'deleted': True}
+
+    elif entity == 'project_task':
+        if op == 'create':
+            return 201, mutations.create_project_task(db_session, project_id, data).to_dict()
+        if op == 'toggle':
+            return 200, mutations.toggle_project_task(db_session, project_id, item_id).to_dict()
+        if op == 'delete':
+            mutations.delete_project_task(db_session, project_id, item_id)
+            return 200, {'id': item_id, 'deleted': True}
+
+    else:
+        raise mutations.MutationError(f'Unknown entity: {entity}')
+
+    raise mutations.MutationError(f'Unsupported operation {op!r} for {entity}')
+
+
+@batch_bp.route('/api/batch', methods=['POST'])
+def apply_batch():
+    """Apply an ordered list of operations in a single transaction (all or nothing)
+
+    Body: {"operations": [{"op": "create|update|delete|toggle|complete",
+                           "entity": "task|task_series|project|project_task",
+                           "id": ..., "project_id": ..., "data": {...}}, ...]}
+    """
+    index = None
+    try:
+        body = request.get_json()
+        operations = body.get('operations') if isinstance(body, dict) else body
+
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations list is required'}), 400
+        if len(operations) > MAX_OPERATIONS:
+            return jsonify({'error': f'At most {MAX_OPERATIONS} operations per batch'}), 400
+
+        results = []
+        for index, operation in enumerate(operations):
+            status, result = apply_operation(operation, results)
+            results.append({'index': index, 'status': status, 'result': result})
+
+        # One commit (and one fsync) for the whole batch
+        db_session.commit()
+
+        return jsonify({'results': results}), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message, 'index': index}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e), 'index': index}), 500
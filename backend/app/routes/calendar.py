@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify
+from datetime import date
+from app.database import read_session
+from app.services import change_versions, task_calendar
+from app.services.serializers import json_response
+
+# Create blueprint
+calendar_bp = Blueprint('calendar', __name__)
+
+# Longest ?from=..&to= range served in one request
+MAX_RANGE_DAYS = 400
+
+@calendar_bp.route('/api/calendar', methods=['GET'])
+@change_versions.conditional('tasks')
+def get_calendar():
+    """Get tasks between ?from= and ?to= (inclusive) grouped per day with per-day counts
+
+    ?recurring=1 also includes occurrences of recurring task series.
+    """
+    try:
+        try:
+            start = date.fromisoformat(request.args.get('from', ''))
+            end = date.fromisoformat(request.args.get('to', ''))
+        except ValueError:
+            return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+        if end < start or (end - start).days >= MAX_RANGE_DAYS:
+            return jsonify({'error': f'to must be on or after from, at most {MAX_RANGE_DAYS} days apart'}), 400
+
+        recurring = request.args.get('recurring') == '1'
+        return json_response(task_calendar.tasks_by_day(read_session, start, end, recurring))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from app.services import events
+
+# Create blueprint
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/api/events', methods=['GET'])
+def get_events():
+    """Server-Sent Events feed of task/project changes: {entity, id, op, version}
+
+    Streams from this worker thread; EventSource clients should open the URL
+    advertised by /api/events/stream instead.
+    """
+    response = Response(stream_with_context(events.stream_threaded()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@events_bp.route('/api/events/stream', methods=['GET'])
+def get_event_stream_url():
+    """Where to open the change feed: the SSE server on EVENTS_PORT, or /api/events when it is off
+
+    The SSE server answers CORS for the app's origins itself, so the client
+    connects to it directly rather than being redirected there.
+    """
+    server = events.ensure_server()
+    if server:
+        host = request.host.rsplit(':', 1)[0]
+        return jsonify({'url': f'{request.scheme}://{host}:{server.port}/api/events', 'direct': True}), 200
+    return jsonify({'url': f'{request.host_url}api/events', 'direct': False}), 200
+
+@events_bp.route('/api/events/stats', methods=['GET'])
+def get_event_stats():
+    """Subscriber and publish counters for the change feed"""
+    return jsonify(events.broker.stats()), 200
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+import re
+from app.database import db_session, read_session
+from app.models.health import DAY
+from app.services import change_versions, health_series
+from app.services.mutations import MutationError
+from app.services.serializers import json_response
+
+# Create blueprint
+health_bp = Blueprint('health', __name__)
+
+# Upper bound on readings per append request
+MAX_SAMPLES = 100000
+
+# A ?to= without a time of day (unlike an ISO datetime or epoch seconds)
+DATE_ONLY = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+def parse_range():
+    """(start, end) timestamps from ?from=&to=; a date-only ?to= includes that whole day"""
+    start, end = request.args.get('from'), request.args.get('to')
+    if not start or not end:
+        raise MutationError('from and to are required')
+    start_ts, end_ts = (int(ts) for ts in health_series.to_timestamps([start, end]))
+    if DATE_ONLY.fullmatch(end):
+        end_ts += DAY
+    return start_ts, end_ts
+
+@health_bp.route('/api/health/metrics', methods=['GET'])
+@change_versions.conditional('health')
+def get_metrics():
+    """Get all health metrics with their sample counts and first/last readings"""
+    try:
+        return jsonify(health_series.list_metrics(read_session)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@health_bp.route('/api/health/metrics', methods=['POST'])
+def save_metric():
+    """Create a metric or set its unit: {"name": "weight", "unit": "kg"}"""
+    try:
+        metric = health_series.save_metric(db_session, request.get_json() or {})
+        db_session.commit()
+
+        return jsonify(metric.to_dict()), 201
+
+    except MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@health_bp.route('/api/health/samples', methods=['POST'])
+def append_samples():
+    """Bulk append readings in one transaction
+
+    Body: {"samples": [{"metric": "water", "timestamp": "2025-01-05T08:30:00", "value": 1}, ...]}
+    Timestamps are local wall-clock ISO strings or epoch seconds; unknown metrics are created.
+    """
+    try:
+        body = request.get_json()
+        samples = body.get('samples') if isinstance(body, dict) else body
+        if isinstance(samples, list) and len(samples) > MAX_SAMPLES:
+            return jsonify({'error': f'At most {MAX_SAMPLES} samples per request'}), 400
+
+        result = health_series.append(db_session, samples)
+        db_session.commit()
+
+        return jsonify(result), 201
+
+    except MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@health_bp.route('/api/health/<metric>', methods=['GET'])
+@change_versions.conditional('health')
+def get_series(metric):
+    """Get a metric between ?from= and ?to=
+
+    ?resolution=raw|hour|day|week|<seconds> picks the bucket size; by default it
+    is chosen so the range fits in ?points= buckets (200). Each bucket reports
+    count, sum, min, max and mean, read from the coarsest rollup that fits.
+    """
+    try:
+        start, end = parse_range()
+        result = health_series.query(
+            read_session, metric, start, end,
+            resolution=request.args.get('resolution', 'auto'),
+            points=request.args.get('points', health_series.DEFAULT_POINTS, type=int)
+        )
+        return json_response(result)
+
+    except MutationError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@health_bp.route('/api/health/<metric>/samples', methods=['DELETE'])
+def delete_samples(metric):
+    """Delete a metric's readings between ?from= and ?to= (rollups are updated)"""
+    try:
+        start, end = parse_range()
+        deleted = health_series.delete_range(db_session, metric, start, end)
+        db_session.commit()
+
+        return jsonify({'deleted': deleted}), 200
+
+    except MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
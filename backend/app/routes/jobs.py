@@ -0,0 +1,53 @@
+from flask import Blueprint, request, jsonify
+from app.services import jobs
+
+# Create blueprint
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """Get background jobs, newest first (?status=queued|running|completed|failed, ?name=), with counters and schedules"""
+    try:
+        status = request.args.get('status')
+        if status and status not in jobs.STATUSES:
+            return jsonify({'error': f"status must be one of {', '.join(jobs.STATUSES)}"}), 400
+
+        return jsonify({
+            'jobs': [job.to_dict() for job in jobs.runner.list(status, request.args.get('name'))],
+            'stats': jobs.runner.stats(),
+            'schedules': jobs.runner.schedules()
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get one job, including its result once completed"""
+    try:
+        job = jobs.runner.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job.to_dict(include_result=True))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Start a maintenance job: {"name": "backup" | "optimize" | "rebuild-rollups"}
+
+    Returns 202 with the job (an identical queued job is returned instead of a new one).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        name = data.get('name')
+        if not jobs.runner.submittable(name):
+            return jsonify({'error': f'Unknown job {name}'}), 404
+
+        return jobs.accepted(jobs.submit(name))
+
+    except jobs.QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
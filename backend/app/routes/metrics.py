@@ -0,0 +1,16 @@
+from flask import Blueprint, request, jsonify
+from app.services import metrics
+
+# Create blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-route latency percentiles, query counts and slow query samples"""
+    return jsonify(metrics.snapshot()), 200
+
+@metrics_bp.route('/api/metrics', methods=['DELETE'])
+def reset_metrics():
+    """Clear the collected metrics"""
+    metrics.reset()
+    return jsonify({'message': 'Metrics reset'}), 200
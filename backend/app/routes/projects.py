@@ -1,36 +1,51 @@
 from flask import Blueprint, request, jsonify
-from app.database import db_session
-from app.models.projects import Project, ProjectTask
+from app.database import db_session, read_session
+from app.models.projects import Project
+from app.services import change_versions, delta_sync, mutations, project_queries
+from app.services.serializers import json_response
 
 # Create blueprint
 projects_bp = Blueprint('projects', __name__)
 
 @projects_bp.route('/api/projects', methods=['GET'])
+@change_versions.conditional('projects')
 def get_projects():
-    """Get all projects with optional filtering by status"""
+    """Get all projects with optional filtering by status
+
+    ?tasks=0 leaves out the task lists (task_count/completed_count are always
+    included), ?progress=auto reports progress computed from those counters.
+    """
     try:
-        query = db_session.query(Project)
+        criteria = []
 
         # Apply status filter if provided
         status = request.args.get('status')
         if status:
-            query = query.filter(Project.status == status)
+            criteria.append(Project.status == status)
 
-        projects = query.all()
-        return jsonify([project.to_dict(include_tasks=True) for project in projects]), 200
+        # Two queries in total: projects, then all of their tasks (one with ?tasks=0)
+        projects = project_queries.fetch_projects(
+            read_session, *criteria,
+            include_tasks=request.args.get('tasks') != '0',
+            auto_progress=request.args.get('progress') == 'auto'
+        )
+        return json_response(projects)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @projects_bp.route('/api/projects/<int:project_id>', methods=['GET'])
+@change_versions.conditional('projects')
 def get_project(project_id):
     """Get specific project by ID with tasks"""
     try:
-        project = db_session.query(Project).filter(Project.id == project_id).first()
+        project = project_queries.fetch_project(
+            read_session, project_id, auto_progress=request.args.get('progress') == 'auto'
+        )
         if not project:
             return jsonify({'error': 'Project not found'}), 404
 
-        return jsonify(project.to_dict(include_tasks=True)), 200
+        return json_response(project)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -40,27 +55,15 @@ def create_project():
     """Create new project"""
     try:
         data = request.get_json()
-
-        # Validate required fields
-        if not data.get('name'):
-            return jsonify({'error': 'Name is required'}), 400
-
-        # Create new project
-        project = Project(
-            name=data['name'],
-            description=data.get('description'),
-            status=data.get('status', 'active'),
-            progress=data.get('progress', 0),
-            next_step=data.get('next_step'),
-            obsidian_link=data.get('obsidian_link'),
-            is_main=data.get('is_main', False)
-        )
-
-        db_session.add(project)
+        project = mutations.create_project(db_session, data)
+        project_id = project.id
         db_session.commit()
 
-        return jsonify(project.to_dict(include_tasks=True)), 201
+        return jsonify(project_queries.fetch_project(db_session, project_id)), 201
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -69,32 +72,15 @@ def create_project():
 def update_project(project_id):
     """Update existing project"""
     try:
-        project = db_session.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-
         data = request.get_json()
-
-        # Update fields
-        if 'name' in data:
-            project.name = data['name']
-        if 'description' in data:
-            project.description = data['description']
-        if 'status' in data:
-            project.status = data['status']
-        if 'progress' in data:
-            project.progress = data['progress']
-        if 'next_step' in data:
-            project.next_step = data['next_step']
-        if 'obsidian_link' in data:
-            project.obsidian_link = data['obsidian_link']
-        if 'is_main' in data:
-            project.is_main = data['is_main']
-
+        mutations.update_project(db_session, project_id, data)
         db_session.commit()
 
-        return jsonify(project.to_dict(include_tasks=True)), 200
+        return jsonify(project_queries.fetch_project(db_session, project_id)), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -103,15 +89,14 @@ def update_project(project_id):
 def delete_project(project_id):
     """Delete project and all its tasks (cascade)"""
     try:
-        project = db_session.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-
-        db_session.delete(project)
+        mutations.delete_project(db_session, project_id)
         db_session.commit()
 
         return jsonify({'message': 'Project deleted successfully'}), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -120,30 +105,15 @@ def delete_project(project_id):
 def create_project_task(project_id):
     """Add task to project"""
     try:
-        # Verify project exists
-        project = db_session.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
-
         data = request.get_json()
-
-        # Validate required fields
-        if not data.get('title'):
-            return jsonify({'error': 'Title is required'}), 400
-
-        # Create new project task
-        task = ProjectTask(
-            project_id=project_id,
-            title=data['title'],
-            completed=data.get('completed', False),
-            order=data.get('order', 0)
-        )
-
-        db_session.add(task)
+        task = mutations.create_project_task(db_session, project_id, data)
         db_session.commit()
 
         return jsonify(task.to_dict()), 201
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -152,21 +122,14 @@ def create_project_task(project_id):
 def toggle_project_task(project_id, task_id):
     """Toggle task completion status"""
     try:
-        task = db_session.query(ProjectTask).filter(
-            ProjectTask.id == task_id,
-            ProjectTask.project_id == project_id
-        ).first()
-
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-
-        # Toggle completion
-        task.completed = not task.completed
-
+        task = mutations.toggle_project_task(db_session, project_id, task_id)
         db_session.commit()
 
         return jsonify(task.to_dict()), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -175,19 +138,30 @@ def toggle_project_task(project_id, task_id):
 def delete_project_task(project_id, task_id):
     """Delete project task"""
     try:
-        task = db_session.query(ProjectTask).filter(
-            ProjectTask.id == task_id,
-            ProjectTask.project_id == project_id
-        ).first()
-
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-
-        db_session.delete(task)
+        mutations.delete_project_task(db_session, project_id, task_id)
         db_session.commit()
 
         return jsonify({'message': 'Task deleted successfully'}), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@projects_bp.route('/api/projects/changes', methods=['GET'])
+@change_versions.conditional('projects')
+def get_projects_changes():
+    """Get projects and project tasks written or deleted after ?since=<version> (full snapshot without since)"""
+    try:
+        since = request.args.get('since')
+        if since is not None:
+            if not since.isdigit():
+                return jsonify({'error': 'since must be a version number'}), 400
+            since = int(since)
+
+        return json_response(delta_sync.project_changes(read_session, since))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify
+from app.database import read_session
+from app.services import change_versions, search
+
+# Create blueprint
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/api/search', methods=['GET'])
+@change_versions.conditional('tasks', 'projects')
+def search_all():
+    """Full-text search: ?q=words[&type=task,project,project_task][&limit=20]
+
+    Results across types are ranked together by BM25 score, each with a
+    snippet of the best matching field.
+    """
+    try:
+        query = request.args.get('q', '')
+        if not query.strip():
+            return jsonify({'error': 'q is required'}), 400
+        try:
+            kinds = search.parse_kinds(request.args.get('type'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        limit = min(max(request.args.get('limit', search.DEFAULT_LIMIT, type=int), 1), search.MAX_LIMIT)
+
+        return jsonify(search.search(read_session, query, kinds, limit))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
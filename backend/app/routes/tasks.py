@@ -1,17 +1,65 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
-from sqlalchemy import func
-from app.database import db_session
-from app.models.tasks import Task
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, and_, or_, select
+from sqlalchemy.orm import selectinload
+import base64
+import binascii
+import io
+from app.database import db_session, read_session
+from app.models.tasks import Task, TaskSeries
+from app.services import change_versions, delta_sync, mutations, recurrence, task_rollups, task_transfer
+from app.services.serializers import TASK, json_response
 
 # Create blueprint
 tasks_bp = Blueprint('tasks', __name__)
 
+# Upper bound for ?limit= on paginated task listings
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched per round trip when streaming NDJSON
+STREAM_BATCH_SIZE = 500
+
+# Longest ?from=..&to= range recurring tasks are expanded over
+MAX_OCCURRENCE_RANGE_DAYS = 400
+
+# Longest ?days= window for the completion chart in /api/tasks/stats
+MAX_STATS_DAYS = 366
+
+def encode_cursor(task):
+    """Build an opaque keyset cursor pointing just after the given (serialized) task"""
+    raw = f"{task['date'] or ''}|{task['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Return the (date, id) pair encoded by encode_cursor()"""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    cursor_date, cursor_id = raw.split('|')
+    return (date.fromisoformat(cursor_date) if cursor_date else None), int(cursor_id)
+
+def apply_keyset(query, cursor):
+    """Restrict query to rows after the cursor in (date, id) order (NULL dates sort first)"""
+    cursor_date, cursor_id = decode_cursor(cursor)
+    if cursor_date is None:
+        return query.filter(or_(
+            and_(Task.date.is_(None), Task.id > cursor_id),
+            Task.date.isnot(None)
+        ))
+    return query.filter(or_(
+        Task.date > cursor_date,
+        and_(Task.date == cursor_date, Task.id > cursor_id)
+    ))
+
 @tasks_bp.route('/api/tasks', methods=['GET'])
+@change_versions.conditional('tasks')
 def get_tasks():
-    """Get all tasks with optional filtering by category, status, or date"""
+    """Get all tasks with optional filtering by category, status, or date
+
+    Optional paging: ?limit=N[&cursor=...] returns {'tasks': [...], 'next_cursor': ...}
+    ordered by (date, id). ?format=ndjson streams one task per line instead.
+    """
     try:
-        query = db_session.query(Task)
+        # Plain column tuples: no ORM objects are built for listings
+        query = select(*TASK.columns)
 
         # Apply filters if provided
         category = request.args.get('category')
@@ -25,17 +73,51 @@ def get_tasks():
         if date_filter:
             query = query.filter(Task.date == date_filter)
 
-        tasks = query.all()
-        return jsonify([task.to_dict() for task in tasks]), 200
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        stream = request.args.get('format') == 'ndjson'
+
+        if limit is None and cursor is None and not stream:
+            return json_response(TASK.fetch(read_session, query))
+
+        # Keyset pagination: the index on tasks.date also carries the rowid (id),
+        # so (date, id) ordering and the cursor predicate are index range scans
+        try:
+            if cursor:
+                query = apply_keyset(query, cursor)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.order_by(Task.date, Task.id)
+
+        if stream:
+            if limit is not None:
+                query = query.limit(max(1, limit))
+
+            def generate():
+                rows = read_session.connection().execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+                for row in rows:
+                    yield current_app.json.dumps(TASK.row_to_dict(row)) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        limit = min(max(1, limit or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        tasks = TASK.fetch(read_session, query.limit(limit + 1))
+        next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+
+        return json_response({
+            'tasks': tasks[:limit],
+            'next_cursor': next_cursor
+        })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['GET'])
+@change_versions.conditional('tasks')
 def get_task(task_id):
     """Get specific task by ID"""
     try:
-        task = db_session.query(Task).filter(Task.id == task_id).first()
+        task = read_session.query(Task).filter(Task.id == task_id).first()
         if not task:
             return jsonify({'error': 'Task not found'}), 404
 
@@ -49,27 +131,14 @@ def create_task():
     """Create new task"""
     try:
         data = request.get_json()
-
-        # Validate required fields
-        if not data.get('title'):
-            return jsonify({'error': 'Title is required'}), 400
-
-        # Create new task
-        task = Task(
-            title=data['title'],
-            category=data.get('category'),
-            status=data.get('status', 'pending'),
-            date=datetime.fromisoformat(data['date']).date() if data.get('date') else None,
-            time=datetime.strptime(data['time'], '%H:%M:%S').time() if data.get('time') else None,
-            priority=data.get('priority', 0),
-            notes=data.get('notes')
-        )
-
-        db_session.add(task)
+        task = mutations.create_task(db_session, data)
         db_session.commit()
 
         return jsonify(task.to_dict()), 201
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -78,32 +147,15 @@ def create_task():
 def update_task(task_id):
     """Update existing task"""
     try:
-        task = db_session.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-
         data = request.get_json()
-
-        # Update fields
-        if 'title' in data:
-            task.title = data['title']
-        if 'category' in data:
-            task.category = data['category']
-        if 'status' in data:
-            task.status = data['status']
-        if 'date' in data:
-            task.date = datetime.fromisoformat(data['date']).date() if data['date'] else None
-        if 'time' in data:
-            task.time = datetime.strptime(data['time'], '%H:%M:%S').time() if data['time'] else None
-        if 'priority' in data:
-            task.priority = data['priority']
-        if 'notes' in data:
-            task.notes = data['notes']
-
+        task = mutations.update_task(db_session, task_id, data)
         db_session.commit()
 
         return jsonify(task.to_dict()), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -112,15 +164,14 @@ def update_task(task_id):
 def delete_task(task_id):
     """Delete task"""
     try:
-        task = db_session.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-
-        db_session.delete(task)
+        mutations.delete_task(db_session, task_id)
         db_session.commit()
 
         return jsonify({'message': 'Task deleted successfully'}), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -129,56 +180,52 @@ def delete_task(task_id):
 def complete_task(task_id):
     """Mark task as completed"""
     try:
-        task = db_session.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return jsonify({'error': 'Task not found'}), 404
-
-        task.status = 'completed'
-        task.completed_at = datetime.utcnow()
-
+        task = mutations.complete_task(db_session, task_id)
         db_session.commit()
 
         return jsonify(task.to_dict()), 200
 
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         db_session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/stats', methods=['GET'])
+@change_versions.conditional('tasks', daily=True)
 def get_task_stats():
-    """Get task statistics for the Data sub-tab"""
+    """Get task statistics for the Data sub-tab (served from the task rollups)"""
     try:
-        # Get all tasks
-        all_tasks = db_session.query(Task).all()
+        days = min(max(1, request.args.get('days', 7, type=int)), MAX_STATS_DAYS)
 
         # Calculate counts
-        total_tasks = len(all_tasks)
-        completed = len([t for t in all_tasks if t.status == 'completed'])
-        pending = len([t for t in all_tasks if t.status == 'pending'])
-        in_progress = len([t for t in all_tasks if t.status == 'in-progress'])
+        counts = task_rollups.get_status_counts(read_session)
+        total_tasks = sum(counts.values())
+        completed = counts.get('completed', 0)
+        pending = counts.get('pending', 0)
+        in_progress = counts.get('in-progress', 0)
 
         # Calculate completion rate
         completion_rate = round((completed / total_tasks * 100) if total_tasks > 0 else 0)
 
-        # Calculate weekly completion (last 7 days)
+        # Calculate weekly completion (last `days` days, 7 by default)
         today = datetime.now().date()
+        daily_counts = task_rollups.get_daily_completions(
+            read_session, today - timedelta(days=days - 1), today
+        )
         weekly_completion = []
         day_names = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
 
-        for i in range(7):
-            day_date = today - timedelta(days=6-i)
+        for i in range(days):
+            day_date = today - timedelta(days=days - 1 - i)
             day_name = day_names[day_date.weekday()]
             if day_date.weekday() == 6:  # Sunday is 6 in Python, but we want it first
                 day_name = 'Sun'
 
-            completed_count = len([
-                t for t in all_tasks
-                if t.completed_at and t.completed_at.date() == day_date
-            ])
-
             weekly_completion.append({
                 'day': day_name,
-                'completed': completed_count
+                'completed': daily_counts.get(day_date, 0)
             })
 
         return jsonify({
@@ -192,3 +239,204 @@ def get_task_stats():
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/import', methods=['POST'])
+def import_tasks():
+    """Bulk import tasks from CSV, JSON Lines or Parquet (?format=, or a multipart 'file')"""
+    try:
+        upload = request.files.get('file')
+        source = upload.stream if upload else request.stream
+        default = task_transfer.format_from_filename(upload.filename) if upload else 'csv'
+        fmt = request.args.get('format', default)
+
+        if fmt not in task_transfer.FORMATS:
+            return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+        if fmt == 'parquet':
+            # Parquet needs random access, so buffer the upload
+            source = io.BytesIO(source.read())
+
+        result = task_transfer.import_tasks(db_session, source, fmt)
+        return jsonify(result), 201
+
+    except task_transfer.ImportAborted as e:
+        # Earlier chunks are committed; say how many so the client can resume or clean up
+        status = 400 if isinstance(e.error, ValueError) else 500
+        return jsonify({'error': str(e.error), **e.stats}), status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/export', methods=['GET'])
+def export_tasks():
+    """Stream all tasks as CSV, JSON Lines or Parquet (?format=csv by default)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in task_transfer.FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    if fmt == 'parquet' and not task_transfer.parquet_available():
+        return jsonify({'error': 'Parquet support requires pyarrow'}), 400
+
+    def generate():
+        stats = {}
+        yield from task_transfer.export_chunks(read_session, fmt, stats=stats)
+        current_app.logger.info('Exported %(exported)s tasks in %(seconds)ss (%(rowsPerSecond)s rows/s)', stats)
+
+    extension = 'jsonl' if fmt == 'jsonl' else fmt
+    return Response(
+        stream_with_context(generate()),
+        mimetype=task_transfer.MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename=tasks.{extension}'}
+    )
+
+@tasks_bp.route('/api/tasks/changes', methods=['GET'])
+@change_versions.conditional('tasks')
+def get_tasks_changes():
+    """Get tasks and series written or deleted after ?since=<version> (full snapshot without since)"""
+    try:
+        since = request.args.get('since')
+        if since is not None:
+            if not since.isdigit():
+                return jsonify({'error': 'since must be a version number'}), 400
+            since = int(since)
+
+        return json_response(delta_sync.task_changes(read_session, since))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/occurrences', methods=['GET'])
+@change_versions.conditional('tasks')
+def get_occurrences():
+    """Get recurring task occurrences between ?from= and ?to= (inclusive), optionally by ?category=
+
+    Occurrences that have not been completed or edited have no row yet and
+    are returned with id null; act on them through their series_id and
+    occurrence_date.
+    """
+    try:
+        try:
+            start = date.fromisoformat(request.args.get('from', ''))
+            end = date.fromisoformat(request.args.get('to', ''))
+        except ValueError:
+            return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+        if end < start or (end - start).days >= MAX_OCCURRENCE_RANGE_DAYS:
+            return jsonify({'error': f'to must be on or after from, at most {MAX_OCCURRENCE_RANGE_DAYS} days apart'}), 400
+
+        return json_response(recurrence.expand(read_session, start, end, request.args.get('category')))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series', methods=['GET'])
+@change_versions.conditional('tasks')
+def get_series_list():
+    """Get all recurring task series"""
+    try:
+        series = read_session.query(TaskSeries).options(selectinload(TaskSeries.skips)).order_by(TaskSeries.id).all()
+        return jsonify([item.to_dict() for item in series]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series', methods=['POST'])
+def create_series():
+    """Create a recurring task series
+
+    Body: title, category (Daily|Weekly|Monthly), start_date (default today) and
+    optionally interval, weekdays ([0-6], 0 = Monday), month_day (1-31, or -1
+    for the last day), end_date, time, priority, notes.
+    """
+    try:
+        data = request.get_json()
+        series = mutations.create_series(db_session, data)
+        db_session.commit()
+
+        return jsonify(series.to_dict()), 201
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series/<int:series_id>', methods=['PUT'])
+def update_series(series_id):
+    """Update a series' rule (set end_date to stop it from a given day)"""
+    try:
+        data = request.get_json()
+        series = mutations.update_series(db_session, series_id, data)
+        db_session.commit()
+
+        return jsonify(series.to_dict()), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series/<int:series_id>', methods=['DELETE'])
+def delete_series(series_id):
+    """Delete a series (completed or edited occurrences are kept as tasks)"""
+    try:
+        mutations.delete_series(db_session, series_id)
+        db_session.commit()
+
+        return jsonify({'message': 'Series deleted successfully'}), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series/<int:series_id>/occurrences/<occurrence_date>', methods=['PUT'])
+def update_occurrence(series_id, occurrence_date):
+    """Edit one occurrence of a series (writes its task row on first edit)"""
+    try:
+        data = request.get_json()
+        task = mutations.update_occurrence(db_session, series_id, occurrence_date, data)
+        db_session.commit()
+
+        return jsonify(task.to_dict()), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series/<int:series_id>/occurrences/<occurrence_date>/complete', methods=['PATCH'])
+def complete_occurrence(series_id, occurrence_date):
+    """Mark one occurrence of a series as completed"""
+    try:
+        task = mutations.complete_occurrence(db_session, series_id, occurrence_date)
+        db_session.commit()
+
+        return jsonify(task.to_dict()), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/series/<int:series_id>/occurrences/<occurrence_date>', methods=['DELETE'])
+def delete_occurrence(series_id, occurrence_date):
+    """Delete one occurrence of a series (it is recorded as skipped, so it is not generated again)"""
+    try:
+        mutations.delete_occurrence(db_session, series_id, occurrence_date)
+        db_session.commit()
+
+        return jsonify({'message': 'Occurrence deleted successfully'}), 200
+
+    except mutations.MutationError as e:
+        db_session.rollback()
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,15 +1,19 @@
 """
 YouTube API Routes
 Handles YouTube Data API v3 integration and OAuth flow
+
+The Google client libraries are imported on first use (see youtube_clients),
+so registering this blueprint does not slow down app startup.
+
+Playlists and their items are served from the local mirror (youtube_mirror)
+and refreshed in the background; ?source=live asks the API directly.
 """
 
-from flask import Blueprint, jsonify, request, session, redirect, url_for
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from flask import Blueprint, jsonify, request, session, redirect, url_for, current_app, Response, stream_with_context
 import os
 import json
+from app.database import read_session
+from app.services import jobs, youtube_cache, youtube_clients, youtube_mirror, youtube_playlists, youtube_videos
 
 # Allow HTTP for local development (REMOVE IN PRODUCTION!)
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
@@ -32,6 +36,7 @@ CLIENT_CONFIG = {
 def oauth_authorize():
     """Initiate OAuth flow"""
     try:
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             CLIENT_CONFIG,
             scopes=SCOPES,
@@ -57,6 +62,7 @@ def oauth_authorize():
 def oauth_callback():
     """Handle OAuth callback"""
     try:
+        from google_auth_oauthlib.flow import Flow
         state = session.get('state')
 
         flow = Flow.from_client_config(
@@ -127,39 +133,116 @@ def oauth_revoke():
     return jsonify({'success': True, 'message': 'Credentials revoked'})
 
 
-@youtube_bp.route('/playlists', methods=['GET'])
-def get_playlists():
-    """Get user's YouTube playlists"""
+@youtube_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get YouTube response cache hit/miss counters"""
+    return jsonify(youtube_cache.stats())
+
+
+@youtube_bp.route('/clients/stats', methods=['GET'])
+def client_pool_stats():
+    """Get YouTube client pool and video batching counters"""
+    return jsonify({**youtube_clients.pool.stats(), 'videoBatches': youtube_videos.batcher.stats()})
+
+
+def use_mirror():
+    return request.args.get('source') != 'live'
+
+
+def open_mirror(credentials):
+    """Return the owner key to read the signed-in account's mirror with, or None until it has been filled
+
+    A background sync is queued on first use (the caller answers from the
+    API meanwhile) and once the mirror is older than YOUTUBE_MIRROR_TTL.
+    """
+    owner = youtube_clients.credentials_key(credentials)
+    account = youtube_mirror.get_account(read_session, owner)
+    youtube_mirror.refresh_if_stale(credentials, owner, account)
+    if account is None or account.synced_at is None:
+        return None
+    return owner
+
+
+@youtube_bp.route('/sync', methods=['GET'])
+def get_sync_status():
+    """Get the playlist mirror's sync state for the signed-in account"""
     try:
         credentials = session.get('credentials')
 
         if not credentials:
             return jsonify({'error': 'Not authenticated'}), 401
 
-        creds = Credentials(**credentials)
-        youtube = build('youtube', 'v3', credentials=creds)
+        owner = youtube_clients.credentials_key(credentials)
+        account = youtube_mirror.get_account(read_session, owner)
+        state = account.to_dict() if account else {'syncedAt': None, 'lastError': None, 'retryAt': None}
+        return jsonify({**state, 'playlists': len(youtube_mirror.playlists(read_session, owner))})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 
-        # Fetch user's playlists
-        request_playlists = youtube.playlists().list(
-            part='snippet,contentDetails',
-            mine=True,
-            maxResults=50
+@youtube_bp.route('/sync', methods=['POST'])
+def start_sync():
+    """Sync the playlist mirror now, as a background job ({"force": true} ignores ETags)"""
+    try:
+        credentials = session.get('credentials')
+
+        if not credentials:
+            return jsonify({'error': 'Not authenticated'}), 401
+
+        force = bool((request.get_json(silent=True) or {}).get('force'))
+        job = jobs.submit(
+            'youtube.sync',
+            {'credentials': credentials, 'force': force},
+            key=youtube_clients.credentials_key(credentials)
         )
-        response = request_playlists.execute()
-
-        playlists = []
-        for item in response.get('items', []):
-            playlists.append({
-                'id': item['id'],
-                'title': item['snippet']['title'],
-                'description': item['snippet'].get('description', ''),
-                'thumbnailUrl': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                'itemCount': item['contentDetails']['itemCount'],
-                'youtubePlaylistId': item['id']
-            })
+        return jobs.accepted(job)
+    except jobs.QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@youtube_bp.route('/playlists', methods=['GET'])
+def get_playlists():
+    """Get user's YouTube playlists (from the local mirror; ?source=live for the API)"""
+    try:
+        credentials = session.get('credentials')
 
+        if not credentials:
+            return jsonify({'error': 'Not authenticated'}), 401
+
+        owner = open_mirror(credentials) if use_mirror() else None
+        if owner is not None:
+            return jsonify({'playlists': youtube_mirror.playlists(read_session, owner)})
+
+        def fetch(etag):
+            with youtube_clients.client(credentials=credentials) as youtube:
+                # Fetch user's playlists
+                request_playlists = youtube.playlists().list(
+                    part='snippet,contentDetails',
+                    mine=True,
+                    maxResults=50
+                )
+                response = youtube_cache.execute_conditional(request_playlists, etag)
+
+            playlists = []
+            for item in response.get('items', []):
+                playlists.append({
+                    'id': item['id'],
+                    'title': item['snippet']['title'],
+                    'description': item['snippet'].get('description', ''),
+                    'thumbnailUrl': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+                    'itemCount': item['contentDetails']['itemCount'],
+                    'youtubePlaylistId': item['id']
+                })
+
+            return playlists, response.get('etag')
+
+        playlists = youtube_cache.get_or_fetch(
+            'playlists', youtube_clients.credentials_key(credentials), fetch, conditional=True
+        )
         return jsonify({'playlists': playlists})
-    except HttpError as e:
+    except youtube_clients.HttpError as e:
         return jsonify({'error': f'YouTube API error: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -167,37 +250,75 @@ def get_playlists():
 
 @youtube_bp.route('/playlist/<playlist_id>/items', methods=['GET'])
 def get_playlist_items(playlist_id):
-    """Get videos from a specific playlist"""
+    """Get videos from a specific playlist
+
+    By default returns the first 50 items. With ?all=1 every page is walked and
+    the items, enriched with duration and viewCount, are streamed as NDJSON
+    page by page. With ?all=1&async=1 the walk runs as a background job
+    instead: the response is 202 with the job, whose result holds the videos.
+
+    The account's own playlists are read from the local mirror (with duration
+    and viewCount in both forms); other playlists and ?source=live go to the API.
+    """
     try:
         credentials = session.get('credentials')
 
         if not credentials:
             return jsonify({'error': 'Not authenticated'}), 401
 
-        creds = Credentials(**credentials)
-        youtube = build('youtube', 'v3', credentials=creds)
-
-        # Fetch playlist items
-        request_items = youtube.playlistItems().list(
-            part='snippet,contentDetails',
-            playlistId=playlist_id,
-            maxResults=50
-        )
-        response = request_items.execute()
-
-        videos = []
-        for item in response.get('items', []):
-            videos.append({
-                'videoId': item['contentDetails']['videoId'],
-                'title': item['snippet']['title'],
-                'description': item['snippet'].get('description', ''),
-                'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                'channelTitle': item['snippet'].get('channelTitle', 'Unknown'),
-                'position': item['snippet']['position']
-            })
-
+        if request.args.get('all') in ('1', 'true') and request.args.get('async') in ('1', 'true'):
+            job = jobs.submit(
+                'youtube.playlist',
+                {'playlist_id': playlist_id, 'credentials': credentials},
+                key=f'{youtube_clients.credentials_key(credentials)}:{playlist_id}'
+            )
+            return jobs.accepted(job)
+
+        owner = open_mirror(credentials) if use_mirror() else None
+        if owner is not None:
+            full = request.args.get('all') in ('1', 'true')
+            videos = youtube_mirror.playlist_tracks(read_session, owner, playlist_id, limit=None if full else 50)
+            if videos is not None and full:
+                return Response(
+                    ''.join(current_app.json.dumps(video) + '\n' for video in videos),
+                    mimetype='application/x-ndjson'
+                )
+            if videos is not None:
+                return jsonify({'videos': videos})
+
+        if request.args.get('all') in ('1', 'true'):
+            def generate():
+                try:
+                    for page in youtube_playlists.iter_full_playlist(playlist_id, credentials):
+                        for video in page:
+                            yield current_app.json.dumps(video) + '\n'
+                except Exception as e:
+                    # Headers are already sent, so report the failure in-band
+                    yield current_app.json.dumps({'error': str(e)}) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        def fetch(etag):
+            with youtube_clients.client(credentials=credentials) as youtube:
+                # Fetch playlist items
+                request_items = youtube.playlistItems().list(
+                    part='snippet,contentDetails',
+                    playlistId=playlist_id,
+                    maxResults=50
+                )
+                response = youtube_cache.execute_conditional(request_items, etag)
+
+            videos = [youtube_playlists.playlist_item_to_dict(item) for item in response.get('items', [])]
+
+            return videos, response.get('etag')
+
+        # Private playlists are only visible to their owner, so key by user as well
+        key = f'{youtube_clients.credentials_key(credentials)}:{playlist_id}'
+        videos = youtube_cache.get_or_fetch('playlist_items', key, fetch, conditional=True)
         return jsonify({'videos': videos})
-    except HttpError as e:
+    except jobs.QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except youtube_clients.HttpError as e:
         return jsonify({'error': f'YouTube API error: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -213,33 +334,36 @@ def search_youtube():
         if not query:
             return jsonify({'error': 'Query parameter required'}), 400
 
-        # Use API key for public search (doesn't require OAuth)
-        api_key = os.getenv('YOUTUBE_API_KEY')
-        youtube = build('youtube', 'v3', developerKey=api_key)
-
-        # Search for videos
-        request_search = youtube.search().list(
-            part='snippet',
-            q=query,
-            type='video',
-            maxResults=max_results,
-            videoCategoryId='10',  # Music category
-            order='relevance'
-        )
-        response = request_search.execute()
-
-        videos = []
-        for item in response.get('items', []):
-            videos.append({
-                'videoId': item['id']['videoId'],
-                'title': item['snippet']['title'],
-                'description': item['snippet'].get('description', ''),
-                'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                'channelTitle': item['snippet'].get('channelTitle', 'Unknown')
-            })
-
+        def fetch(etag):
+            # Use API key for public search (doesn't require OAuth)
+            api_key = os.getenv('YOUTUBE_API_KEY')
+            with youtube_clients.client(api_key=api_key) as youtube:
+                # Search for videos
+                request_search = youtube.search().list(
+                    part='snippet',
+                    q=query,
+                    type='video',
+                    maxResults=max_results,
+                    videoCategoryId='10',  # Music category
+                    order='relevance'
+                )
+                response = request_search.execute()
+
+            videos = []
+            for item in response.get('items', []):
+                videos.append({
+                    'videoId': item['id']['videoId'],
+                    'title': item['snippet']['title'],
+                    'description': item['snippet'].get('description', ''),
+                    'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+                    'channelTitle': item['snippet'].get('channelTitle', 'Unknown')
+                })
+
+            return videos, response.get('etag')
+
+        videos = youtube_cache.get_or_fetch('search', json.dumps([query, max_results]), fetch)
         return jsonify({'videos': videos})
-    except HttpError as e:
+    except youtube_clients.HttpError as e:
         return jsonify({'error': f'YouTube API error: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -247,34 +371,53 @@ def search_youtube():
 
 @youtube_bp.route('/video/<video_id>', methods=['GET'])
 def get_video_details(video_id):
-    """Get details for a specific video"""
-    try:
-        # Use API key for public data (doesn't require OAuth)
-        api_key = os.getenv('YOUTUBE_API_KEY')
-        youtube = build('youtube', 'v3', developerKey=api_key)
+    """Get details for a specific video
 
-        request_video = youtube.videos().list(
-            part='snippet,contentDetails,statistics',
-            id=video_id
-        )
-        response = request_video.execute()
+    Concurrent lookups are coalesced into one upstream videos().list call.
+    """
+    try:
+        def fetch(etag):
+            return youtube_videos.batcher.get(video_id), None
 
-        if not response.get('items'):
+        video = youtube_cache.get_or_fetch('video', video_id, fetch)
+        if video is None:
             return jsonify({'error': 'Video not found'}), 404
 
-        item = response['items'][0]
-        video = {
-            'videoId': item['id'],
-            'title': item['snippet']['title'],
-            'description': item['snippet'].get('description', ''),
-            'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-            'channelTitle': item['snippet'].get('channelTitle', 'Unknown'),
-            'duration': item['contentDetails'].get('duration', ''),
-            'viewCount': item['statistics'].get('viewCount', 0)
-        }
-
         return jsonify(video)
-    except HttpError as e:
+    except youtube_clients.HttpError as e:
+        return jsonify({'error': f'YouTube API error: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@youtube_bp.route('/videos', methods=['GET'])
+def get_videos_details():
+    """Get details for up to 50 videos (?ids=a,b,c) with at most one API call"""
+    try:
+        ids = [video_id for video_id in request.args.get('ids', '').split(',') if video_id]
+        if not ids:
+            return jsonify({'error': 'ids parameter required'}), 400
+        if len(ids) > youtube_playlists.PAGE_SIZE:
+            return jsonify({'error': f'At most {youtube_playlists.PAGE_SIZE} ids per request'}), 400
+
+        videos = {}
+        futures = {}
+        for video_id in dict.fromkeys(ids):
+            found, video = youtube_cache.lookup('video', video_id)
+            if found:
+                videos[video_id] = video
+            else:
+                futures[video_id] = youtube_videos.batcher.submit(video_id)
+
+        for video_id, future in futures.items():
+            videos[video_id] = future.result(timeout=youtube_videos.LOOKUP_TIMEOUT)
+            youtube_cache.store('video', video_id, videos[video_id])
+
+        return jsonify({
+            'videos': [videos[video_id] for video_id in ids if videos[video_id] is not None],
+            'missing': [video_id for video_id in ids if videos[video_id] is None]
+        })
+    except youtube_clients.HttpError as e:
         return jsonify({'error': f'YouTube API error: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
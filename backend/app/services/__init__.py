@@ -0,0 +1,2 @@
+# Service modules hold logic shared between routes (rollups, caches, clients...)
+# Each module is imported directly, e.g. `from app.services import task_rollups`
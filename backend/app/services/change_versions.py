@@ -0,0 +1,85 @@
+"""
+Change versions
+A monotonically increasing version per table ('tasks', 'projects'), bumped in
+the same transaction as every write. GET handlers wrapped with @conditional
+emit a strong ETag and Last-Modified derived from it, and answer a matching
+If-None-Match with 304 after a single primary-key lookup, before the
+handler's own queries run.
+
+Project task writes bump 'projects', since project responses embed their tasks.
+Written rows carry the version of their last write and deletes leave
+tombstones, which is what the /changes delta endpoints read.
+"""
+
+from datetime import datetime, date
+from functools import wraps
+from flask import request, make_response
+from sqlalchemy import select, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import read_session
+from app.models.versions import ChangeVersion, Tombstone
+
+
+def bump(session, table_name):
+    """Increment a table's version inside the caller's transaction; returns the new version
+
+    Written rows are stamped with the returned version so /changes can find them.
+    """
+    stmt = sqlite_insert(ChangeVersion).values(
+        table_name=table_name, version=1, updated_at=datetime.utcnow()
+    )
+    return session.execute(stmt.on_conflict_do_update(
+        index_elements=[ChangeVersion.table_name],
+        set_={'version': ChangeVersion.version + 1, 'updated_at': stmt.excluded.updated_at}
+    ).returning(ChangeVersion.version)).scalar_one()
+
+
+def record_deletes(session, entity, entity_ids, version):
+    """Leave tombstones for deleted rows (entity: 'task', 'task_series', 'project' or 'project_task')"""
+    if entity_ids:
+        session.execute(insert(Tombstone), [
+            {'entity': entity, 'entity_id': entity_id, 'version': version}
+            for entity_id in entity_ids
+        ])
+
+
+def get_versions(session, table_names):
+    """Return {table_name: (version, updated_at)}; tables never written report (0, None)"""
+    rows = session.execute(
+        select(ChangeVersion.table_name, ChangeVersion.version, ChangeVersion.updated_at)
+        .where(ChangeVersion.table_name.in_(table_names))
+    )
+    versions = {table_name: (0, None) for table_name in table_names}
+    versions.update({table_name: (version, updated_at) for table_name, version, updated_at in rows})
+    return versions
+
+
+def conditional(*table_names, daily=False):
+    """Decorate a GET view with ETag/Last-Modified/If-None-Match handling
+
+    Set daily=True for views whose output also depends on today's date.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_versions(read_session, table_names)
+            tag = '-'.join(f'{name}{versions[name][0]}' for name in table_names)
+            if daily:
+                tag += f'-{date.today().isoformat()}'
+            modified = [updated_at for _, updated_at in versions.values() if updated_at]
+            last_modified = max(modified) if modified else None
+
+            if request.if_none_match.contains(tag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(tag)  # strong ETag
+            response.headers['Cache-Control'] = 'no-cache'
+            if last_modified:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
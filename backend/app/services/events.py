@@ -0,0 +1,242 @@
+"""
+Change events
+Write paths queue a compact change event (entity, id, op, version) on the
+session, and the events are published to subscribers only after the
+transaction commits (a rollback discards them).
+
+Subscribers are served as Server-Sent Events by a small asyncio server on its
+own port (EVENTS_PORT, default 5001): one thread multiplexes every idle
+connection, so open EventSource connections never hold Flask worker threads.
+That port is a different origin from the API, so clients are not redirected
+there (a browser would send `Origin: null` after a cross-origin redirect):
+/api/events/stream advertises the URL to open, and /api/events itself
+streams from the worker, for same-origin clients and when EVENTS_PORT=0.
+
+Each subscriber has a bounded buffer (EVENTS_BUFFER). A subscriber that falls
+that far behind, or whose socket does not drain within EVENTS_WRITE_TIMEOUT,
+gets a final 'reset' event and is disconnected. The client should then
+resync via /changes and reconnect.
+"""
+
+from collections import deque
+import asyncio
+import json
+import os
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+EVENTS_PORT = int(os.getenv('EVENTS_PORT', '5001'))
+EVENTS_HOST = os.getenv('EVENTS_HOST', '127.0.0.1')
+EVENTS_BUFFER = int(os.getenv('EVENTS_BUFFER', '256'))
+EVENTS_WRITE_TIMEOUT = float(os.getenv('EVENTS_WRITE_TIMEOUT', '5'))
+KEEPALIVE_SECONDS = 15
+
+# Origins allowed to open the event stream (set from run.py's CORS configuration)
+ALLOWED_ORIGINS = []
+
+
+def queue(session, entity, entity_id, op, version):
+    """Queue a change event to be published when the session commits"""
+    session.info.setdefault('pending_events', []).append({
+        'entity': entity, 'id': entity_id, 'op': op, 'version': version
+    })
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending(session):
+    for change in session.info.pop('pending_events', []):
+        broker.publish(change)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop('pending_events', None)
+
+
+def format_sse(event_id, name, data):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n'
+
+
+class Subscriber:
+    """Bounded event buffer for one connection; `notify` wakes its reader"""
+
+    def __init__(self, notify, max_buffer=EVENTS_BUFFER):
+        self.notify = notify
+        self.max_buffer = max_buffer
+        self.buffer = deque()
+        self.overflowed = False
+
+    def offer(self, item):
+        if len(self.buffer) >= self.max_buffer:
+            self.overflowed = True
+        else:
+            self.buffer.append(item)
+        self.notify()
+
+    def drain(self):
+        items = []
+        while self.buffer:
+            items.append(self.buffer.popleft())
+        return items
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.dropped = 0
+
+    def subscribe(self, notify):
+        subscriber = Subscriber(notify)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, change):
+        with self._lock:
+            self._sequence += 1
+            item = (self._sequence, change)
+            for subscriber in list(self._subscribers):
+                subscriber.offer(item)
+                if subscriber.overflowed:
+                    self._subscribers.discard(subscriber)
+                    self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'published': self._sequence, 'dropped': self.dropped}
+
+
+broker = EventBroker()
+
+
+def iter_stream(subscriber, wait):
+    """Yield SSE text for a subscriber; `wait(timeout)` blocks until notified"""
+    yield 'retry: 3000\n\n'
+    while True:
+        if not wait(KEEPALIVE_SECONDS):
+            yield ': keep-alive\n\n'
+        for event_id, change in subscriber.drain():
+            yield format_sse(event_id, 'change', change)
+        if subscriber.overflowed:
+            yield format_sse(0, 'reset', {'reason': 'slow consumer'})
+            return
+
+
+def stream_threaded():
+    """Serve a subscriber from the calling (worker) thread - used when EVENTS_PORT=0"""
+    wakeup = threading.Event()
+    subscriber = broker.subscribe(wakeup.set)
+
+    def wait(timeout):
+        notified = wakeup.wait(timeout)
+        wakeup.clear()
+        return notified
+
+    try:
+        yield from iter_stream(subscriber, wait)
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+class SSEServer:
+    """Single-threaded asyncio HTTP server that only serves GET /api/events"""
+
+    def __init__(self, host=EVENTS_HOST, port=EVENTS_PORT):
+        self.host = host
+        self.port = port
+        self.loop = None
+        self._ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name='sse-server', daemon=True).start()
+        self._ready.wait(5)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) < 2 or request_line[0] != 'GET' or not request_line[1].startswith('/api/events'):
+                writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+
+            origin = headers.get('origin')
+            cors = f'Access-Control-Allow-Origin: {origin}\r\nAccess-Control-Allow-Credentials: true\r\n' \
+                if origin in ALLOWED_ORIGINS else ''
+            writer.write((
+                'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                'Cache-Control: no-cache\r\nConnection: keep-alive\r\n' + cors + '\r\n'
+            ).encode())
+
+            wakeup = asyncio.Event()
+            subscriber = broker.subscribe(lambda: self.loop.call_soon_threadsafe(wakeup.set))
+            try:
+                await self._pump(subscriber, wakeup, writer)
+            finally:
+                broker.unsubscribe(subscriber)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _pump(self, subscriber, wakeup, writer):
+        writer.write(b'retry: 3000\n\n')
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                writer.write(b': keep-alive\n\n')
+            wakeup.clear()
+            if writer.is_closing():
+                return
+
+            pending = subscriber.drain()
+            if pending:
+                writer.write(''.join(format_sse(event_id, 'change', change) for event_id, change in pending).encode())
+            if subscriber.overflowed:
+                writer.write(format_sse(0, 'reset', {'reason': 'slow consumer'}).encode())
+                await asyncio.wait_for(writer.drain(), EVENTS_WRITE_TIMEOUT)
+                return
+
+            # A client that cannot take the bytes in time is disconnected
+            await asyncio.wait_for(writer.drain(), EVENTS_WRITE_TIMEOUT)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def ensure_server():
+    """Start the SSE server on first use; returns it, or None when EVENTS_PORT=0"""
+    global _server
+    if EVENTS_PORT == 0:
+        return None
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                server = SSEServer()
+                server.start()
+                _server = server
+    return _server
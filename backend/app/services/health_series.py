@@ -0,0 +1,359 @@
+"""
+Health time series
+Water, weight, exercise, sleep and nutrition readings are stored as compact
+(metric_id, ts, value) rows in a WITHOUT ROWID table clustered on
+(metric_id, ts). Hourly, daily and weekly count/sum/min/max rollups are kept
+for every metric.
+
+append() takes a batch of readings and writes them with one executemany
+upsert. Then, in the same transaction, it recomputes only the rollup buckets
+the batch touched: hours from the raw samples, days from the hours, weeks
+from the days. Range queries read the coarsest level that evenly divides the
+requested resolution and re-bucket it. So a year of daily points reads 365
+day rows, not every sample. All grouping is vectorized in pandas, which is
+imported on first use to keep it off the startup path.
+"""
+
+from math import ceil
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.health import HealthMetric, HealthSample, HealthRollup, HOUR, DAY, WEEK
+from app.services import change_versions, events
+from app.services.mutations import MutationError
+
+# Rollup levels, finest first; each is built from the one before it
+LEVELS = (HOUR, DAY, WEEK)
+LEVEL_NAMES = {HOUR: 'hour', DAY: 'day', WEEK: 'week'}
+RESOLUTIONS = {'hour': HOUR, 'day': DAY, 'week': WEEK}
+
+# Weeks start on Monday; 1970-01-01 was a Thursday
+WEEK_OFFSET = 4 * DAY
+
+DEFAULT_POINTS = 200
+MAX_POINTS = 5000
+
+# Bound on bucket keys per DELETE ... IN statement
+DELETE_CHUNK = 500
+
+AGGREGATES = ['count', 'sum', 'min', 'max']
+
+
+def bucket_start(ts, resolution):
+    """Start of the bucket containing ts (ints or arrays); week multiples start on Mondays"""
+    if resolution % WEEK == 0:
+        return (ts - WEEK_OFFSET) // resolution * resolution + WEEK_OFFSET
+    return ts // resolution * resolution
+
+
+def to_timestamps(values):
+    """Vectorized: epoch seconds (numbers or digit strings) or ISO strings (offsets dropped, wall clock kept) to int64"""
+    import pandas as pd
+    series = pd.Series(values)
+    try:
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype('int64').to_numpy()
+        # Query strings (and some JSON) carry epochs as text
+        epochs = series.astype(str).str.fullmatch(r'-?\d+')
+        timestamps = pd.Series(0, index=series.index, dtype='int64')
+        timestamps[epochs] = series[epochs].astype('int64')
+        if not epochs.all():
+            parsed = pd.to_datetime(series[~epochs], format='ISO8601')
+            if parsed.dt.tz is not None:
+                parsed = parsed.dt.tz_localize(None)
+            timestamps[~epochs] = parsed.astype('datetime64[s]').astype('int64')
+    except (ValueError, TypeError):
+        raise MutationError('Timestamps must be ISO 8601 strings or epoch seconds')
+    return timestamps.to_numpy()
+
+
+def _iso(timestamps):
+    """ISO strings (no offset) for a sequence of ts values"""
+    import pandas as pd
+    return pd.to_datetime(pd.Series(timestamps), unit='s').dt.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+
+
+# Metrics
+
+def get_metric(session, name):
+    metric = session.query(HealthMetric).filter(HealthMetric.name == name).first()
+    if not metric:
+        raise MutationError('Metric not found', 404)
+    return metric
+
+
+def save_metric(session, data):
+    """Create a metric, or update the unit of an existing one"""
+    if not data.get('name'):
+        raise MutationError('Name is required')
+    metric = session.query(HealthMetric).filter(HealthMetric.name == data['name']).first()
+    op = None
+    if metric is None:
+        metric = HealthMetric(name=data['name'])
+        session.add(metric)
+        op = 'create'
+    if 'unit' in data and data['unit'] != metric.unit:
+        metric.unit = data['unit']
+        op = op or 'update'
+    session.flush()
+
+    if op:
+        version = change_versions.bump(session, 'health')
+        events.queue(session, 'health_metric', metric.id, op, version)
+    return metric
+
+
+def _metric_ids(session, names):
+    """{name: id}, creating metrics that do not exist yet"""
+    ids = dict(session.execute(
+        select(HealthMetric.name, HealthMetric.id).where(HealthMetric.name.in_(names))
+    ).all())
+    for name in names:
+        if name not in ids:
+            ids[name] = save_metric(session, {'name': name}).id
+    return ids
+
+
+def list_metrics(session):
+    """Every metric with its sample count and first/last reading"""
+    counts = dict(session.execute(
+        select(HealthRollup.metric_id, func.sum(HealthRollup.count))
+        .where(HealthRollup.resolution == WEEK)
+        .group_by(HealthRollup.metric_id)
+    ).all())
+    # min/max per metric are single seeks on the (metric_id, ts) primary key
+    first = select(func.min(HealthSample.ts)).where(HealthSample.metric_id == HealthMetric.id).scalar_subquery()
+    last = select(func.max(HealthSample.ts)).where(HealthSample.metric_id == HealthMetric.id).scalar_subquery()
+
+    metrics = []
+    for metric, first_ts, last_ts in session.execute(
+        select(HealthMetric, first, last).order_by(HealthMetric.name)
+    ):
+        data = metric.to_dict()
+        data['samples'] = counts.get(metric.id, 0)
+        data['first'] = _iso([first_ts])[0] if first_ts is not None else None
+        data['last'] = _iso([last_ts])[0] if last_ts is not None else None
+        metrics.append(data)
+    return metrics
+
+
+# Writes
+
+def append(session, samples):
+    """Append [{metric, timestamp, value}, ...] without committing
+
+    A reading at an existing (metric, timestamp) replaces the old value.
+    Returns {'appended': n, 'metrics': {name: n}}.
+    """
+    import pandas as pd
+    if not isinstance(samples, list) or not all(isinstance(sample, dict) for sample in samples):
+        raise MutationError('samples must be a list of {metric, timestamp, value} objects')
+    frame = pd.DataFrame(samples, columns=['metric', 'timestamp', 'value'])
+    if frame.empty:
+        return {'appended': 0, 'metrics': {}}
+    if frame.isna().any().any():
+        raise MutationError('Every sample needs metric, timestamp and value')
+
+    frame['ts'] = to_timestamps(frame['timestamp'])
+    try:
+        frame['value'] = pd.to_numeric(frame['value']).astype(float)
+    except (ValueError, TypeError) as e:
+        raise MutationError(f'Invalid value: {e}')
+
+    ids = _metric_ids(session, list(frame['metric'].unique()))
+    frame['metric_id'] = frame['metric'].map(ids)
+    frame = frame.drop_duplicates(['metric_id', 'ts'], keep='last')
+
+    # Core table statements: plain executemany, no ORM bulk-insert bookkeeping
+    stmt = sqlite_insert(HealthSample.__table__)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['metric_id', 'ts'],
+            set_={'value': stmt.excluded.value}
+        ),
+        frame[['metric_id', 'ts', 'value']].to_dict('records')
+    )
+    refresh_rollups(session, frame[['metric_id', 'ts']])
+
+    version = change_versions.bump(session, 'health')
+    for metric_id in frame['metric_id'].unique():
+        events.queue(session, 'health_metric', int(metric_id), 'append', version)
+    return {'appended': len(frame), 'metrics': frame.groupby('metric')['ts'].count().to_dict()}
+
+
+def delete_range(session, name, start, end):
+    """Delete a metric's readings with start <= ts < end without committing; returns the number deleted"""
+    import pandas as pd
+    metric = get_metric(session, name)
+    in_range = (HealthSample.metric_id == metric.id, HealthSample.ts >= start, HealthSample.ts < end)
+
+    touched = pd.DataFrame({'ts': session.execute(select(HealthSample.ts).where(*in_range)).scalars().all()})
+    if touched.empty:
+        return 0
+    session.execute(delete(HealthSample).where(*in_range))
+    touched['metric_id'] = metric.id
+    refresh_rollups(session, touched)
+
+    version = change_versions.bump(session, 'health')
+    events.queue(session, 'health_metric', metric.id, 'delete', version)
+    return len(touched)
+
+
+def _load_level(session, metric_id, resolution, lo, hi):
+    """DataFrame of (bucket, count, sum, min, max) for lo <= bucket < hi; resolution None reads raw samples"""
+    import pandas as pd
+    if resolution is None:
+        rows = session.execute(
+            select(HealthSample.ts, HealthSample.value)
+            .where(HealthSample.metric_id == metric_id, HealthSample.ts >= lo, HealthSample.ts < hi)
+        ).all()
+        return pd.DataFrame(rows, columns=['ts', 'value'])
+
+    rows = session.execute(
+        select(HealthRollup.bucket, HealthRollup.count, HealthRollup.sum, HealthRollup.min, HealthRollup.max)
+        .where(HealthRollup.metric_id == metric_id, HealthRollup.resolution == resolution,
+               HealthRollup.bucket >= lo, HealthRollup.bucket < hi)
+    ).all()
+    return pd.DataFrame(rows, columns=['bucket'] + AGGREGATES)
+
+
+def _aggregate(frame, resolution, origin=None):
+    """Group raw samples (ts, value) or finer rollups (bucket, aggregates) into `resolution` buckets
+
+    Buckets follow bucket_start() unless `origin` is given, in which case
+    they are counted from it (used to line query buckets up with the range).
+    """
+    def buckets(ts):
+        if origin is None:
+            return bucket_start(ts, resolution)
+        return origin + (ts - origin) // resolution * resolution
+
+    if 'value' in frame:
+        keys = buckets(frame['ts'])
+        grouped = frame.groupby(keys.rename('bucket'))['value'].agg(AGGREGATES)
+    else:
+        keys = buckets(frame['bucket'])
+        grouped = frame.groupby(keys).agg({'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'})
+    return grouped.reset_index()
+
+
+def refresh_rollups(session, touched):
+    """Recompute the hour/day/week buckets containing the touched (metric_id, ts) pairs
+
+    Each level is rebuilt from the one below it, so only the touched buckets
+    and the rows inside them are read.
+    """
+    for metric_id, group in touched.groupby('metric_id'):
+        metric_id = int(metric_id)
+        buckets = group['ts']
+        source = None  # raw samples
+        for resolution in LEVELS:
+            buckets = bucket_start(buckets, resolution).drop_duplicates()
+            lo, hi = int(buckets.min()), int(buckets.max()) + resolution
+            frame = _load_level(session, metric_id, source, lo, hi)
+            rollups = _aggregate(frame, resolution) if not frame.empty else None
+            if rollups is not None:
+                rollups = rollups[rollups['bucket'].isin(buckets)]
+
+            keys = [int(bucket) for bucket in buckets]
+            for index in range(0, len(keys), DELETE_CHUNK):
+                session.execute(delete(HealthRollup).where(
+                    HealthRollup.metric_id == metric_id,
+                    HealthRollup.resolution == resolution,
+                    HealthRollup.bucket.in_(keys[index:index + DELETE_CHUNK])
+                ))
+            if rollups is not None and not rollups.empty:
+                session.execute(sqlite_insert(HealthRollup.__table__), rollups.assign(
+                    metric_id=metric_id, resolution=resolution
+                ).to_dict('records'))
+            source = resolution
+
+
+def rebuild(session):
+    """Recompute every rollup from the raw samples (does not commit)"""
+    import pandas as pd
+    session.execute(delete(HealthRollup))
+    for metric_id, lo, hi in session.execute(
+        select(HealthSample.metric_id, func.min(HealthSample.ts), func.max(HealthSample.ts))
+        .group_by(HealthSample.metric_id)
+    ):
+        # Every hour in between, so the touched buckets cover the whole series
+        hours = pd.Series(range(int(bucket_start(lo, HOUR)), int(hi) + 1, HOUR))
+        refresh_rollups(session, pd.DataFrame({'metric_id': metric_id, 'ts': hours}))
+
+
+# Reads
+
+def parse_resolution(value):
+    """'raw' -> None, 'hour'/'day'/'week' or a number of seconds -> seconds"""
+    if value == 'raw':
+        return None
+    if value in RESOLUTIONS:
+        return RESOLUTIONS[value]
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    raise MutationError("resolution must be raw, hour, day, week or a number of seconds")
+
+
+def choose_level(resolution):
+    """Coarsest stored level whose buckets tile `resolution` exactly (None: raw samples)"""
+    for level in reversed(LEVELS):
+        if resolution % level == 0:
+            return level
+    return None
+
+
+def auto_resolution(span, points):
+    """Smallest whole multiple of the coarsest fitting level that keeps the span within `points` buckets"""
+    target = max(1, ceil(span / points))
+    for level in reversed(LEVELS):
+        if target >= level:
+            return ceil(target / level) * level
+    return target
+
+
+def query(session, name, start, end, resolution='auto', points=DEFAULT_POINTS):
+    """Readings of a metric with start <= ts < end at the given resolution
+
+    Returns raw readings for resolution 'raw', else one point per bucket with
+    count/sum/min/max/mean. Buckets are counted from start (rounded down to
+    the rollup level read), and rollup buckets that straddle start or end
+    are included whole.
+    """
+    metric = get_metric(session, name)
+    if end <= start:
+        raise MutationError('to must be after from')
+    points = min(max(1, points), MAX_POINTS)
+    step = auto_resolution(end - start, points) if resolution == 'auto' else parse_resolution(resolution)
+
+    result = {
+        'metric': metric.name,
+        'unit': metric.unit,
+        'from': _iso([start])[0],
+        'to': _iso([end])[0],
+        'resolution': step if step else 'raw'
+    }
+
+    if step is None:
+        frame = _load_level(session, metric.id, None, start, end).sort_values('ts')
+        if len(frame) > MAX_POINTS:
+            raise MutationError(f'More than {MAX_POINTS} readings; use a coarser resolution or a shorter range')
+        result['source'] = 'samples'
+        result['points'] = [{'t': t, 'value': value} for t, value in zip(_iso(frame['ts']), frame['value'].tolist())]
+        return result
+
+    if (end - start) / step > MAX_POINTS:
+        raise MutationError(f'More than {MAX_POINTS} buckets; use a coarser resolution or a shorter range')
+
+    level = choose_level(step)
+    lo = bucket_start(start, level) if level else start
+    frame = _load_level(session, metric.id, level, lo, end)
+    result['source'] = LEVEL_NAMES[level] if level else 'samples'
+    if frame.empty:
+        result['points'] = []
+        return result
+
+    grouped = _aggregate(frame, step, origin=lo).sort_values('bucket')
+    grouped['mean'] = grouped['sum'] / grouped['count']
+    grouped['t'] = _iso(grouped['bucket'])
+    result['points'] = grouped[['t', 'count', 'sum', 'min', 'max', 'mean']].to_dict('records')
+    return result
@@ -0,0 +1,312 @@
+"""
+Background jobs
+Slow or periodic work runs on a small, fixed pool of worker threads instead
+of a request thread. A route submits a registered job by name and answers
+202 with the job's id straight away; the client polls /api/jobs/<id> for
+the status and result.
+
+- Submitting a job identical to one still queued (same name and key, where
+  the key defaults to the parameters) returns the queued job instead of
+  adding another, so repeated clicks or overlapping schedules do not pile up.
+- At most JOB_QUEUE_SIZE jobs wait at a time; beyond that submit() raises
+  QueueFull rather than growing without bound.
+- Schedules submit a job every N seconds, optionally aligned to a time of
+  day (at='03:00' with every=DAY runs daily at 03:00 local time).
+- Jobs still queued at shutdown are never run; they end as 'cancelled'.
+- The last JOB_HISTORY finished jobs are kept, with their durations, for
+  /api/jobs and the 'jobs' section of /api/metrics.
+
+Jobs run outside any request, so each gets fresh database sessions, removed
+when it finishes.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from flask import jsonify
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '100'))
+JOB_HISTORY = int(os.getenv('JOB_HISTORY', '200'))
+
+DAY = 86400
+
+STATUSES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownJob(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, name, params, key):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.params = params
+        self.key = key
+        self.status = 'queued'
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self, include_result=False):
+        """Status for /api/jobs; parameters are left out since they may carry credentials"""
+        started = self.started_at or time.time()
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'submittedAt': _iso(self.submitted_at),
+            'startedAt': _iso(self.started_at),
+            'finishedAt': _iso(self.finished_at),
+            'waitMs': round((started - self.submitted_at) * 1000),
+            'durationMs': round(((self.finished_at or time.time()) - self.started_at) * 1000)
+            if self.started_at else None,
+            'error': self.error
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class Schedule:
+    """Submit `name` every `every` seconds, from the next `at` (HH:MM local time) when given"""
+
+    def __init__(self, name, every, at=None, params=None):
+        self.name = name
+        self.every = every
+        self.at = at
+        self.params = params or {}
+        self.next_run = self._first_run(time.time())
+        self.last_job = None
+
+    def _first_run(self, now):
+        if self.at is None:
+            return now + self.every  # not on startup, so restarts do not rerun everything
+        hour, minute = (int(part) for part in self.at.split(':'))
+        first = datetime.fromtimestamp(now).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if first.timestamp() <= now:
+            first += timedelta(days=1)
+        return first.timestamp()
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'everySeconds': self.every,
+            'at': self.at,
+            'nextRun': _iso(self.next_run),
+            'lastJob': self.last_job
+        }
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class JobRunner:
+    def __init__(self, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, history=JOB_HISTORY):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.history = history
+        self._functions = {}  # name -> (function, submittable from /api/jobs)
+        self._schedules = []
+        self._jobs = OrderedDict()  # id -> Job, oldest first
+        self._queued = {}  # (name, key) -> queued Job, for de-duplication
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._executor = None
+        self._scheduler = None
+        self._stopping = False
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def register(self, name, function, submittable=False):
+        """Make `function(**params)` runnable as job `name`; submittable jobs may be started via POST /api/jobs"""
+        self._functions[name] = (function, submittable)
+
+    def submittable(self, name):
+        return name in self._functions and self._functions[name][1]
+
+    def schedule(self, name, every, at=None, params=None):
+        """Run job `name` periodically once the runner has started"""
+        with self._lock:
+            self._schedules.append(Schedule(name, every, at, params))
+        self._wakeup.set()
+
+    def start(self):
+        """Start the worker pool and the scheduler thread (idempotent)"""
+        with self._lock:
+            if self._executor is not None or self._stopping:
+                return
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='job')
+            self._scheduler = threading.Thread(target=self._run_schedules, name='job-scheduler', daemon=True)
+            self._scheduler.start()
+
+    def submit(self, name, params=None, key=None):
+        """Queue job `name`, or return the identical job that is still queued
+
+        Raises UnknownJob for an unregistered name and QueueFull when
+        JOB_QUEUE_SIZE jobs are already waiting.
+        """
+        if name not in self._functions:
+            raise UnknownJob(f'Unknown job {name}')
+        params = params or {}
+        dedupe_key = (name, key if key is not None else _params_key(params))
+
+        self.start()
+        with self._lock:
+            existing = self._queued.get(dedupe_key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing
+            if self._stopping:
+                raise QueueFull('Jobs are shutting down')
+            if len(self._queued) >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f'{len(self._queued)} jobs are already queued')
+
+            job = Job(name, params, dedupe_key)
+            self._jobs[job.id] = job
+            self._queued[dedupe_key] = job
+            self.submitted += 1
+        self._executor.submit(self._execute, job)
+        return job
+
+    def _execute(self, job):
+        with self._lock:
+            if job.status != 'queued':
+                return  # cancelled by shutdown() before a worker got to it
+            self._queued.pop(job.key, None)
+            job.status = 'running'
+            job.started_at = time.time()
+            self._running += 1
+
+        function, _ = self._functions[job.name]
+        try:
+            result = function(**job.params)
+            status, error = 'completed', None
+        except Exception as e:
+            logger.exception('Job %s (%s) failed', job.name, job.id)
+            result, status, error = None, 'failed', str(e)
+        finally:
+            from app.database import shutdown_session
+            shutdown_session()  # the worker thread's scoped sessions
+
+        with self._lock:
+            job.result, job.status, job.error = result, status, error
+            job.finished_at = time.time()
+            self._running -= 1
+            if status == 'completed':
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run_schedules(self):
+        while not self._stopping:
+            now = time.time()
+            with self._lock:
+                due = [schedule for schedule in self._schedules if schedule.next_run <= now]
+                upcoming = min((schedule.next_run for schedule in self._schedules), default=now + 60)
+            for schedule in due:
+                # Fixed cadence from the previous slot; slots missed while asleep are skipped
+                schedule.next_run += ((now - schedule.next_run) // schedule.every + 1) * schedule.every
+                try:
+                    schedule.last_job = self.submit(schedule.name, schedule.params).id
+                except (UnknownJob, QueueFull) as e:
+                    logger.warning('Scheduled job %s not queued: %s', schedule.name, e)
+            if not due:
+                self._wakeup.wait(max(0.0, upcoming - now))
+                self._wakeup.clear()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, status=None, name=None):
+        """Known jobs, newest first"""
+        with self._lock:
+            jobs = list(reversed(self._jobs.values()))
+        return [job for job in jobs
+                if (status is None or job.status == status) and (name is None or job.name == name)]
+
+    def schedules(self):
+        with self._lock:
+            return [schedule.to_dict() for schedule in self._schedules]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'started': self._executor is not None,
+                'queued': len(self._queued),
+                'running': self._running,
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled
+            }
+
+    def shutdown(self, timeout=30):
+        """Stop scheduling, drop queued jobs and wait up to `timeout` for running ones"""
+        with self._lock:
+            self._stopping = True
+            executor = self._executor
+        self._wakeup.set()
+        if executor is None:
+            return True
+        executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            # Their futures were cancelled (or a worker will skip them), so they would stay 'queued' forever
+            now = time.time()
+            for job in self._queued.values():
+                job.status, job.error, job.finished_at = 'cancelled', 'Cancelled at shutdown', now
+                self.cancelled += 1
+            self._queued.clear()
+            self._trim()
+        deadline = time.monotonic() + timeout
+        while self._running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self._running == 0
+
+
+def accepted(job):
+    """202 response for a route that handed its work to `job`"""
+    return jsonify({'job': job.to_dict()}), 202, {'Location': f'/api/jobs/{job.id}'}
+
+
+runner = JobRunner()
+
+register = runner.register
+schedule = runner.schedule
+submit = runner.submit
@@ -0,0 +1,90 @@
+"""
+Maintenance jobs
+Database upkeep registered with the background job runner: backups, query
+planner statistics and search index merging, and the rollup rebuild. Each
+can be started with POST /api/jobs; backups and optimization also run on a
+schedule (see README, "Background Jobs").
+"""
+
+from datetime import datetime
+import glob
+import os
+import sqlite3
+import time
+from sqlalchemy import text
+from app.services import jobs
+
+BACKUP_DIR = os.getenv('BACKUP_DIR', 'data/backups')
+BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '7'))  # newest backups kept, older ones are deleted
+BACKUP_AT = os.getenv('BACKUP_AT', '')  # HH:MM for a daily backup, empty = only on request
+OPTIMIZE_EVERY_HOURS = float(os.getenv('OPTIMIZE_EVERY_HOURS', '24'))  # 0 = only on request
+
+
+def backup_database():
+    """Write a compacted, consistent copy of the database to BACKUP_DIR and prune old copies"""
+    from app.database import DATABASE_PATH
+
+    started = time.perf_counter()
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(BACKUP_DIR, f'dashboard-{stamp}.db')
+    copy = 1
+    while os.path.exists(path):  # VACUUM INTO refuses to overwrite
+        copy += 1
+        path = os.path.join(BACKUP_DIR, f'dashboard-{stamp}-{copy}.db')
+
+    # A connection of its own: VACUUM INTO reads one snapshot (under WAL, writers
+    # carry on meanwhile) and does not tie up the app's single writer connection
+    connection = sqlite3.connect(DATABASE_PATH)
+    try:
+        connection.execute('VACUUM INTO ?', (path,))
+    finally:
+        connection.close()
+
+    backups = sorted(glob.glob(os.path.join(BACKUP_DIR, 'dashboard-*.db')), key=os.path.getmtime)
+    removed = backups[:max(0, len(backups) - BACKUP_KEEP)]
+    for old in removed:
+        os.remove(old)
+
+    return {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'removed': [os.path.basename(old) for old in removed],
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def optimize_database():
+    """Refresh the query planner's statistics and merge search index segments"""
+    from app.database import db_session
+    from app.services import search
+
+    started = time.perf_counter()
+    search.merge(db_session)
+    db_session.commit()
+    db_session.execute(text('PRAGMA optimize'))
+    db_session.commit()
+    return {'seconds': round(time.perf_counter() - started, 3)}
+
+
+def rebuild_rollups():
+    """Recompute task stats rollups, project task counters and health rollups"""
+    from app.database import db_session
+    from app.services import health_series, project_counters, task_rollups
+
+    started = time.perf_counter()
+    task_rollups.rebuild(db_session)
+    project_counters.rebuild(db_session)
+    health_series.rebuild(db_session)
+    db_session.commit()
+    return {'seconds': round(time.perf_counter() - started, 3)}
+
+
+jobs.register('backup', backup_database, submittable=True)
+jobs.register('optimize', optimize_database, submittable=True)
+jobs.register('rebuild-rollups', rebuild_rollups, submittable=True)
+
+if BACKUP_AT:
+    jobs.schedule('backup', every=jobs.DAY, at=BACKUP_AT)
+if OPTIMIZE_EVERY_HOURS:
+    jobs.schedule('optimize', every=OPTIMIZE_EVERY_HOURS * 3600)
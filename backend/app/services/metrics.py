@@ -0,0 +1,182 @@
+"""
+Request and SQL metrics
+app.database hooks every engine's cursor execution into record_query(), which
+adds the statement's time to the current request (tracked per thread) and
+keeps a bounded sample of slow statements with their parameters. init_app()
+times each request, adds a Server-Timing header and feeds per-route latency
+histograms that /api/metrics reports as p50/p95/p99. Statements run while a
+streamed body (NDJSON, SSE) is generated come after the headers are sent and
+only show up in the slow query samples.
+
+With SQL_METRICS=0 no engine listeners or request hooks are installed, so the
+only cost is the flag check at startup.
+"""
+
+from collections import deque
+from bisect import bisect_left
+import os
+import threading
+import time
+
+SQL_METRICS = os.getenv('SQL_METRICS', '1') == '1'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '50'))
+SLOW_QUERY_SAMPLES = int(os.getenv('SLOW_QUERY_SAMPLES', '50'))
+
+# Histogram bucket upper bounds in ms: 0.1ms to ~2 minutes in steps of 25%
+BUCKET_BOUNDS = [0.1 * 1.25 ** i for i in range(64)]
+
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'db_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class Histogram:
+    """Fixed log-spaced buckets: O(1) to record, percentiles accurate to a bucket (25%)"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms):
+        self.buckets[bisect_left(BUCKET_BOUNDS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.max_queries = 0
+
+    def to_dict(self):
+        count = self.latency.count
+        return {
+            'requests': count,
+            'p50Ms': self.latency.percentile(0.50),
+            'p95Ms': self.latency.percentile(0.95),
+            'p99Ms': self.latency.percentile(0.99),
+            'maxMs': round(self.latency.max, 3),
+            'meanMs': round(self.latency.total / count, 3) if count else None,
+            'queries': self.queries,
+            'queriesPerRequest': round(self.queries / count, 2) if count else None,
+            'maxQueries': self.max_queries,
+            'dbMsPerRequest': round(self.db_ms / count, 3) if count else None
+        }
+
+
+_routes = {}
+_slow_queries = deque(maxlen=SLOW_QUERY_SAMPLES)
+_sources = {}
+
+
+def _format_parameters(parameters, executemany):
+    if executemany:
+        shown = repr(list(parameters[:3]))
+        return f'{shown} (+{len(parameters) - 3} more)' if len(parameters) > 3 else shown
+    return repr(parameters)[:500]
+
+
+def record_query(statement, parameters, executemany, seconds):
+    """Called by the engine hooks for every statement"""
+    stats = getattr(_local, 'request', None)
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+    ms = seconds * 1000
+    if ms >= SLOW_QUERY_MS:
+        _slow_queries.append({
+            'ms': round(ms, 3),
+            'route': getattr(_local, 'route', None),
+            'statement': statement,
+            'parameters': _format_parameters(parameters, executemany),
+            'at': time.time()
+        })
+
+
+def init_app(app):
+    """Install the request timing hooks (no-op when SQL_METRICS=0)"""
+    if not SQL_METRICS:
+        return
+
+    from flask import request
+
+    @app.before_request
+    def start_request_metrics():
+        _local.request = RequestStats()
+        _local.route = f'{request.method} {request.url_rule.rule if request.url_rule else "<unmatched>"}'
+
+    @app.after_request
+    def finish_request_metrics(response):
+        stats = getattr(_local, 'request', None)
+        if stats is None:
+            return response
+        route = _local.route
+        _local.request = _local.route = None
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_seconds * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_ms:.2f};desc="{stats.queries} queries", app;dur={total_ms - db_ms:.2f}, total;dur={total_ms:.2f}'
+        )
+
+        with _lock:
+            route_stats = _routes.get(route)
+            if route_stats is None:
+                route_stats = _routes[route] = RouteStats()
+            route_stats.latency.record(total_ms)
+            route_stats.queries += stats.queries
+            route_stats.db_ms += db_ms
+            route_stats.max_queries = max(route_stats.max_queries, stats.queries)
+        return response
+
+
+def register_source(name, stats):
+    """Add `name: stats()` to every snapshot (e.g. the production server's worker counters)"""
+    _sources[name] = stats
+
+
+def snapshot():
+    """Per-route latency/query stats plus the most recent slow statements"""
+    with _lock:
+        routes = {route: stats.to_dict() for route, stats in sorted(_routes.items())}
+    data = {
+        'enabled': SQL_METRICS,
+        'slowQueryMs': SLOW_QUERY_MS,
+        'routes': routes,
+        'slowQueries': list(reversed(_slow_queries))
+    }
+    data.update({name: stats() for name, stats in _sources.items()})
+    return data
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+        _slow_queries.clear()
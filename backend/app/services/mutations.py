@@ -0,0 +1,387 @@
+"""
+Write operations for tasks, projects and project tasks
+Shared by the REST routes and /api/batch. Nothing here commits: callers commit
+once per request (or once per batch), so all side effects such as the task
+rollups land in the same transaction as the row change. Change events for
+/api/events are queued on the session and only published once it commits.
+"""
+
+from datetime import datetime
+from app.models.tasks import Task, TaskSeries, TaskSeriesSkip
+from app.models.projects import Project, ProjectTask
+from app.services import change_versions, events, project_counters, recurrence, task_rollups
+
+
+class MutationError(Exception):
+    """A client error (bad input, missing row) with the HTTP status to report"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value).date() if value else None
+
+
+def _parse_time(value):
+    return datetime.strptime(value, '%H:%M:%S').time() if value else None
+
+
+# Tasks
+
+def get_task(session, task_id):
+    task = session.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise MutationError('Task not found', 404)
+    return task
+
+
+def create_task(session, data):
+    # Validate required fields
+    if not data.get('title'):
+        raise MutationError('Title is required')
+
+    task = Task(
+        title=data['title'],
+        category=data.get('category'),
+        status=data.get('status', 'pending'),
+        date=_parse_date(data.get('date')),
+        time=_parse_time(data.get('time')),
+        priority=data.get('priority', 0),
+        notes=data.get('notes')
+    )
+
+    task.version = change_versions.bump(session, 'tasks')
+    session.add(task)
+    session.flush()
+    task_rollups.apply_task_change(session, after=task_rollups.rollup_key(task))
+    events.queue(session, 'task', task.id, 'create', task.version)
+    return task
+
+
+def update_task(session, task_id, data):
+    task = get_task(session, task_id)
+    before = task_rollups.rollup_key(task)
+
+    if 'title' in data:
+        task.title = data['title']
+    if 'category' in data:
+        task.category = data['category']
+    if 'status' in data:
+        task.status = data['status']
+    if 'date' in data:
+        task.date = _parse_date(data['date'])
+    if 'time' in data:
+        task.time = _parse_time(data['time'])
+    if 'priority' in data:
+        task.priority = data['priority']
+    if 'notes' in data:
+        task.notes = data['notes']
+
+    task_rollups.apply_task_change(session, before, task_rollups.rollup_key(task))
+    task.version = change_versions.bump(session, 'tasks')
+    events.queue(session, 'task', task.id, 'update', task.version)
+    return task
+
+
+def complete_task(session, task_id):
+    task = get_task(session, task_id)
+    before = task_rollups.rollup_key(task)
+
+    task.status = 'completed'
+    task.completed_at = datetime.utcnow()
+
+    task_rollups.apply_task_change(session, before, task_rollups.rollup_key(task))
+    task.version = change_versions.bump(session, 'tasks')
+    events.queue(session, 'task', task.id, 'complete', task.version)
+    return task
+
+
+def delete_task(session, task_id):
+    task = get_task(session, task_id)
+    task_rollups.apply_task_change(session, before=task_rollups.rollup_key(task))
+    session.delete(task)
+    version = change_versions.bump(session, 'tasks')
+    change_versions.record_deletes(session, 'task', [task_id], version)
+    events.queue(session, 'task', task_id, 'delete', version)
+    if task.series_id is not None:
+        _skip_occurrence(session, task.series_id, task.occurrence_date, version)
+
+
+# Task series (recurring tasks)
+
+def get_series(session, series_id):
+    series = session.query(TaskSeries).filter(TaskSeries.id == series_id).first()
+    if not series:
+        raise MutationError('Series not found', 404)
+    return series
+
+
+def _apply_series_fields(series, data):
+    if 'title' in data:
+        series.title = data['title']
+    if 'category' in data:
+        series.category = data['category']
+    if 'interval' in data:
+        series.interval = data['interval']
+    if 'weekdays' in data:
+        weekdays = data['weekdays'] or []
+        if not isinstance(weekdays, list) or any(not isinstance(day, int) or not 0 <= day <= 6 for day in weekdays):
+            raise MutationError('weekdays must be a list of 0 (Monday) to 6 (Sunday)')
+        series.weekdays = recurrence.weekday_mask(weekdays) or None
+    if 'month_day' in data:
+        series.month_day = data['month_day']
+    if 'start_date' in data:
+        series.start_date = _parse_date(data['start_date'])
+    if 'end_date' in data:
+        series.end_date = _parse_date(data['end_date'])
+    if 'time' in data:
+        series.time = _parse_time(data['time'])
+    if 'priority' in data:
+        series.priority = data['priority']
+    if 'notes' in data:
+        series.notes = data['notes']
+
+    if not series.title:
+        raise MutationError('Title is required')
+    if series.category not in recurrence.CATEGORIES:
+        raise MutationError(f"category must be one of {', '.join(recurrence.CATEGORIES)}")
+    if not isinstance(series.interval, int) or series.interval < 1:
+        raise MutationError('interval must be a positive integer')
+    if series.month_day is not None and (not isinstance(series.month_day, int) or not 1 <= abs(series.month_day) <= 31):
+        raise MutationError('month_day must be 1 to 31, or -1 (last day) to -31')
+    if not series.start_date:
+        raise MutationError('start_date is required')
+
+
+def create_series(session, data):
+    series = TaskSeries(
+        title=data.get('title'),
+        category=data.get('category'),
+        interval=data.get('interval', 1),
+        start_date=datetime.now().date(),
+        priority=data.get('priority', 0)
+    )
+    _apply_series_fields(series, data)
+
+    series.version = change_versions.bump(session, 'tasks')
+    session.add(series)
+    session.flush()
+    events.queue(session, 'task_series', series.id, 'create', series.version)
+    return series
+
+
+def update_series(session, series_id, data):
+    """Change a series' rule; occurrences already materialized keep their rows"""
+    series = get_series(session, series_id)
+    _apply_series_fields(series, data)
+
+    series.version = change_versions.bump(session, 'tasks')
+    events.queue(session, 'task_series', series.id, 'update', series.version)
+    return series
+
+
+def delete_series(session, series_id):
+    """Stop a series; its materialized (completed or edited) occurrences remain as tasks"""
+    series = get_series(session, series_id)
+    session.delete(series)
+    version = change_versions.bump(session, 'tasks')
+    change_versions.record_deletes(session, 'task_series', [series_id], version)
+    events.queue(session, 'task_series', series_id, 'delete', version)
+
+
+def _skip_occurrence(session, series_id, day, version):
+    """Keep a deleted occurrence from being generated again; the series is re-stamped so delta sync sends the skip"""
+    series = session.get(TaskSeries, series_id)
+    if series is None:
+        return  # the series is gone; its leftover tasks are plain tasks
+    if all(skip.occurrence_date != day for skip in series.skips):
+        series.skips.append(TaskSeriesSkip(occurrence_date=day))
+    series.version = version
+    events.queue(session, 'task_series', series_id, 'update', version)
+
+
+def _parse_occurrence(series, occurrence_date):
+    """The date of one of the series' (not deleted) occurrences, or MutationError"""
+    try:
+        day = _parse_date(occurrence_date)
+    except ValueError:
+        raise MutationError('occurrence date must be YYYY-MM-DD')
+    if not day or not recurrence.is_occurrence(series, day):
+        raise MutationError(f'{occurrence_date} is not an occurrence of this series', 404)
+    if any(skip.occurrence_date == day for skip in series.skips):
+        raise MutationError(f'The {occurrence_date} occurrence was deleted', 404)
+    return day
+
+
+def materialize_occurrence(session, series_id, occurrence_date):
+    """Return the Task row for one occurrence of a series, writing it on first use"""
+    series = get_series(session, series_id)
+    day = _parse_occurrence(series, occurrence_date)
+
+    task = session.query(Task).filter(Task.series_id == series_id, Task.occurrence_date == day).first()
+    if task:
+        return task
+
+    task = Task(
+        title=series.title,
+        category=series.category,
+        status='pending',
+        date=day,
+        time=series.time,
+        priority=series.priority,
+        notes=series.notes,
+        series_id=series_id,
+        occurrence_date=day
+    )
+
+    task.version = change_versions.bump(session, 'tasks')
+    session.add(task)
+    session.flush()
+    task_rollups.apply_task_change(session, after=task_rollups.rollup_key(task))
+    events.queue(session, 'task', task.id, 'create', task.version)
+    return task
+
+
+def update_occurrence(session, series_id, occurrence_date, data):
+    task = materialize_occurrence(session, series_id, occurrence_date)
+    return update_task(session, task.id, data)
+
+
+def complete_occurrence(session, series_id, occurrence_date):
+    task = materialize_occurrence(session, series_id, occurrence_date)
+    return complete_task(session, task.id)
+
+
+def delete_occurrence(session, series_id, occurrence_date):
+    """Remove one occurrence of a series, materialized or not; it is not generated again"""
+    series = get_series(session, series_id)
+    day = _parse_occurrence(series, occurrence_date)
+
+    task = session.query(Task).filter(Task.series_id == series_id, Task.occurrence_date == day).first()
+    if task:
+        delete_task(session, task.id)
+    else:
+        _skip_occurrence(session, series_id, day, change_versions.bump(session, 'tasks'))
+
+
+# Projects
+
+def get_project(session, project_id):
+    project = session.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise MutationError('Project not found', 404)
+    return project
+
+
+def create_project(session, data):
+    # Validate required fields
+    if not data.get('name'):
+        raise MutationError('Name is required')
+
+    project = Project(
+        name=data['name'],
+        description=data.get('description'),
+        status=data.get('status', 'active'),
+        progress=data.get('progress', 0),
+        next_step=data.get('next_step'),
+        obsidian_link=data.get('obsidian_link'),
+        is_main=data.get('is_main', False)
+    )
+
+    project.version = change_versions.bump(session, 'projects')
+    session.add(project)
+    session.flush()
+    events.queue(session, 'project', project.id, 'create', project.version)
+    return project
+
+
+def update_project(session, project_id, data):
+    project = get_project(session, project_id)
+
+    if 'name' in data:
+        project.name = data['name']
+    if 'description' in data:
+        project.description = data['description']
+    if 'status' in data:
+        project.status = data['status']
+    if 'progress' in data:
+        project.progress = data['progress']
+    if 'next_step' in data:
+        project.next_step = data['next_step']
+    if 'obsidian_link' in data:
+        project.obsidian_link = data['obsidian_link']
+    if 'is_main' in data:
+        project.is_main = data['is_main']
+
+    project.version = change_versions.bump(session, 'projects')
+    events.queue(session, 'project', project.id, 'update', project.version)
+    return project
+
+
+def delete_project(session, project_id):
+    """Delete a project and all its tasks (cascade)"""
+    project = get_project(session, project_id)
+    task_ids = [task.id for task in project.tasks]
+    session.delete(project)
+
+    # The delete-orphan cascade removes the project's tasks too, so tombstone them as well
+    version = change_versions.bump(session, 'projects')
+    change_versions.record_deletes(session, 'project', [project_id], version)
+    change_versions.record_deletes(session, 'project_task', task_ids, version)
+    events.queue(session, 'project', project_id, 'delete', version)
+
+
+# Project tasks
+
+def get_project_task(session, project_id, task_id):
+    task = session.query(ProjectTask).filter(
+        ProjectTask.id == task_id,
+        ProjectTask.project_id == project_id
+    ).first()
+    if not task:
+        raise MutationError('Task not found', 404)
+    return task
+
+
+def create_project_task(session, project_id, data):
+    # Verify project exists
+    get_project(session, project_id)
+
+    # Validate required fields
+    if not data.get('title'):
+        raise MutationError('Title is required')
+
+    task = ProjectTask(
+        project_id=project_id,
+        title=data['title'],
+        completed=data.get('completed', False),
+        order=data.get('order', 0)
+    )
+
+    task.version = change_versions.bump(session, 'projects')
+    session.add(task)
+    session.flush()
+    project_counters.apply(session, project_id, task.version, tasks=1, completed=1 if task.completed else 0)
+    events.queue(session, 'project_task', task.id, 'create', task.version)
+    return task
+
+
+def toggle_project_task(session, project_id, task_id):
+    task = get_project_task(session, project_id, task_id)
+    task.completed = not task.completed
+    task.version = change_versions.bump(session, 'projects')
+    project_counters.apply(session, project_id, task.version, completed=1 if task.completed else -1)
+    events.queue(session, 'project_task', task.id, 'update', task.version)
+    return task
+
+
+def delete_project_task(session, project_id, task_id):
+    task = get_project_task(session, project_id, task_id)
+    session.delete(task)
+    version = change_versions.bump(session, 'projects')
+    project_counters.apply(session, project_id, version, tasks=-1, completed=-1 if task.completed else 0)
+    change_versions.record_deletes(session, 'project_task', [task_id], version)
+    events.queue(session, 'project_task', task_id, 'delete', version)
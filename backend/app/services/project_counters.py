@@ -0,0 +1,67 @@
+"""
+Project task counters
+projects.task_count and projects.completed_count mirror each project's
+tasks. Project task writes adjust them with a single UPDATE ... SET
+count = count + n in the same transaction, without reading anything, so
+project listings can show real progress without touching project_tasks.
+"""
+
+from sqlalchemy import select, update, func, case
+from sqlalchemy.orm.util import identity_key
+from app.models.projects import Project, ProjectTask
+
+
+def apply(session, project_id, version, tasks=0, completed=0):
+    """Add `tasks`/`completed` (may be negative) to a project's counters and stamp its version
+
+    The UPDATE bypasses the ORM, so pending changes are flushed first (a dirty
+    Project flushed later would write back an older version) and a loaded
+    Project has the touched columns expired afterwards.
+    """
+    session.flush()
+    session.execute(
+        update(Project)
+        .where(Project.id == project_id)
+        .values(
+            task_count=Project.task_count + tasks,
+            completed_count=Project.completed_count + completed,
+            version=version,  # so /api/projects/changes picks up the new counts
+            updated_at=Project.updated_at  # a counter change is not an edit; keeps onupdate from firing
+        )
+        .execution_options(synchronize_session=False)
+    )
+    project = session.identity_map.get(identity_key(Project, project_id))
+    if project is not None:
+        session.expire(project, ['task_count', 'completed_count', 'version'])
+
+
+def auto_progress():
+    """SQL expression for progress derived from the counters: completed share in %, rounded half up"""
+    return case(
+        (Project.task_count > 0,
+         (Project.completed_count * 200 + Project.task_count) // (Project.task_count * 2)),
+        else_=0
+    )
+
+
+def rebuild(session):
+    """Recompute every project's counters from project_tasks"""
+    session.execute(
+        update(Project).values(
+            task_count=select(func.count(ProjectTask.id))
+            .where(ProjectTask.project_id == Project.id)
+            .scalar_subquery(),
+            completed_count=select(func.count(ProjectTask.id))
+            .where(ProjectTask.project_id == Project.id, ProjectTask.completed.is_(True))
+            .scalar_subquery(),
+            updated_at=Project.updated_at
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def ensure_built(session):
+    """Fill in the counters for projects created before they existed"""
+    missing = session.execute(select(Project.id).where(Project.task_count.is_(None)).limit(1)).first()
+    if missing:
+        rebuild(session)
+        session.commit()
@@ -0,0 +1,58 @@
+"""
+Project read path
+Loads projects and their tasks with a fixed number of queries (one for the
+projects, one for all of their tasks, or only the first when the task
+counters are enough) and serializes the plain rows straight
+to the same JSON shape as Project.to_dict(include_tasks=True) with the
+precompiled row serializers.
+"""
+
+from sqlalchemy import select
+from app.models.projects import Project, ProjectTask
+from app.services.serializers import PROJECT, PROJECT_AUTO_PROGRESS, PROJECT_TASK
+
+
+def project_row_to_dict(row, tasks):
+    """Serialize a projects row plus its already serialized tasks (omitted when None)"""
+    data = PROJECT.row_to_dict(row)
+    if tasks is not None:
+        data['tasks'] = tasks
+    return data
+
+
+def fetch_projects(session, *criteria, include_tasks=True, auto_progress=False):
+    """Return serialized projects (with tasks) matching the given filter criteria
+
+    include_tasks=False answers from the projects table alone (the task
+    counters are on the rows); auto_progress=True reports progress computed
+    from those counters instead of the stored value.
+    """
+    project_ids = select(Project.id).where(*criteria)
+    serializer = PROJECT_AUTO_PROGRESS if auto_progress else PROJECT
+
+    # Core execution on the session's connection: plain rows, no ORM loading overhead
+    connection = session.connection()
+    project_rows = connection.execute(
+        select(*serializer.columns).where(*criteria).order_by(Project.id)
+    ).all()
+    if not project_rows:
+        return []
+    if not include_tasks:
+        return serializer.rows_to_dicts(project_rows)
+
+    tasks_by_project = {row[0]: [] for row in project_rows}
+    task_rows = connection.execute(
+        select(*PROJECT_TASK.columns)
+        .where(ProjectTask.project_id.in_(project_ids))
+        .order_by(ProjectTask.id)
+    )
+    for row in task_rows:
+        tasks_by_project[row[1]].append(PROJECT_TASK.row_to_dict(row))
+
+    return [project_row_to_dict(row, tasks_by_project[row[0]]) for row in project_rows]
+
+
+def fetch_project(session, project_id, auto_progress=False):
+    """Return one serialized project (with tasks), or None if it does not exist"""
+    projects = fetch_projects(session, Project.id == project_id, auto_progress=auto_progress)
+    return projects[0] if projects else None
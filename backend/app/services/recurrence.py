@@ -0,0 +1,164 @@
+"""
+Recurrence
+Daily/Weekly/Monthly tasks are stored as one TaskSeries rule. Occurrences in
+a date range are generated arithmetically from the rule: the first occurrence
+on or after the range start is computed directly rather than stepped to from
+the series start, so expanding a range costs O(occurrences in range) however
+old the series is.
+
+Occurrences stay virtual (id None) until they are completed or edited, at
+which point a Task row is materialized for that (series_id, occurrence_date)
+slot. Range queries merge both: materialized rows replace their slot.
+Deleting an occurrence records a TaskSeriesSkip, which keeps its slot empty.
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+from sqlalchemy import select, or_, and_
+from app.models.tasks import Task, TaskSeries, TaskSeriesSkip
+from app.services.serializers import TASK, iso_text
+
+CATEGORIES = ('Daily', 'Weekly', 'Monthly')
+
+
+def weekday_mask(weekdays):
+    """Bit mask for a list of weekdays (0 = Monday ... 6 = Sunday)"""
+    mask = 0
+    for day in weekdays:
+        mask |= 1 << day
+    return mask
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _day_in_month(index, month_day):
+    """Date of month_day (negative counts back from the last day) in month `index`, clamped to the month"""
+    year, month = divmod(index, 12)
+    last = monthrange(year, month + 1)[1]
+    day = min(month_day, last) if month_day > 0 else max(1, last + month_day + 1)
+    return date(year, month + 1, day)
+
+
+def _daily(series, start, end):
+    interval = series.interval or 1
+    step = timedelta(days=interval)
+    day = series.start_date + timedelta(days=_ceil_div((start - series.start_date).days, interval) * interval)
+    while day <= end:
+        yield day
+        day += step
+
+
+def _weekly(series, start, end):
+    interval = series.interval or 1
+    weekdays = [day for day in range(7) if (series.weekdays or weekday_mask([series.start_date.weekday()])) & (1 << day)]
+    anchor = series.start_date - timedelta(days=series.start_date.weekday())  # Monday of the first week
+
+    # First week in the series' cadence that can contain `start`
+    week = _ceil_div((start - anchor).days // 7, interval) * interval
+    monday = anchor + timedelta(weeks=week)
+    while monday <= end:
+        for weekday in weekdays:
+            day = monday + timedelta(days=weekday)
+            if start <= day <= end:
+                yield day
+        monday += timedelta(weeks=interval)
+
+
+def _monthly(series, start, end):
+    interval = series.interval or 1
+    month_day = series.month_day or series.start_date.day
+    first = _month_index(series.start_date)
+
+    index = first + _ceil_div(_month_index(start) - first, interval) * interval
+    while index <= _month_index(end):
+        day = _day_in_month(index, month_day)
+        if start <= day <= end:
+            yield day
+        index += interval
+
+
+_EXPANDERS = {'Daily': _daily, 'Weekly': _weekly, 'Monthly': _monthly}
+
+
+def occurrences(series, start, end):
+    """Yield the dates of a series' occurrences between start and end (inclusive), in order"""
+    start = max(start, series.start_date)
+    if series.end_date is not None:
+        end = min(end, series.end_date)
+    if start > end:
+        return
+    yield from _EXPANDERS[series.category](series, start, end)
+
+
+def is_occurrence(series, day):
+    return next(occurrences(series, day, day), None) is not None
+
+
+def virtual_task(series, day):
+    """The to_dict() shape of an occurrence that has no Task row yet"""
+    return {
+        'id': None,
+        'title': series.title,
+        'category': series.category,
+        'status': 'pending',
+        'date': day.isoformat(),
+        'time': series.time.isoformat() if series.time else None,
+        'priority': series.priority,
+        'notes': series.notes,
+        'created_at': series.created_at.isoformat() if series.created_at else None,
+        'completed_at': None,
+        'series_id': series.id,
+        'occurrence_date': day.isoformat()
+    }
+
+
+def sort_key(task):
+    # (date, time) with untimed tasks first, like the task listing's NULL ordering
+    return task['date'] or '', task['time'] or '', task['series_id'] or 0, task['id'] or 0
+
+
+def expand(session, start, end, category=None):
+    """Occurrences of every series between start and end (inclusive), as task dicts ordered by (date, time)
+
+    Materialized occurrences are returned as their Task row (placed by its own
+    date, which an edit may have moved); the rest are generated, except
+    deleted (skipped) ones.
+    """
+    query = session.query(TaskSeries).filter(
+        TaskSeries.start_date <= end,
+        or_(TaskSeries.end_date.is_(None), TaskSeries.end_date >= start)
+    )
+    if category:
+        query = query.filter(TaskSeries.category == category)
+    series_list = query.all()
+
+    # Materialized rows whose slot or (moved) date falls in the range; both are index range scans
+    rows = TASK.fetch(session, select(*TASK.columns).where(
+        Task.series_id.isnot(None),
+        or_(
+            Task.occurrence_date.between(start, end),
+            and_(Task.date >= start, Task.date <= end)
+        ),
+        *([Task.category == category] if category else [])
+    ))
+    taken = {(row['series_id'], row['occurrence_date']) for row in rows}
+    taken.update(session.execute(
+        select(TaskSeriesSkip.series_id, iso_text(TaskSeriesSkip.occurrence_date))
+        .where(TaskSeriesSkip.occurrence_date.between(start, end))
+    ).tuples())
+    first, last = start.isoformat(), end.isoformat()
+    tasks = [row for row in rows if row['date'] and first <= row['date'] <= last]
+
+    for series in series_list:
+        for day in occurrences(series, start, end):
+            if (series.id, day.isoformat()) not in taken:
+                tasks.append(virtual_task(series, day))
+
+    tasks.sort(key=sort_key)
+    return tasks
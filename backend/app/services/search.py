@@ -0,0 +1,231 @@
+"""
+Search
+Full-text search over tasks, projects and project tasks with SQLite FTS5.
+
+Each searchable table has an external-content FTS5 index (the text is read
+back from the table itself, so only the inverted index is stored) kept in
+step by AFTER INSERT/DELETE/UPDATE triggers. Every write path - mutations,
+batch, bulk imports, cascading deletes - updates the index in the same
+transaction without knowing about it, and updates that do not touch the
+indexed columns (status toggles, reordering, counters) skip it entirely.
+
+Results are ranked with bm25(), titles weighted above body text, and come
+with a highlighted snippet of the best matching column. Snippets are
+HTML: the text is escaped and matched terms are wrapped in <mark>.
+"""
+
+import html
+import re
+from sqlalchemy import Column, MetaData, Table, delete, insert, select, text
+
+# Highlight markers around matched terms in snippets. snippet() does not escape
+# the text, so it marks matches with private-use sentinels that are swapped for
+# these tags once the text has been HTML-escaped.
+SNIPPET_OPEN = '<mark>'
+SNIPPET_CLOSE = '</mark>'
+_SENTINEL_OPEN = '\ue000'
+_SENTINEL_CLOSE = '\ue001'
+SNIPPET_TOKENS = 12
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Index pages merged per index by the periodic maintenance job
+MERGE_PAGES = 2000
+
+# unicode61 folds case and diacritics
+TOKENIZE = "unicode61 remove_diacritics 2"
+
+# The word being typed matches as a prefix from this length on (backed by a
+# prefix index); shorter prefixes would rank a large share of every table
+MIN_PREFIX = 3
+PREFIX = str(MIN_PREFIX)
+
+
+class FtsIndex:
+    """An FTS5 index over some text columns of a table, and how its hits are returned"""
+
+    def __init__(self, kind, table, columns, weights, fields):
+        self.kind = kind
+        self.table = table
+        self.name = f'{table}_fts'
+        self.columns = columns
+        self.weights = weights  # bm25 weight per column
+        self.fields = fields  # {result key: column of `table`} returned with each hit
+
+    def statements(self):
+        """DDL for the virtual table and the triggers that keep it current"""
+        columns = ', '.join(self.columns)
+        new = ', '.join(f'new.{column}' for column in self.columns)
+        old = ', '.join(f'old.{column}' for column in self.columns)
+        insert = f"INSERT INTO {self.name}(rowid, {columns}) VALUES (new.id, {new});"
+        delete = f"INSERT INTO {self.name}({self.name}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+        return [
+            f"CREATE VIRTUAL TABLE {self.name} USING fts5({columns}, "
+            f"content='{self.table}', content_rowid='id', tokenize='{TOKENIZE}', prefix='{PREFIX}')",
+            f"CREATE TRIGGER {self.name}_ai AFTER INSERT ON {self.table} BEGIN {insert} END",
+            f"CREATE TRIGGER {self.name}_ad AFTER DELETE ON {self.table} BEGIN {delete} END",
+            f"CREATE TRIGGER {self.name}_au AFTER UPDATE OF {columns} ON {self.table} BEGIN {delete} {insert} END",
+        ]
+
+    def query(self):
+        """Rank every match by bm25, then fetch rows and build snippets for the top `limit` only"""
+        fields = ', '.join(f'c.{column} AS {key}' for key, column in self.fields.items())
+        weights = ', '.join(str(weight) for weight in self.weights)
+        # CROSS JOIN keeps the ranked hits as the outer loop, so the index is
+        # probed by rowid for each snippet instead of scanning the match again
+        return text(
+            f"SELECT {fields}, hits.score, "
+            f"snippet({self.name}, -1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet "
+            f"FROM (SELECT rowid, bm25({self.name}, {weights}) AS score FROM {self.name} "
+            f"WHERE {self.name} MATCH :match ORDER BY score LIMIT :limit) hits "
+            f"CROSS JOIN {self.name} ON {self.name}.rowid = hits.rowid AND {self.name} MATCH :match "
+            f"CROSS JOIN {self.table} c ON c.id = hits.rowid "
+            f"ORDER BY hits.score"
+        )
+
+
+INDEXES = {
+    index.kind: index for index in (
+        FtsIndex('task', 'tasks', ['title', 'notes'], [10.0, 1.0],
+                 {'id': 'id', 'title': 'title', 'status': 'status', 'date': 'date', 'category': 'category'}),
+        FtsIndex('project', 'projects', ['name', 'description', 'next_step'], [10.0, 1.0, 2.0],
+                 {'id': 'id', 'title': 'name', 'status': 'status'}),
+        FtsIndex('project_task', 'project_tasks', ['title'], [1.0],
+                 {'id': 'id', 'title': 'title', 'project_id': 'project_id', 'completed': 'completed'}),
+    )
+}
+
+
+def statements():
+    """All search DDL, in order (part of the schema fingerprint in app.database)"""
+    return [statement for index in INDEXES.values() for statement in index.statements()]
+
+
+def ensure_built(connection):
+    """Create missing or changed indexes (filled from their tables) and (re)create the triggers"""
+    existing = dict(connection.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'"
+    ).fetchall())
+    for index in INDEXES.values():
+        create, *triggers = index.statements()
+        for suffix in ('ai', 'ad', 'au'):
+            connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {index.name}_{suffix}')
+        if existing.get(index.name) != create:
+            # New index, or its columns/options changed: the tables hold the text, so rebuild
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS {index.name}')
+            connection.exec_driver_sql(create)
+            connection.exec_driver_sql(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')")
+        for trigger in triggers:
+            connection.exec_driver_sql(trigger)
+
+
+def rebuild(session, optimize=True):
+    """Re-read every index from its table, then merge its segments (does not commit)"""
+    for index in INDEXES.values():
+        session.execute(text(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')"))
+        if optimize:
+            session.execute(text(f"INSERT INTO {index.name}({index.name}) VALUES ('optimize')"))
+
+
+def merge(session, pages=MERGE_PAGES):
+    """Merge index segments, writing at most about `pages` pages per index (does not commit)
+
+    Bounded work, unlike rebuild()'s full 'optimize', so a periodic job does
+    not hold the writer for long on a large index.
+    """
+    for index in INDEXES.values():
+        session.execute(text(f"INSERT INTO {index.name}({index.name}, rank) VALUES ('merge', :pages)"), {'pages': pages})
+
+
+def match_expression(query):
+    """FTS5 MATCH expression for free text: every word must match, the last one also as a prefix
+
+    Words are quoted, so operators and punctuation typed by the user are searched
+    for literally instead of being parsed as FTS5 syntax. Returns None when the
+    query has no words.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if not query[-1].isspace() and len(words[-1]) >= MIN_PREFIX:
+        terms[-1] += '*'  # still typing the last word
+    return ' '.join(terms)
+
+
+def parse_kinds(value):
+    """Validate a comma separated ?type= list; all kinds when empty"""
+    if not value:
+        return list(INDEXES)
+    kinds = [kind.strip() for kind in value.split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in INDEXES]
+    if unknown:
+        raise ValueError(f"Unknown type {', '.join(unknown)}; expected {', '.join(INDEXES)}")
+    return kinds
+
+
+def search(session, query, kinds=None, limit=DEFAULT_LIMIT):
+    """Best `limit` hits for `query` across the given kinds, best first
+
+    Each index returns its own top `limit` by bm25 score, which are then merged.
+    Scores are negated bm25 values, so higher is better.
+    """
+    match = match_expression(query)
+    results = []
+    if match is not None:
+        params = {'match': match, 'limit': limit, 'open': _SENTINEL_OPEN, 'close': _SENTINEL_CLOSE}
+        for kind in kinds or INDEXES:
+            for row in session.execute(INDEXES[kind].query(), params).mappings():
+                hit = dict(row)
+                hit['score'] = round(-hit['score'], 6)
+                hit['snippet'] = highlight(hit['snippet'])
+                if 'completed' in hit:
+                    hit['completed'] = bool(hit['completed'])
+                results.append({'type': kind, **hit})
+        results.sort(key=lambda hit: -hit['score'])
+
+    return {
+        'query': query,
+        'match': match,
+        'results': results[:limit]
+    }
+
+
+def highlight(snippet):
+    """HTML-escape a sentinel-marked snippet and turn the sentinels into <mark> tags"""
+    if snippet is None:
+        return None
+    return (html.escape(snippet)
+            .replace(_SENTINEL_OPEN, SNIPPET_OPEN)
+            .replace(_SENTINEL_CLOSE, SNIPPET_CLOSE))
+
+
+def insert_rows(session, table, records):
+    """Bulk-insert `records` into an indexed `table` (a Table) with one index flush
+
+    FTS5 flushes its pending terms at the end of every statement, so an
+    executemany INSERT writes one tiny index segment per row. The rows go into
+    a trigger-free TEMP copy of the table first and are then moved with a
+    single INSERT ... SELECT, which indexes the whole chunk at once.
+    """
+    columns = list(records[0])
+    staging = _staging_table(table)
+    connection = session.connection()
+    staging.create(connection, checkfirst=True)
+    session.execute(insert(staging), records)
+    session.execute(insert(table).from_select(columns, select(*(staging.c[column] for column in columns))))
+    session.execute(delete(staging))
+
+
+_staging = {}
+
+
+def _staging_table(table):
+    if table.name not in _staging:
+        _staging[table.name] = Table(
+            f'search_staging_{table.name}', MetaData(),
+            *(Column(column.name, column.type) for column in table.columns),
+            prefixes=['TEMPORARY']
+        )
+    return _staging[table.name]
@@ -0,0 +1,166 @@
+"""
+Row serializers
+Large listings select plain column tuples instead of ORM objects and turn
+them into the to_dict() shape with a per-model function compiled once at
+import. Date/time columns are selected as text already in isoformat() form:
+SQLite converts SQLAlchemy's storage format in the query, so no Python
+date objects are built and formatted again per row. json_response() then
+encodes with orjson when it is installed, or the stdlib otherwise.
+
+The bytes are identical to jsonify(): sorted keys, ASCII-only escapes, the
+same compact or indented (debug) layout and the trailing newline. orjson
+writes non-ASCII characters and DEL as-is where the stdlib escapes them, so
+those are escaped afterwards the way the stdlib does. Payloads are expected
+to be the task/project shapes (strings, ints, bools, None); floats are not
+guaranteed to format identically.
+"""
+
+import json
+import re
+from flask import current_app
+from sqlalchemy import DateTime, String, Time, case, func, literal, type_coerce
+from app.models.tasks import Task
+from app.models.projects import Project, ProjectTask
+from app.services import project_counters
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson else 'json'
+
+# Characters the stdlib escapes (ensure_ascii=True) but orjson writes as UTF-8
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+
+def _escape(match):
+    code = ord(match.group())
+    if code < 0x10000:
+        return f'\\u{code:04x}'
+    code -= 0x10000  # astral characters become a surrogate pair, as in the stdlib
+    return f'\\u{0xd800 | (code >> 10):04x}\\u{0xdc00 | (code & 0x3ff):04x}'
+
+
+def iso_text(column):
+    """SQL expression for a Date/Time/DateTime column's isoformat() text (NULL stays NULL)
+
+    SQLAlchemy stores these on SQLite as 'YYYY-MM-DD', 'HH:MM:SS.ffffff' and
+    'YYYY-MM-DD HH:MM:SS.ffffff'; isoformat() uses a 'T' separator and drops
+    a zero fraction.
+    """
+    text = type_coerce(column, String)
+    if isinstance(column.type, DateTime):
+        whole = func.substr(text, 1, 10, type_=String) + literal('T') + func.substr(text, 12, 8, type_=String)
+        fraction = func.substr(text, 21, type_=String)
+    elif isinstance(column.type, Time):
+        whole = func.substr(text, 1, 8, type_=String)
+        fraction = func.substr(text, 10, type_=String)
+    else:
+        return text
+    return case((fraction.in_(['', '000000']), whole), else_=whole + literal('.') + fraction)
+
+
+class RowSerializer:
+    """Selects `columns` and maps each result row to a dict with `row_to_dict`
+
+    fields: (key, column, iso) in to_dict() order; iso=True selects the
+    column as isoformat() text, as to_dict() formats it. Result rows keep
+    the keys as attribute names (row.id, row.date, ...).
+    """
+
+    def __init__(self, name, fields):
+        self.fields = fields
+        self.keys = tuple(key for key, _, _ in fields)
+        self.columns = tuple(
+            iso_text(column).label(key) if iso else column.label(key) for key, column, iso in fields
+        )
+
+        # Generate the equivalent of a hand-written to_dict over a tuple, keys pre-sorted
+        names = [f'_{index}' for index in range(len(fields))]
+        items = [f'{key!r}: {names[index]}' for index, key in sorted(enumerate(self.keys), key=lambda item: item[1])]
+        source = (
+            f'def {name}_row_to_dict(row):\n'
+            f'    {", ".join(names)}, = row\n'
+            f'    return {{{", ".join(items)}}}\n'
+        )
+        namespace = {}
+        exec(compile(source, f'<{name} serializer>', 'exec'), namespace)
+        self.row_to_dict = namespace[f'{name}_row_to_dict']
+
+    def rows_to_dicts(self, rows):
+        return list(map(self.row_to_dict, rows))
+
+    def fetch(self, session, statement):
+        """Execute a select of `columns` on the session's connection (skipping ORM row loading) and serialize it"""
+        return self.rows_to_dicts(session.connection().execute(statement))
+
+
+TASK = RowSerializer('task', [
+    ('id', Task.id, False),
+    ('title', Task.title, False),
+    ('category', Task.category, False),
+    ('status', Task.status, False),
+    ('date', Task.date, True),
+    ('time', Task.time, True),
+    ('priority', Task.priority, False),
+    ('notes', Task.notes, False),
+    ('created_at', Task.created_at, True),
+    ('completed_at', Task.completed_at, True),
+    ('series_id', Task.series_id, False),
+    ('occurrence_date', Task.occurrence_date, True)
+])
+
+PROJECT = RowSerializer('project', [
+    ('id', Project.id, False),
+    ('name', Project.name, False),
+    ('description', Project.description, False),
+    ('status', Project.status, False),
+    ('progress', Project.progress, False),
+    ('next_step', Project.next_step, False),
+    ('obsidian_link', Project.obsidian_link, False),
+    ('is_main', Project.is_main, False),
+    ('created_at', Project.created_at, True),
+    ('updated_at', Project.updated_at, True),
+    ('task_count', Project.task_count, False),
+    ('completed_count', Project.completed_count, False)
+])
+
+# Same shape, with progress computed from the task counters instead of the stored value
+PROJECT_AUTO_PROGRESS = RowSerializer('project_auto_progress', [
+    (key, project_counters.auto_progress() if key == 'progress' else column, iso)
+    for key, column, iso in PROJECT.fields
+])
+
+PROJECT_TASK = RowSerializer('project_task', [
+    ('id', ProjectTask.id, False),
+    ('project_id', ProjectTask.project_id, False),
+    ('title', ProjectTask.title, False),
+    ('completed', ProjectTask.completed, False),
+    ('order', ProjectTask.order, False)
+])
+
+
+def dumps(obj, indent=False):
+    """Encode like Flask's JSON provider (sort_keys, ensure_ascii) and return bytes"""
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            data = orjson.dumps(obj, option=option)
+        except TypeError:  # orjson.JSONEncodeError, e.g. non-str keys
+            data = None
+        if data is not None:
+            if not data.isascii() or b'\x7f' in data:
+                # Outside string literals the output is pure ASCII, so this only touches string contents
+                data = _NON_ASCII.sub(_escape, data.decode()).encode()
+            return data
+
+    layout = {'indent': 2} if indent else {'separators': (',', ':')}
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True, **layout).encode()
+
+
+def json_response(obj, status=200):
+    """Byte-for-byte replacement for jsonify(obj), status"""
+    provider = current_app.json
+    indent = (provider.compact is None and current_app.debug) or provider.compact is False
+    return current_app.response_class(dumps(obj, indent) + b'\n', status=status, mimetype=provider.mimetype)
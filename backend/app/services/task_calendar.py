@@ -0,0 +1,46 @@
+"""
+Task calendar
+Tasks for a date range grouped per day, for month and week views. The range
+is one scan of the tasks.date index ordered by (date, time), so a month
+costs a single query however many days it spans.
+"""
+
+from itertools import groupby
+from sqlalchemy import select
+from app.models.tasks import Task
+from app.services import recurrence
+from app.services.serializers import TASK
+
+
+def _day_bucket(tasks):
+    return {
+        'count': len(tasks),
+        'completed': sum(1 for task in tasks if task['status'] == 'completed'),
+        'tasks': tasks
+    }
+
+
+def tasks_by_day(session, start, end, recurring=False):
+    """Return {'from', 'to', 'total', 'days': {date: {count, completed, tasks}}}; days without tasks are omitted
+
+    recurring=True also merges in the generated occurrences of recurring
+    task series (two more queries).
+    """
+    tasks = TASK.fetch(session, (
+        select(*TASK.columns)
+        .where(Task.date >= start, Task.date <= end)
+        .order_by(Task.date, Task.time, Task.id)
+    ))
+
+    if recurring:
+        # expand() returns the series' materialized rows as well, so take those from it
+        tasks = [task for task in tasks if task['series_id'] is None] + recurrence.expand(session, start, end)
+        tasks.sort(key=recurrence.sort_key)
+
+    days = {day: _day_bucket(list(group)) for day, group in groupby(tasks, key=lambda task: task['date'])}
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total': len(tasks),
+        'days': days
+    }
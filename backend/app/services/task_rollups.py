@@ -0,0 +1,100 @@
+"""
+Task rollups
+Per-status and per-day completion counters for /api/tasks/stats.
+
+Every task write path calls apply_task_change() before committing, so the
+counters change in the same transaction as the task row itself.
+"""
+
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.tasks import Task
+from app.models.rollups import TaskStatusCount, TaskDailyCompletion
+
+
+def rollup_key(task):
+    """Return the (status, completion day) pair a task contributes to the rollups"""
+    if task is None:
+        return None
+    return (
+        task.status or '',
+        task.completed_at.date() if task.completed_at else None
+    )
+
+
+def apply_task_change(session, before=None, after=None):
+    """Move a task's contribution from `before` to `after` (both rollup keys or None)"""
+    if before == after:
+        return
+    if before is not None:
+        _bump(session, before, -1)
+    if after is not None:
+        _bump(session, after, 1)
+
+
+def apply_key_counts(session, key_counts):
+    """Add many tasks at once, given {rollup key: number of tasks} (e.g. a Counter)"""
+    for key, count in key_counts.items():
+        if count:
+            _bump(session, key, count)
+
+
+def _bump(session, key, delta):
+    status, day = key
+
+    stmt = sqlite_insert(TaskStatusCount).values(status=status, count=delta)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[TaskStatusCount.status],
+        set_={'count': TaskStatusCount.count + delta}
+    ))
+
+    if day is not None:
+        stmt = sqlite_insert(TaskDailyCompletion).values(day=day, count=delta)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[TaskDailyCompletion.day],
+            set_={'count': TaskDailyCompletion.count + delta}
+        ))
+
+
+def get_status_counts(session):
+    """Return {status: count} for every status that has tasks"""
+    rows = session.execute(select(TaskStatusCount.status, TaskStatusCount.count))
+    return {status: count for status, count in rows if count}
+
+
+def get_daily_completions(session, start, end):
+    """Return {date: count} for completions between start and end (inclusive)"""
+    rows = session.execute(
+        select(TaskDailyCompletion.day, TaskDailyCompletion.count)
+        .where(TaskDailyCompletion.day >= start, TaskDailyCompletion.day <= end)
+    )
+    return {day: count for day, count in rows}
+
+
+def rebuild(session):
+    """Recompute all rollups from the tasks table (does not commit)"""
+    session.execute(delete(TaskStatusCount))
+    session.execute(delete(TaskDailyCompletion))
+
+    status = func.coalesce(Task.status, '')
+    session.execute(insert(TaskStatusCount).from_select(
+        ['status', 'count'],
+        select(status, func.count()).group_by(status)
+    ))
+
+    day = func.date(Task.completed_at)
+    session.execute(insert(TaskDailyCompletion).from_select(
+        ['day', 'count'],
+        select(day, func.count())
+        .where(Task.completed_at.isnot(None))
+        .group_by(day)
+    ))
+
+
+def ensure_built(session):
+    """Build the rollups once for databases created before they existed"""
+    has_rollups = session.execute(select(TaskStatusCount.status).limit(1)).first()
+    has_tasks = session.execute(select(Task.id).limit(1)).first()
+    if has_tasks and not has_rollups:
+        rebuild(session)
+        session.commit()
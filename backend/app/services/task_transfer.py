@@ -0,0 +1,242 @@
+"""
+Bulk task import/export
+Reads CSV, JSON Lines or Parquet (when pyarrow is installed) with pandas in
+chunks and inserts each chunk with one executemany-style Core INSERT (staged
+so the search index is updated once per chunk), so a whole import costs a
+handful of transactions instead of one per task.
+Exports stream the tasks table in chunks in the same formats.
+
+Columns match Task.to_dict(); an `id` column is ignored on import so
+history from another tracker never collides with existing rows. Chunks
+are committed as they go, so a failure part way through keeps the earlier
+chunks; ImportAborted reports how many rows those were.
+
+pandas is imported inside the functions that use it: it is the slowest
+import in the app and only these endpoints need it.
+"""
+
+from collections import Counter
+from datetime import datetime, time as time_of_day
+import io
+import time
+from sqlalchemy import select
+from app.models.tasks import Task
+from app.services import change_versions, events, search, task_rollups
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+CHUNK_SIZE = 10000
+
+EXPORT_COLUMNS = ['id', 'title', 'category', 'status', 'date', 'time',
+                  'priority', 'notes', 'created_at', 'completed_at']
+
+
+class ImportAborted(Exception):
+    """An import failed part way; `stats` counts the rows committed before the failure"""
+
+    def __init__(self, error, stats):
+        super().__init__(f"{error} ({stats['imported']} tasks from earlier chunks were imported)")
+        self.error = error
+        self.stats = stats
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def format_from_filename(filename, default='csv'):
+    """Guess the transfer format from a file extension"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension in FORMATS:
+        return extension
+    return default
+
+
+def read_chunks(source, fmt, chunk_size=CHUNK_SIZE):
+    """Yield DataFrames of at most chunk_size rows from a path or binary file object"""
+    import pandas as pd
+    if fmt == 'csv':
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    elif fmt == 'jsonl':
+        yield from pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    elif fmt == 'parquet':
+        if not parquet_available():
+            raise ValueError('Parquet support requires pyarrow')
+        frame = pd.read_parquet(source)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def _column(frame, name):
+    import pandas as pd
+    if name in frame:
+        return frame[name].astype(object).where(frame[name].notna() & (frame[name] != ''), None)
+    return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+
+
+def _parsed(frame, name, fmt, convert):
+    """Parse a column with pandas, then convert to Python objects (None for missing values)"""
+    import pandas as pd
+    values = pd.to_datetime(_column(frame, name), format=fmt, errors='coerce')
+    return [convert(value) if not missing else None
+            for value, missing in zip(values, values.isna())]
+
+
+def _times(frame):
+    """Parse the time column as written by export (time.isoformat(), so seconds and microseconds are optional)"""
+    values = []
+    for value in _column(frame, 'time'):
+        try:
+            values.append(time_of_day.fromisoformat(str(value)) if value is not None else None)
+        except ValueError:
+            values.append(None)  # unparseable like the other columns: stored as missing
+    return values
+
+
+def _values(series):
+    return series.tolist()
+
+
+def chunk_to_records(frame):
+    """Vectorized conversion of one chunk to Task insert parameters; rows without a title are dropped"""
+    import pandas as pd
+    title = _column(frame, 'title')
+    frame = frame[title.notna()]
+    if frame.empty:
+        return []
+
+    now = datetime.utcnow()
+    columns = {
+        'title': _values(_column(frame, 'title').astype(str)),
+        'category': _values(_column(frame, 'category')),
+        'status': _values(_column(frame, 'status').fillna('pending')),
+        'date': _parsed(frame, 'date', 'ISO8601', lambda value: value.date()),
+        'time': _times(frame),
+        'priority': _values(pd.to_numeric(_column(frame, 'priority'), errors='coerce').fillna(0).astype(int)),
+        'notes': _values(_column(frame, 'notes')),
+        'created_at': [value or now for value in
+                       _parsed(frame, 'created_at', 'ISO8601', lambda value: value.to_pydatetime())],
+        'completed_at': _parsed(frame, 'completed_at', 'ISO8601', lambda value: value.to_pydatetime())
+    }
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def import_tasks(session, source, fmt, chunk_size=CHUNK_SIZE):
+    """Import tasks in chunks (one transaction per chunk); returns throughput stats
+
+    Raises ImportAborted (after rolling back the failing chunk) if a chunk
+    cannot be read or stored; the chunks before it stay committed.
+    """
+    started = time.perf_counter()
+    imported = skipped = 0
+
+    try:
+        for frame in read_chunks(source, fmt, chunk_size):
+            records = chunk_to_records(frame)
+            if records:
+                _insert_chunk(session, records)
+            imported += len(records)
+            skipped += len(frame) - len(records)
+    except Exception as e:
+        session.rollback()
+        raise ImportAborted(e, _stats(imported, skipped, started)) from e
+
+    return _stats(imported, skipped, started)
+
+
+def _insert_chunk(session, records):
+    """Insert and commit one chunk of records"""
+    version = change_versions.bump(session, 'tasks')
+    for record in records:
+        record['version'] = version
+
+    search.insert_rows(session, Task.__table__, records)
+    task_rollups.apply_key_counts(session, Counter(
+        (record['status'], record['completed_at'].date() if record['completed_at'] else None)
+        for record in records
+    ))
+    # One event per chunk rather than per row; clients resync via /changes
+    events.queue(session, 'task', None, 'import', version)
+    session.commit()
+
+
+def _stats(imported, skipped, started):
+    seconds = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'skipped': skipped,
+        'seconds': round(seconds, 3),
+        'rowsPerSecond': round(imported / seconds) if seconds > 0 else imported
+    }
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def iter_export_frames(session, chunk_size=CHUNK_SIZE):
+    """Yield DataFrames of tasks (ISO formatted like Task.to_dict) read with a server-side cursor"""
+    import pandas as pd
+    result = session.execute(
+        select(*[Task.__table__.c[name] for name in EXPORT_COLUMNS])
+        .order_by(Task.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        frame = pd.DataFrame.from_records(rows, columns=EXPORT_COLUMNS)
+        for name in ('date', 'time', 'created_at', 'completed_at'):
+            frame[name] = frame[name].map(_iso)
+        yield frame
+
+
+def export_chunks(session, fmt, chunk_size=CHUNK_SIZE, stats=None):
+    """Yield encoded export data chunk by chunk; fills `stats` with throughput when done"""
+    import pandas as pd
+    started = time.perf_counter()
+    exported = 0
+
+    if fmt == 'parquet':
+        if not parquet_available():
+            raise ValueError('Parquet support requires pyarrow')
+        frames = list(iter_export_frames(session, chunk_size))
+        frame = pd.concat(frames) if frames else pd.DataFrame(columns=EXPORT_COLUMNS)
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        exported = len(frame)
+        yield buffer.getvalue()
+    elif fmt in ('csv', 'jsonl'):
+        header = True
+        for frame in iter_export_frames(session, chunk_size):
+            exported += len(frame)
+            if fmt == 'csv':
+                yield frame.to_csv(index=False, header=header).encode()
+                header = False
+            else:
+                yield frame.to_json(orient='records', lines=True).encode()
+        if fmt == 'csv' and header:
+            yield (','.join(EXPORT_COLUMNS) + '\n').encode()
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+    if stats is not None:
+        seconds = time.perf_counter() - started
+        stats.update({
+            'exported': exported,
+            'seconds': round(seconds, 3),
+            'rowsPerSecond': round(exported / seconds) if seconds > 0 else exported
+        })
+
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
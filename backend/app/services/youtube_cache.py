@@ -0,0 +1,235 @@
+"""
+YouTube response cache
+Pluggable TTL cache for YouTube Data API responses with two backends:
+an in-process LRU (default) and an on-disk SQLite file that survives restarts.
+
+Entries keep their ETag after they expire, so stale playlist responses can be
+revalidated with a conditional request instead of being downloaded again.
+"""
+
+from collections import OrderedDict, namedtuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Seconds each endpoint's responses stay fresh
+ENDPOINT_TTLS = {
+    'search': int(os.getenv('YOUTUBE_CACHE_TTL_SEARCH', '900')),
+    'video': int(os.getenv('YOUTUBE_CACHE_TTL_VIDEO', '3600')),
+    'playlists': int(os.getenv('YOUTUBE_CACHE_TTL_PLAYLISTS', '300')),
+    'playlist_items': int(os.getenv('YOUTUBE_CACHE_TTL_PLAYLIST_ITEMS', '300')),
+}
+
+# 'memory', 'sqlite' or 'none'
+CACHE_BACKEND = os.getenv('YOUTUBE_CACHE_BACKEND', 'memory')
+CACHE_MAX_ENTRIES = int(os.getenv('YOUTUBE_CACHE_MAX_ENTRIES', '2000'))
+CACHE_PATH = os.getenv('YOUTUBE_CACHE_PATH', 'data/cache/youtube_cache.db')
+
+
+class NotModified(Exception):
+    """Raised by a fetch function when the API answered 304 to a conditional request"""
+
+
+def execute_conditional(api_request, etag):
+    """Execute an API request with If-None-Match, raising NotModified on 304"""
+    from app.services import youtube_clients
+    if etag:
+        api_request.headers['If-None-Match'] = etag
+    try:
+        return api_request.execute()
+    except youtube_clients.HttpError as e:
+        if e.resp.status == 304:
+            raise NotModified()
+        raise
+
+
+class CacheEntry(namedtuple('CacheEntry', ['value', 'etag', 'expires_at'])):
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by entry count"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, etag, ttl):
+        with self._lock:
+            self._entries[key] = CacheEntry(value, etag, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache in its own SQLite file, evicting least recently used entries"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL, etag TEXT,'
+            ' expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_accessed_at ON cache (accessed_at)')
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, etag, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key, value, etag, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, etag, expires_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(value), etag, now + ttl, now)
+            )
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM cache WHERE key IN'
+                    ' (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)', (overflow,)
+                )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache')
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+
+class NullCache:
+    """Backend that never stores anything (YOUTUBE_CACHE_BACKEND=none)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, etag, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+BACKENDS = {
+    'memory': MemoryCache,
+    'sqlite': SQLiteCache,
+    'none': NullCache,
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache backend, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = BACKENDS[CACHE_BACKEND]()
+    return _cache
+
+
+def set_cache(cache):
+    """Swap the cache backend (e.g. for a custom implementation)"""
+    global _cache
+    _cache = cache
+
+
+def _count(endpoint, outcome):
+    with _counters_lock:
+        counters = _counters.setdefault(endpoint, {'hits': 0, 'misses': 0, 'revalidated': 0})
+        counters[outcome] += 1
+
+
+def get_or_fetch(endpoint, key, fetch, conditional=False):
+    """Return a cached value for key, calling fetch(etag) -> (value, etag) when needed
+
+    With conditional=True a stale entry's ETag is passed to fetch, which may
+    raise NotModified to keep serving (and re-arm) the cached value.
+    """
+    cache = get_cache()
+    ttl = ENDPOINT_TTLS[endpoint]
+    key = f'{endpoint}:{key}'
+
+    entry = cache.get(key)
+    if entry is not None and entry.fresh:
+        _count(endpoint, 'hits')
+        return entry.value
+
+    etag = entry.etag if entry is not None and conditional else None
+    try:
+        value, etag = fetch(etag)
+    except NotModified:
+        _count(endpoint, 'revalidated')
+        cache.set(key, entry.value, entry.etag, ttl)
+        return entry.value
+
+    _count(endpoint, 'misses')
+    cache.set(key, value, etag, ttl)
+    return value
+
+
+def lookup(endpoint, key):
+    """Return (True, value) for a fresh cached entry, otherwise (False, None)"""
+    entry = get_cache().get(f'{endpoint}:{key}')
+    if entry is not None and entry.fresh:
+        _count(endpoint, 'hits')
+        return True, entry.value
+    return False, None
+
+
+def store(endpoint, key, value, etag=None):
+    """Cache a value fetched outside get_or_fetch (counted as a miss)"""
+    _count(endpoint, 'misses')
+    get_cache().set(f'{endpoint}:{key}', value, etag, ENDPOINT_TTLS[endpoint])
+
+
+def stats():
+    """Hit/miss counters per endpoint plus the backend's current size"""
+    return {
+        'backend': CACHE_BACKEND,
+        'entries': len(get_cache()),
+        'maxEntries': CACHE_MAX_ENTRIES,
+        'ttls': ENDPOINT_TTLS,
+        'endpoints': {endpoint: dict(counters) for endpoint, counters in _counters.items()}
+    }
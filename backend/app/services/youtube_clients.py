@@ -0,0 +1,154 @@
+"""
+YouTube client pool
+Builds YouTube Data API service objects from the discovery document that ships
+with google-api-python-client (parsed once per process) and keeps a bounded
+pool of idle clients per API key / OAuth identity, so their keep-alive HTTP
+connections are reused across requests.
+
+httplib2 connections are not thread-safe, so a client is checked out for the
+duration of a request and handed back afterwards:
+
+    with youtube_clients.client(api_key=key) as youtube:
+        youtube.videos().list(...).execute()
+
+The Google client libraries are slow to import, so they are only loaded
+when the first client is built (or HttpError is first looked up here),
+keeping them off the app's startup path.
+"""
+
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+import hashlib
+import json
+import os
+import threading
+
+# Optional path to a discovery document to use instead of the library's bundled copy
+DISCOVERY_DOC_PATH = os.getenv('YOUTUBE_DISCOVERY_DOC')
+# Optional API root override, e.g. a local fake server for benchmarks
+API_ENDPOINT = os.getenv('YOUTUBE_API_ENDPOINT')
+HTTP_TIMEOUT = int(os.getenv('YOUTUBE_HTTP_TIMEOUT', '30'))
+MAX_IDENTITIES = int(os.getenv('YOUTUBE_POOL_MAX_IDENTITIES', '32'))
+MAX_IDLE_PER_IDENTITY = int(os.getenv('YOUTUBE_POOL_MAX_IDLE', '4'))
+
+_discovery_doc = None
+_discovery_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # youtube_clients.HttpError, imported on first access
+    if name == 'HttpError':
+        from googleapiclient.errors import HttpError
+        return HttpError
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def credentials_key(credentials):
+    """Stable, non-reversible key for a user's OAuth credentials dict"""
+    identity = credentials.get('refresh_token') or credentials.get('token') or ''
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def discovery_document():
+    """Return the parsed youtube v3 discovery document, loading it only once"""
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _discovery_lock:
+            if _discovery_doc is None:
+                if DISCOVERY_DOC_PATH:
+                    with open(DISCOVERY_DOC_PATH, 'r') as f:
+                        content = f.read()
+                else:
+                    from googleapiclient.discovery_cache import get_static_doc
+                    content = get_static_doc('youtube', 'v3')
+                _discovery_doc = json.loads(content)
+    return _discovery_doc
+
+
+def build_client(credentials=None, api_key=None):
+    """Build a YouTube service with its own keep-alive HTTP transport"""
+    from google.oauth2.credentials import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build_from_document
+    import httplib2
+
+    client_options = {'api_endpoint': API_ENDPOINT} if API_ENDPOINT else None
+    http = httplib2.Http(timeout=HTTP_TIMEOUT)
+    if credentials is not None:
+        http = AuthorizedHttp(Credentials(**credentials), http=http)
+        return build_from_document(discovery_document(), http=http, client_options=client_options)
+
+    return build_from_document(
+        discovery_document(), developerKey=api_key, http=http, client_options=client_options
+    )
+
+
+class ClientPool:
+    """Idle YouTube clients keyed by identity, LRU-bounded in identities and per-identity size"""
+
+    def __init__(self, max_identities=MAX_IDENTITIES, max_idle=MAX_IDLE_PER_IDENTITY):
+        self.max_identities = max_identities
+        self.max_idle = max_idle
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.reuses = 0
+
+    def _checkout(self, key):
+        with self._lock:
+            clients = self._idle.get(key)
+            if clients:
+                self._idle.move_to_end(key)
+                self.reuses += 1
+                return clients.pop()
+            self.builds += 1
+            return None
+
+    def _checkin(self, key, youtube):
+        with self._lock:
+            clients = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(clients) < self.max_idle:
+                clients.append(youtube)
+            while len(self._idle) > self.max_identities:
+                self._idle.popitem(last=False)
+
+    @contextmanager
+    def client(self, credentials=None, api_key=None):
+        """Check out a client for OAuth credentials (dict) or an API key"""
+        if credentials is not None:
+            key = 'oauth:' + credentials_key(credentials)
+        else:
+            key = 'key:' + hashlib.sha256((api_key or '').encode()).hexdigest()[:32]
+
+        youtube = self._checkout(key)
+        if youtube is None:
+            youtube = build_client(credentials=credentials, api_key=api_key)
+        try:
+            yield youtube
+        finally:
+            self._checkin(key, youtube)
+
+    def warm(self, count, credentials=None, api_key=None):
+        """Build up to `count` idle clients for an identity ahead of traffic"""
+        # Hold them all at once so each checkout builds a new client; all are checked in on exit
+        with ExitStack() as stack:
+            for _ in range(min(count, self.max_idle)):
+                stack.enter_context(self.client(credentials=credentials, api_key=api_key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'identities': len(self._idle),
+                'idleClients': sum(len(clients) for clients in self._idle.values()),
+                'builds': self.builds,
+                'reuses': self.reuses
+            }
+
+
+pool = ClientPool()
+
+
+def client(credentials=None, api_key=None):
+    """Check out a pooled client from the process-wide pool"""
+    return pool.client(credentials=credentials, api_key=api_key)
@@ -0,0 +1,319 @@
+"""
+YouTube playlist mirror
+The signed-in account's playlists and their tracks are mirrored into SQLite
+(playlists, tracks, playlist_tracks), and the Music tab's playlist routes are
+served from the mirror: a local read in milliseconds that keeps working
+offline and when the API quota is used up.
+
+A sync is incremental:
+- the playlists list is requested with the ETag of the last sync (304: no
+  playlist was added, removed or edited);
+- a playlist's tracks are re-read only when its own etag or item count
+  changed, or its first page no longer answers 304 to the stored ETag;
+- only tracks without details (or with details older than
+  YOUTUBE_TRACK_REFRESH_DAYS) are looked up with videos().list, 50 per call.
+
+API calls are made with no transaction open, and each playlist is written
+and committed as soon as it is fetched, so an interrupted sync keeps its
+progress and other writers only ever wait for a short local write. Syncs run
+as the background 'youtube.sync' job: the routes answer from the API until
+the first sync has filled the mirror, then from the mirror, queueing a
+refresh once it is older than YOUTUBE_MIRROR_TTL; after a failure,
+automatic syncs pause until retry_at.
+"""
+
+from datetime import datetime, timedelta
+import os
+from sqlalchemy import bindparam, case, select, delete, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database import db_session, read_session
+from app.models.music import YoutubeAccount, Playlist, Track, PlaylistTrack
+from app.services import jobs, youtube_cache, youtube_clients
+from app.services.youtube_playlists import PAGE_SIZE, fetch_video_details, playlist_item_to_dict
+
+YOUTUBE_MIRROR_TTL = int(os.getenv('YOUTUBE_MIRROR_TTL', '300'))  # seconds before a background refresh
+YOUTUBE_TRACK_REFRESH_DAYS = int(os.getenv('YOUTUBE_TRACK_REFRESH_DAYS', '7'))  # view counts drift
+
+# How long automatic syncs pause after a failure
+QUOTA_BACKOFF = timedelta(hours=1)
+ERROR_BACKOFF = timedelta(minutes=5)
+
+
+def get_account(session, owner):
+    return session.get(YoutubeAccount, owner)
+
+
+def playlists(session, owner):
+    """The owner's mirrored playlists in YouTube's order"""
+    rows = session.execute(
+        select(Playlist).where(Playlist.owner == owner).order_by(Playlist.position)
+    ).scalars()
+    return [playlist.to_dict() for playlist in rows]
+
+
+def playlist_tracks(session, owner, playlist_id, limit=None):
+    """A mirrored playlist's videos in order, or None when the playlist is not mirrored for `owner`"""
+    playlist = session.get(Playlist, playlist_id)
+    if playlist is None or playlist.owner != owner or playlist.synced_at is None:
+        return None
+
+    rows = session.execute(
+        select(PlaylistTrack.position, Track.video_id, Track.title, Track.description, Track.thumbnail,
+               Track.channel_title, Track.duration, Track.view_count)
+        .join(Track, Track.video_id == PlaylistTrack.video_id)
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .order_by(PlaylistTrack.position)
+        .limit(limit)
+    )
+    return [{
+        'videoId': row.video_id,
+        'title': row.title,
+        'description': row.description or '',
+        'thumbnail': row.thumbnail or '',
+        'channelTitle': row.channel_title,
+        'position': row.position,
+        'duration': row.duration or '',
+        'viewCount': str(row.view_count) if row.view_count is not None else 0  # the API's string form
+    } for row in rows]
+
+
+def refresh_if_stale(credentials, owner, account):
+    """Queue a background sync when the mirror is empty or older than YOUTUBE_MIRROR_TTL; returns the job or None"""
+    now = datetime.utcnow()
+    if account is not None:
+        if account.synced_at and now - account.synced_at < timedelta(seconds=YOUTUBE_MIRROR_TTL):
+            return None
+        if account.retry_at and now < account.retry_at:
+            return None
+    try:
+        return jobs.submit('youtube.sync', {'credentials': credentials}, key=owner)
+    except jobs.QueueFull:
+        return None  # the caller keeps answering as before; the next request tries again
+
+
+def sync(credentials, force=False):
+    """Bring the owner's mirror up to date; returns what was fetched
+
+    force=True re-reads every playlist's tracks regardless of ETags.
+
+    No transaction is open while the API is called: state is read through
+    read_session, and each step's rows are written in a short db_session
+    transaction once its fetch has finished, so the writer connection (and
+    SQLite's write lock) is never held across a network round trip.
+    """
+    owner = youtube_clients.credentials_key(credentials)
+    stats = {'playlists': 0, 'playlistsChanged': 0, 'playlistsRemoved': 0, 'tracksFetched': 0, 'apiCalls': 0}
+
+    try:
+        account = get_account(read_session, owner)
+        playlists_etag = account.playlists_etag if account is not None else None
+        read_session.rollback()  # end the read snapshot, so later reads see this sync's writes
+
+        listed = _fetch_playlists(credentials, None if force else playlists_etag, stats)
+        if listed is not None:
+            items, playlists_etag = listed
+            stats['playlistsRemoved'] = _save_playlists(db_session, owner, items)
+            _save_account(db_session, owner, playlists_etag=playlists_etag)
+            db_session.commit()
+
+        mirrored = _mirrored_playlists(read_session, owner)
+        read_session.rollback()
+        stats['playlists'] = len(mirrored)
+        for playlist in mirrored:
+            fetched = _fetch_playlist_tracks(credentials, playlist, force, stats)
+            if fetched is not None:
+                videos, items_etag = fetched
+                _save_tracks(db_session, playlist.id, videos)
+                db_session.execute(
+                    update(Playlist).where(Playlist.id == playlist.id)
+                    .values(items_etag=items_etag, synced_at=datetime.utcnow())
+                )
+                db_session.commit()
+                stats['playlistsChanged'] += 1
+
+        # Tracks that left every playlist
+        db_session.execute(delete(Track).where(Track.video_id.notin_(select(PlaylistTrack.video_id))))
+        db_session.commit()
+
+        stats['tracksFetched'] = _fetch_track_details(credentials, owner, stats)
+        _save_account(db_session, owner, synced_at=datetime.utcnow(), last_error=None, retry_at=None)
+        db_session.commit()
+        return stats
+
+    except Exception as e:
+        db_session.rollback()
+        read_session.rollback()
+        _record_failure(db_session, owner, e)
+        raise
+
+
+def sync_job(credentials, force=False):
+    """The 'youtube.sync' background job"""
+    return sync(credentials, force)
+
+
+def _save_account(session, owner, **values):
+    """Insert or update the owner's sync state (does not commit)"""
+    session.execute(
+        sqlite_insert(YoutubeAccount).values(key=owner, **values)
+        .on_conflict_do_update(index_elements=[YoutubeAccount.key], set_=values)
+    )
+
+
+def _record_failure(session, owner, error):
+    quota = isinstance(error, youtube_clients.HttpError) and b'quota' in (error.content or b'').lower()
+    _save_account(
+        session, owner,
+        last_error=str(error)[:500],
+        retry_at=datetime.utcnow() + (QUOTA_BACKOFF if quota else ERROR_BACKOFF)
+    )
+    session.commit()
+
+
+def _fetch_playlists(credentials, etag, stats):
+    """Every playlist resource of the account and the list's etag, or None if unchanged since `etag`"""
+    items, page_token, pages = [], None, 0
+    while True:
+        with youtube_clients.client(credentials=credentials) as youtube:
+            request = youtube.playlists().list(
+                part='snippet,contentDetails', mine=True, maxResults=PAGE_SIZE, pageToken=page_token
+            )
+            stats['apiCalls'] += 1
+            try:
+                # Only a single-page list can be validated by one ETag
+                response = youtube_cache.execute_conditional(request, etag if page_token is None else None)
+            except youtube_cache.NotModified:
+                return None
+        pages += 1
+        items += response.get('items', [])
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return items, response.get('etag') if pages == 1 else None
+
+
+def _save_playlists(session, owner, items):
+    """Upsert the listed playlists and drop the ones no longer listed; returns how many were dropped"""
+    for position, item in enumerate(items):
+        values = {
+            'owner': owner,
+            'position': position,
+            'title': item['snippet']['title'],
+            'description': item['snippet'].get('description', ''),
+            'thumbnail_url': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+            'item_count': item['contentDetails']['itemCount'],
+            'etag': item.get('etag')
+        }
+        stmt = sqlite_insert(Playlist).values(id=item['id'], **values)
+        session.execute(stmt.on_conflict_do_update(index_elements=[Playlist.id], set_={
+            **values,
+            # A new resource etag means the tracks may have changed: forget the stored page ETag
+            'items_etag': case(
+                (Playlist.etag.is_not_distinct_from(stmt.excluded.etag), Playlist.items_etag), else_=None
+            )
+        }))
+
+    listed = [item['id'] for item in items]
+    removed = session.execute(
+        select(Playlist.id).where(Playlist.owner == owner, Playlist.id.notin_(listed))
+    ).scalars().all()
+    if removed:
+        session.execute(delete(PlaylistTrack).where(PlaylistTrack.playlist_id.in_(removed)))
+        session.execute(delete(Playlist).where(Playlist.id.in_(removed)))
+    return len(removed)
+
+
+def _mirrored_playlists(session, owner):
+    """(id, item_count, items_etag, tracks mirrored) of the owner's playlists, as plain rows"""
+    mirrored = (
+        select(func.count()).select_from(PlaylistTrack)
+        .where(PlaylistTrack.playlist_id == Playlist.id)
+        .scalar_subquery()
+    )
+    return session.execute(
+        select(Playlist.id, Playlist.item_count, Playlist.items_etag, mirrored.label('mirrored'))
+        .where(Playlist.owner == owner)
+        .order_by(Playlist.position)
+    ).all()
+
+
+def _fetch_playlist_tracks(credentials, playlist, force, stats):
+    """A playlist's videos and first-page etag if they may have changed, else None"""
+    # items_etag was cleared if the playlist's etag changed; a different count also means changes
+    etag = None if force or playlist.mirrored != playlist.item_count else playlist.items_etag
+
+    videos, page_token, first_etag = [], None, None
+    while True:
+        with youtube_clients.client(credentials=credentials) as youtube:
+            request = youtube.playlistItems().list(
+                part='snippet,contentDetails', playlistId=playlist.id, maxResults=PAGE_SIZE, pageToken=page_token
+            )
+            stats['apiCalls'] += 1
+            try:
+                response = youtube_cache.execute_conditional(request, etag if page_token is None else None)
+            except youtube_cache.NotModified:
+                return None
+        if page_token is None:
+            first_etag = response.get('etag')
+        videos += [playlist_item_to_dict(item) for item in response.get('items', [])]
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return videos, first_etag
+
+
+def _save_tracks(session, playlist_id, videos):
+    """Replace a playlist's membership and upsert its tracks (keeping their fetched details)"""
+    if videos:
+        tracks = {video['videoId']: {
+            'video_id': video['videoId'],
+            'title': video['title'],
+            'description': video['description'],
+            'thumbnail': video['thumbnail'],
+            'channel_title': video['channelTitle']
+        } for video in videos}
+        stmt = sqlite_insert(Track.__table__)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=['video_id'],
+            set_={column: stmt.excluded[column] for column in ('title', 'description', 'thumbnail', 'channel_title')}
+        ), list(tracks.values()))
+
+    session.execute(delete(PlaylistTrack).where(PlaylistTrack.playlist_id == playlist_id))
+    if videos:
+        session.execute(sqlite_insert(PlaylistTrack.__table__), [
+            {'playlist_id': playlist_id, 'position': position, 'video_id': video['videoId']}
+            for position, video in enumerate(videos)
+        ])
+
+
+def _fetch_track_details(credentials, owner, stats):
+    """Look up duration/viewCount for the owner's tracks that lack them or are due a refresh"""
+    due = datetime.utcnow() - timedelta(days=YOUTUBE_TRACK_REFRESH_DAYS)
+    video_ids = read_session.execute(
+        select(Track.video_id).distinct()
+        .join(PlaylistTrack, PlaylistTrack.video_id == Track.video_id)
+        .join(Playlist, Playlist.id == PlaylistTrack.playlist_id)
+        .where(Playlist.owner == owner, (Track.details_at.is_(None)) | (Track.details_at < due))
+    ).scalars().all()
+    read_session.rollback()
+
+    for start in range(0, len(video_ids), PAGE_SIZE):
+        batch = video_ids[start:start + PAGE_SIZE]
+        details = fetch_video_details(batch, credentials=credentials)
+        stats['apiCalls'] += 1
+        now = datetime.utcnow()
+        db_session.execute(_DETAILS_UPDATE, [{
+            'b_video_id': video_id,
+            'duration': details.get(video_id, {}).get('contentDetails', {}).get('duration', ''),
+            'view_count': int(details.get(video_id, {}).get('statistics', {}).get('viewCount', 0)),
+            'details_at': now
+        } for video_id in batch])
+        db_session.commit()
+    return len(video_ids)
+
+
+_DETAILS_UPDATE = (
+    update(Track.__table__)
+    .where(Track.__table__.c.video_id == bindparam('b_video_id'))
+    .values(duration=bindparam('duration'), view_count=bindparam('view_count'), details_at=bindparam('details_at'))
+)
+
+jobs.register('youtube.sync', sync_job)
@@ -0,0 +1,96 @@
+"""
+Full playlist retrieval
+Walks every page of a playlist (following nextPageToken) and enriches each
+page with durations and statistics through one batched videos().list call per
+50 IDs. Enrichment runs on a bounded thread pool while the next page is being
+fetched, and pages are yielded in order as soon as they are ready.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
+from app.services import jobs, youtube_clients
+
+PAGE_SIZE = 50  # API maximum for playlistItems().list and videos().list
+ENRICH_WORKERS = int(os.getenv('YOUTUBE_ENRICH_WORKERS', '4'))
+MAX_PAGES_IN_FLIGHT = ENRICH_WORKERS * 2
+
+_executor = ThreadPoolExecutor(max_workers=ENRICH_WORKERS, thread_name_prefix='yt-enrich')
+
+
+def playlist_item_to_dict(item):
+    """Convert a playlistItems resource to the Music tab's video format"""
+    return {
+        'videoId': item['contentDetails']['videoId'],
+        'title': item['snippet']['title'],
+        'description': item['snippet'].get('description', ''),
+        'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+        'channelTitle': item['snippet'].get('channelTitle', 'Unknown'),
+        'position': item['snippet']['position']
+    }
+
+
+def fetch_video_details(video_ids, credentials=None, api_key=None):
+    """Return {videoId: videos resource} for up to 50 IDs in a single API call"""
+    if not video_ids:
+        return {}
+    with youtube_clients.client(credentials=credentials, api_key=api_key) as youtube:
+        response = youtube.videos().list(
+            part='snippet,contentDetails,statistics',
+            id=','.join(video_ids),
+            maxResults=PAGE_SIZE
+        ).execute()
+    return {item['id']: item for item in response.get('items', [])}
+
+
+def enrich_page(videos, credentials=None, api_key=None):
+    """Add duration and viewCount to a page of playlist videos (one API call)"""
+    details = fetch_video_details(
+        [video['videoId'] for video in videos], credentials=credentials, api_key=api_key
+    )
+    for video in videos:
+        item = details.get(video['videoId'], {})
+        video['duration'] = item.get('contentDetails', {}).get('duration', '')
+        video['viewCount'] = item.get('statistics', {}).get('viewCount', 0)
+    return videos
+
+
+def iter_playlist_pages(playlist_id, credentials):
+    """Yield each page of a playlist as a list of video dicts"""
+    page_token = None
+    while True:
+        with youtube_clients.client(credentials=credentials) as youtube:
+            response = youtube.playlistItems().list(
+                part='snippet,contentDetails',
+                playlistId=playlist_id,
+                maxResults=PAGE_SIZE,
+                pageToken=page_token
+            ).execute()
+
+        yield [playlist_item_to_dict(item) for item in response.get('items', [])]
+
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def iter_full_playlist(playlist_id, credentials):
+    """Yield enriched pages in playlist order while later pages are still loading"""
+    in_flight = deque()
+    for page in iter_playlist_pages(playlist_id, credentials):
+        in_flight.append(_executor.submit(enrich_page, page, credentials=credentials))
+
+        # Flush finished pages in order; block once too many are pending
+        while in_flight and (in_flight[0].done() or len(in_flight) >= MAX_PAGES_IN_FLIGHT):
+            yield in_flight.popleft().result()
+
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def fetch_full_playlist(playlist_id, credentials):
+    """Every enriched video of a playlist (the 'youtube.playlist' background job)"""
+    return {'videos': [video for page in iter_full_playlist(playlist_id, credentials) for video in page]}
+
+
+jobs.register('youtube.playlist', fetch_full_playlist)
@@ -0,0 +1,97 @@
+"""
+Video details batching
+Coalesces video lookups that arrive within a short window into a single
+videos().list call of up to 50 IDs, then fans the results back out to every
+waiting caller.
+"""
+
+from concurrent.futures import Future
+import os
+import threading
+from app.services.youtube_playlists import PAGE_SIZE, fetch_video_details
+
+# How long the first lookup in a batch waits for others to join it
+COALESCE_WINDOW = float(os.getenv('YOUTUBE_COALESCE_WINDOW_MS', '10')) / 1000
+LOOKUP_TIMEOUT = float(os.getenv('YOUTUBE_HTTP_TIMEOUT', '30'))
+
+
+def video_to_dict(item):
+    """Convert a videos resource to the Music tab's video details format"""
+    return {
+        'videoId': item['id'],
+        'title': item['snippet']['title'],
+        'description': item['snippet'].get('description', ''),
+        'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+        'channelTitle': item['snippet'].get('channelTitle', 'Unknown'),
+        'duration': item['contentDetails'].get('duration', ''),
+        'viewCount': item['statistics'].get('viewCount', 0)
+    }
+
+
+class VideoBatcher:
+    """Collects pending video IDs and resolves them with one upstream call per batch"""
+
+    def __init__(self, window=COALESCE_WINDOW, max_batch=PAGE_SIZE):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.lookups = 0
+
+    def submit(self, video_id):
+        """Return a Future resolving to the video dict (or None if it does not exist)"""
+        batch = None
+        with self._lock:
+            self.lookups += 1
+            future = self._pending.get(video_id)
+            if future is None:
+                future = Future()
+                self._pending[video_id] = future
+                if len(self._pending) >= self.max_batch:
+                    batch = self._take_batch()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.window, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            self._resolve(batch)
+        return future
+
+    def get(self, video_id):
+        """Blocking lookup of a single video"""
+        return self.submit(video_id).result(timeout=LOOKUP_TIMEOUT)
+
+    def _take_batch(self):
+        batch, self._pending = self._pending, {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.batches += 1
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_batch() if self._pending else None
+        if batch:
+            self._resolve(batch)
+
+    def _resolve(self, batch):
+        try:
+            details = fetch_video_details(list(batch), api_key=os.getenv('YOUTUBE_API_KEY'))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+
+        for video_id, future in batch.items():
+            item = details.get(video_id)
+            future.set_result(video_to_dict(item) if item else None)
+
+    def stats(self):
+        with self._lock:
+            return {'lookups': self.lookups, 'batches': self.batches, 'pending': len(self._pending)}
+
+
+batcher = VideoBatcher()
@@ -0,0 +1,382 @@
+"""
+Endpoint benchmark suite
+Seeds a throwaway SQLite database with synthetic data (benchmarks.seed), then
+drives every tasks route (recurring series and occurrences included), every
+projects route and the YouTube routes (against benchmarks.fake_google)
+through the Flask test client and through a real threaded HTTP server.
+Per-route throughput, p50/p99 latency and peak RSS are written to a JSON
+file so runs can be diffed between commits.
+
+Routes that return the whole table (full listings, exports, full snapshots)
+run --heavy-requests times instead of --requests.
+
+Usage (from backend/):
+    python -m benchmarks.endpoint_bench --tasks 1000000 --projects 10000 --project-tasks 50 \\
+        --output bench-results.json
+"""
+
+from datetime import date, datetime, timedelta
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from benchmarks import fake_google, seed
+
+
+class Scenario:
+    """One route exercised repeatedly; `path` and `body` take the iteration number"""
+
+    def __init__(self, name, method, path, body=None, heavy=False, after=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.heavy = heavy
+        self.after = after  # called with (status, body) to carry state between requests
+
+
+class TestClientDriver:
+    name = 'test_client'
+
+    def __init__(self, app, credentials):
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['credentials'] = credentials
+
+    def request(self, method, path, body=None, content_type=None):
+        response = self.client.open(path, method=method, data=body, content_type=content_type)
+        data = response.get_data()  # drains streamed bodies too
+        return response.status_code, data
+
+
+class HTTPDriver:
+    name = 'http'
+
+    def __init__(self, app, credentials):
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.port
+
+        # Same signed session cookie the browser would carry after the OAuth flow
+        serializer = app.session_interface.get_signing_serializer(app)
+        self.cookie = f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'credentials': credentials})}"
+        self.connection = None
+
+    def request(self, method, path, body=None, content_type=None):
+        headers = {'Cookie': self.cookie}
+        if content_type:
+            headers['Content-Type'] = content_type
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection('127.0.0.1', self.port)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the keep-alive connection; retry once on a new one
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+        self.server.shutdown()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be read"""
+    try:
+        import resource  # Unix only
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # ru_maxrss is KB on Linux
+    except ImportError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return round(getattr(info, 'peak_wset', info.rss) / 1024 / 1024, 1)  # peak on Windows, current elsewhere
+
+
+def summarize(samples, elapsed, errors, size):
+    ordered = sorted(samples)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughputRps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'meanMs': round(statistics.mean(samples), 3),
+        'p50Ms': round(statistics.median(samples), 3),
+        'p99Ms': round(ordered[math.ceil(len(ordered) * 0.99) - 1], 3),  # nearest rank
+        'maxMs': round(ordered[-1], 3),
+        'responseBytes': size,
+        'peakRssMb': peak_rss_mb()
+    }
+
+
+def run_scenario(driver, scenario, iterations):
+    samples = []
+    errors = 0
+    size = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        path = scenario.path(i)
+        body = scenario.body(i) if scenario.body else None
+        content_type = None
+        if isinstance(body, (dict, list)):
+            body, content_type = json.dumps(body), 'application/json'
+        elif body is not None:
+            content_type = 'text/csv'
+
+        start = time.perf_counter()
+        status, data = driver.request(scenario.method, path, body, content_type)
+        samples.append((time.perf_counter() - start) * 1000)
+
+        size = len(data)
+        if status >= 400:
+            errors += 1
+        if scenario.after:
+            scenario.after(status, data)
+    return summarize(samples, time.perf_counter() - started, errors, size)
+
+
+def build_scenarios(volumes, rng):
+    """Every tasks_bp/projects_bp route plus the YouTube data routes"""
+    today = date.today()
+    series_start = today - timedelta(days=seed.DATE_SPAN_DAYS)
+    created_tasks = []
+    created_series = []
+    created_projects = []
+    created_project_tasks = []
+    cursor = {'next': None}
+
+    def random_task_id(i):
+        return rng.randint(1, volumes['tasks'])
+
+    def random_project_id(i):
+        return rng.randint(1, volumes['projects'])
+
+    def random_day(i):
+        return (today + timedelta(days=rng.randint(-seed.DATE_SPAN_DAYS, seed.DATE_SPAN_DAYS))).isoformat()
+
+    def keep_id(ids):
+        def after(status, data):
+            if status in (200, 201):
+                ids.append(json.loads(data)['id'])
+        return after
+
+    def next_page(status, data):
+        cursor['next'] = json.loads(data).get('next_cursor') if status == 200 else None
+
+    def page_path(i):
+        return f"/api/tasks?limit=100&cursor={cursor['next']}" if cursor['next'] else '/api/tasks?limit=100'
+
+    def import_body(i):
+        rows = ['title,category,status,date,priority']
+        rows += [f'Imported {i}-{n},Daily,pending,{today.isoformat()},1' for n in range(1000)]
+        return '\n'.join(rows) + '\n'
+
+    def occurrence_path(suffix=''):
+        # Each iteration acts on a different day of one of the daily series created above
+        def path(i):
+            series_id = created_series[i % len(created_series)]
+            day = series_start + timedelta(days=i)
+            return f'/api/tasks/series/{series_id}/occurrences/{day.isoformat()}{suffix}'
+        return path
+
+    def first_project_task(i):
+        project_id, task_id = created_project_tasks[i % len(created_project_tasks)]
+        return f'/api/projects/{project_id}/tasks/{task_id}'
+
+    def pop_project_task(i):
+        project_id, task_id = created_project_tasks.pop()
+        return f'/api/projects/{project_id}/tasks/{task_id}'
+
+    def keep_project_task(status, data):
+        if status == 201:
+            task = json.loads(data)
+            created_project_tasks.append((task['project_id'], task['id']))
+
+    return [
+        # Tasks: reads
+        Scenario('GET /api/tasks', 'GET', lambda i: '/api/tasks', heavy=True),
+        Scenario('GET /api/tasks?status=in-progress', 'GET', lambda i: '/api/tasks?status=in-progress', heavy=True),
+        Scenario('GET /api/tasks?date=', 'GET', lambda i: f'/api/tasks?date={random_day(i)}'),
+        Scenario('GET /api/tasks?limit=100 (keyset walk)', 'GET', page_path, after=next_page),
+        Scenario('GET /api/tasks?format=ndjson', 'GET', lambda i: '/api/tasks?format=ndjson', heavy=True),
+        Scenario('GET /api/tasks/<id>', 'GET', lambda i: f'/api/tasks/{random_task_id(i)}'),
+        Scenario('GET /api/tasks/stats', 'GET', lambda i: '/api/tasks/stats?days=30'),
+        Scenario('GET /api/tasks/changes', 'GET', lambda i: '/api/tasks/changes', heavy=True),
+        Scenario('GET /api/tasks/export?format=csv', 'GET', lambda i: '/api/tasks/export?format=csv', heavy=True),
+
+        # Tasks: writes (rows created here are the ones deleted later)
+        Scenario('POST /api/tasks', 'POST', lambda i: '/api/tasks',
+                 body=lambda i: {'title': f'Bench {i}', 'category': 'Daily', 'date': today.isoformat(), 'priority': 1},
+                 after=keep_id(created_tasks)),
+        Scenario('PUT /api/tasks/<id>', 'PUT', lambda i: f'/api/tasks/{random_task_id(i)}',
+                 body=lambda i: {'priority': i % 4, 'notes': f'Updated {i}'}),
+        Scenario('PATCH /api/tasks/<id>/complete', 'PATCH', lambda i: f'/api/tasks/{random_task_id(i)}/complete'),
+        Scenario('GET /api/tasks/changes?since=', 'GET', lambda i: '/api/tasks/changes?since=1'),
+        Scenario('DELETE /api/tasks/<id>', 'DELETE', lambda i: f'/api/tasks/{created_tasks.pop()}'),
+        Scenario('POST /api/tasks/import (1000 rows)', 'POST', lambda i: '/api/tasks/import?format=csv',
+                 body=import_body, heavy=True),
+
+        # Recurring series and their occurrences (series created here are the ones deleted later)
+        Scenario('POST /api/tasks/series', 'POST', lambda i: '/api/tasks/series',
+                 body=lambda i: {'title': f'Bench series {i}', 'category': 'Daily',
+                                 'start_date': series_start.isoformat(), 'priority': 1},
+                 after=keep_id(created_series)),
+        Scenario('GET /api/tasks/series', 'GET', lambda i: '/api/tasks/series'),
+        Scenario('GET /api/tasks/occurrences (30 days)', 'GET',
+                 lambda i: f'/api/tasks/occurrences?from={today.isoformat()}&to={(today + timedelta(days=29)).isoformat()}'),
+        Scenario('PUT /api/tasks/series/<id>', 'PUT',
+                 lambda i: f'/api/tasks/series/{created_series[i % len(created_series)]}',
+                 body=lambda i: {'priority': i % 4, 'notes': f'Updated {i}'}),
+        Scenario('PUT /api/tasks/series/<id>/occurrences/<date>', 'PUT', occurrence_path(),
+                 body=lambda i: {'notes': f'Edited {i}'}),
+        Scenario('PATCH /api/tasks/series/<id>/occurrences/<date>/complete', 'PATCH', occurrence_path('/complete')),
+        Scenario('DELETE /api/tasks/series/<id>/occurrences/<date>', 'DELETE', occurrence_path()),
+        Scenario('DELETE /api/tasks/series/<id>', 'DELETE', lambda i: f'/api/tasks/series/{created_series.pop()}'),
+
+        # Projects: reads
+        Scenario('GET /api/projects', 'GET', lambda i: '/api/projects', heavy=True),
+        Scenario('GET /api/projects?status=paused', 'GET', lambda i: '/api/projects?status=paused', heavy=True),
+        Scenario('GET /api/projects/<id>', 'GET', lambda i: f'/api/projects/{random_project_id(i)}'),
+        Scenario('GET /api/projects/changes', 'GET', lambda i: '/api/projects/changes', heavy=True),
+
+        # Projects: writes
+        Scenario('POST /api/projects', 'POST', lambda i: '/api/projects',
+                 body=lambda i: {'name': f'Bench project {i}', 'status': 'active'},
+                 after=keep_id(created_projects)),
+        Scenario('PUT /api/projects/<id>', 'PUT', lambda i: f'/api/projects/{random_project_id(i)}',
+                 body=lambda i: {'progress': i % 101, 'next_step': f'Step {i}'}),
+        Scenario('POST /api/projects/<id>/tasks', 'POST',
+                 lambda i: f'/api/projects/{created_projects[i % len(created_projects)]}/tasks',
+                 body=lambda i: {'title': f'Bench step {i}', 'order': i}, after=keep_project_task),
+        Scenario('PATCH /api/projects/<id>/tasks/<id>', 'PATCH', first_project_task),
+        Scenario('GET /api/projects/changes?since=', 'GET', lambda i: '/api/projects/changes?since=1'),
+        Scenario('DELETE /api/projects/<id>/tasks/<id>', 'DELETE', pop_project_task),
+        Scenario('DELETE /api/projects/<id>', 'DELETE', lambda i: f'/api/projects/{created_projects.pop()}'),
+
+        # YouTube (fake upstream); playlists are served from the local mirror unless ?source=live
+        Scenario('GET /api/youtube/playlists', 'GET', lambda i: '/api/youtube/playlists'),
+        Scenario('GET /api/youtube/playlist/<id>/items', 'GET', lambda i: f'/api/youtube/playlist/PL{i % 20}/items'),
+        Scenario('GET /api/youtube/playlist/<id>/items?all=1', 'GET',
+                 lambda i: f'/api/youtube/playlist/PL{i % 20}/items?all=1', heavy=True),
+        Scenario('GET /api/youtube/playlists?source=live', 'GET', lambda i: '/api/youtube/playlists?source=live'),
+        Scenario('GET /api/youtube/playlist/<id>/items?source=live', 'GET',
+                 lambda i: f'/api/youtube/playlist/PL{i % 20}/items?source=live'),
+        Scenario('GET /api/youtube/playlist/<id>/items?all=1&source=live', 'GET',
+                 lambda i: f'/api/youtube/playlist/PL{i % 20}/items?all=1&source=live', heavy=True),
+        Scenario('GET /api/youtube/search', 'GET', lambda i: f'/api/youtube/search?q=bench+{i}'),
+        Scenario('GET /api/youtube/video/<id>', 'GET', lambda i: f'/api/youtube/video/vid{rng.randint(0, 10 ** 9)}'),
+        Scenario('GET /api/youtube/videos?ids= (50)', 'GET',
+                 lambda i: '/api/youtube/videos?ids=' + ','.join(f'vid{rng.randint(0, 10 ** 9)}' for _ in range(50))),
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--project-tasks', type=int, default=50, help='tasks per project')
+    parser.add_argument('--requests', type=int, default=100, help='requests per route')
+    parser.add_argument('--heavy-requests', type=int, default=3, help='requests per whole-table route')
+    parser.add_argument('--transports', default='test_client,http')
+    parser.add_argument('--profile', default='development', help='DATABASE_PROFILE to benchmark')
+    parser.add_argument('--youtube-cache', default='none', help='YOUTUBE_CACHE_BACKEND (none measures every upstream call)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench-results.json')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='dashboard-bench-')
+    google, endpoint = fake_google.start()
+
+    # app modules read their configuration at import time
+    os.environ.update({
+        'DATABASE_PATH': os.path.join(workdir, 'bench.db'),
+        'DATABASE_PROFILE': args.profile,
+        'SQL_ECHO': '0',
+        'YOUTUBE_CACHE_BACKEND': args.youtube_cache,
+        'YOUTUBE_API_ENDPOINT': endpoint,
+        'YOUTUBE_API_KEY': 'bench',
+        'EVENTS_PORT': '0'
+    })
+    from run import app
+    from app.database import db_session
+
+    volumes = {'tasks': args.tasks, 'projects': args.projects, 'projectTasks': args.project_tasks}
+    started = time.perf_counter()
+    seed.seed(db_session, args.tasks, args.projects, args.project_tasks, args.seed)
+    db_session.remove()
+    seed_seconds = round(time.perf_counter() - started, 2)
+    print(f'Seeded {args.tasks} tasks / {args.projects} projects in {seed_seconds}s')
+
+    credentials = {
+        'token': 'bench', 'refresh_token': None, 'token_uri': 'https://oauth2.googleapis.com/token',
+        'client_id': 'bench', 'client_secret': 'bench', 'scopes': ['https://www.googleapis.com/auth/youtube.readonly']
+    }
+    # Fill the playlist mirror up front, so the mirror routes are measured rather than the API fallback
+    from app.services import youtube_mirror
+    youtube_mirror.sync(credentials)
+    drivers = {'test_client': TestClientDriver, 'http': HTTPDriver}
+
+    results = {}
+    for transport in args.transports.split(','):
+        driver = drivers[transport](app, credentials)
+        results[transport] = {}
+        for scenario in build_scenarios(volumes, random.Random(args.seed)):
+            iterations = args.heavy_requests if scenario.heavy else args.requests
+            stats = run_scenario(driver, scenario, iterations)
+            results[transport][scenario.name] = stats
+            print(f"{transport:12} {scenario.name:50} {stats['throughputRps']:>9} req/s  "
+                  f"p50 {stats['p50Ms']:>9} ms  p99 {stats['p99Ms']:>9} ms  rss {stats['peakRssMb']} MB")
+        if hasattr(driver, 'close'):
+            driver.close()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'profile': args.profile,
+        'youtubeCache': args.youtube_cache,
+        'volumes': volumes,
+        'requests': args.requests,
+        'heavyRequests': args.heavy_requests,
+        'seedSeconds': seed_seconds,
+        'peakRssMb': peak_rss_mb(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    google.shutdown()
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Local stand-in for the YouTube Data API
+Serves playlists, playlistItems (paged), search and videos responses from a
+keep-alive HTTP server, so benchmarks measure our side of the call only.
+Point the app at it with YOUTUBE_API_ENDPOINT (or youtube_clients.API_ENDPOINT).
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import threading
+
+PLAYLIST_SIZE = 200  # items in every fake playlist
+
+
+def video_item(video_id):
+    return {
+        'id': video_id,
+        'snippet': {'title': f'Video {video_id}', 'channelTitle': 'Bench',
+                    'thumbnails': {'medium': {'url': f'https://i.ytimg.com/vi/{video_id}/mqdefault.jpg'}}},
+        'contentDetails': {'duration': 'PT3M30S'},
+        'statistics': {'viewCount': '1000', 'likeCount': '10'}
+    }
+
+
+def playlist_items(params):
+    start = int(params.get('pageToken', ['0'])[0])
+    end = min(PLAYLIST_SIZE, start + int(params.get('maxResults', ['50'])[0]))
+    body = {'items': [{
+        'snippet': {'title': f'Video v{i}', 'position': i,
+                    'thumbnails': {'medium': {'url': f'https://i.ytimg.com/vi/v{i}/mqdefault.jpg'}}},
+        'contentDetails': {'videoId': f'v{i}'}
+    } for i in range(start, end)]}
+    if end < PLAYLIST_SIZE:
+        body['nextPageToken'] = str(end)
+    return body
+
+
+def respond(path, params):
+    if path.endswith('/playlists'):
+        return {'items': [{
+            'id': f'PL{i}',
+            'snippet': {'title': f'Playlist {i}', 'description': '', 'thumbnails': {}},
+            'contentDetails': {'itemCount': PLAYLIST_SIZE}
+        } for i in range(20)]}
+    if path.endswith('/playlistItems'):
+        return playlist_items(params)
+    if path.endswith('/search'):
+        count = int(params.get('maxResults', ['10'])[0])
+        return {'items': [{
+            'id': {'videoId': f's{i}'},
+            'snippet': {'title': f'Result {i}', 'channelTitle': 'Bench', 'thumbnails': {}}
+        } for i in range(count)]}
+    if path.endswith('/videos'):
+        return {'items': [video_item(video_id) for video_id in params.get('id', [''])[0].split(',') if video_id]}
+    return None
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # avoid delayed-ACK stalls on reused connections
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        body = respond(url.path, parse_qs(url.query))
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        # Stable ETags so conditional requests can be answered with 304
+        etag = f'"{abs(hash(self.path))}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body['etag'] = etag
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start():
+    """Start the fake API in a background thread; returns (server, endpoint)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeYouTubeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/'
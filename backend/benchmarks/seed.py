@@ -0,0 +1,129 @@
+"""
+Synthetic data generator
+Fills a database with deterministic (seeded) tasks, projects and project
+tasks for benchmarking. Rows are inserted with chunked executemany through
+SQLAlchemy Core, then the task rollups and project counters are rebuilt.
+
+Usage (from backend/):
+    python -m benchmarks.seed /tmp/bench.db --tasks 1000000 --projects 10000 --project-tasks 50
+"""
+
+from datetime import date, datetime, time, timedelta
+import argparse
+import os
+import random
+
+CATEGORIES = ['Daily', 'Weekly', 'Monthly', None]
+TASK_STATUSES = ['pending', 'in-progress', 'completed']
+TASK_STATUS_WEIGHTS = [50, 15, 35]
+PROJECT_STATUSES = ['active', 'paused', 'completed']
+WORDS = ['review', 'draft', 'plan', 'call', 'fix', 'write', 'read', 'clean', 'ship', 'update',
+         'notes', 'budget', 'garden', 'report', 'design', 'backup', 'errands', 'workout']
+
+# Task dates are spread over a year either side of this day
+DATE_SPAN_DAYS = 365
+
+
+def _title(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+
+
+def task_records(rng, count, today):
+    for _ in range(count):
+        status = rng.choices(TASK_STATUSES, TASK_STATUS_WEIGHTS)[0]
+        day = today + timedelta(days=rng.randint(-DATE_SPAN_DAYS, DATE_SPAN_DAYS))
+        created = datetime.combine(day, time()) - timedelta(days=rng.randint(0, 30))
+        completed_at = None
+        if status == 'completed':
+            completed_at = datetime.combine(min(day, today), time(rng.randint(6, 22), rng.randint(0, 59)))
+        yield {
+            'title': _title(rng),
+            'category': rng.choice(CATEGORIES),
+            'status': status,
+            'date': day if rng.random() > 0.02 else None,
+            'time': time(rng.randint(6, 22), rng.choice((0, 15, 30, 45))) if rng.random() > 0.4 else None,
+            'priority': rng.randint(0, 3),
+            'notes': _title(rng) if rng.random() > 0.7 else None,
+            'created_at': created,
+            'completed_at': completed_at
+        }
+
+
+def project_records(rng, count, now):
+    for index in range(count):
+        yield {
+            'name': f'{_title(rng)} {index}',
+            'description': _title(rng),
+            'status': rng.choice(PROJECT_STATUSES),
+            'progress': rng.randint(0, 100),
+            'next_step': _title(rng),
+            'obsidian_link': f'obsidian://open?vault=bench&file=project-{index}' if rng.random() > 0.5 else None,
+            'is_main': index == 0,
+            'created_at': now - timedelta(days=rng.randint(0, 365)),
+            'updated_at': now - timedelta(days=rng.randint(0, 30))
+        }
+
+
+def _insert_chunked(session, table, records, chunk_size):
+    from sqlalchemy import insert
+
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            session.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(table), chunk)
+
+
+def seed(session, tasks=100000, projects=1000, project_tasks=50, random_seed=42, chunk_size=50000):
+    """Insert synthetic rows and rebuild the rollups; the caller's tables must be empty"""
+    from app.models.tasks import Task
+    from app.models.projects import Project, ProjectTask
+    from app.services import project_counters, task_rollups
+
+    rng = random.Random(random_seed)
+    today = date.today()
+    now = datetime.utcnow()
+
+    _insert_chunked(session, Task.__table__, task_records(rng, tasks, today), chunk_size)
+    _insert_chunked(session, Project.__table__, project_records(rng, projects, now), chunk_size)
+
+    project_ids = session.execute(Project.__table__.select().with_only_columns(Project.id)).scalars().all()
+    _insert_chunked(session, ProjectTask.__table__, (
+        {'project_id': project_id, 'title': _title(rng), 'completed': rng.random() < 0.4, 'order': order}
+        for project_id in project_ids
+        for order in range(project_tasks)
+    ), chunk_size)
+
+    task_rollups.rebuild(session)
+    project_counters.rebuild(session)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('database', help='SQLite file to create (must not exist)')
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--project-tasks', type=int, default=50, help='tasks per project')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f'{args.database} already exists')
+
+    # app.database reads its configuration at import time
+    os.environ['DATABASE_PATH'] = args.database
+    os.environ.setdefault('SQL_ECHO', '0')
+    from app.database import init_db, db_session
+
+    init_db()
+    seed(db_session, args.tasks, args.projects, args.project_tasks, args.seed)
+    print(f'Seeded {args.tasks} tasks, {args.projects} projects and '
+          f'{args.projects * args.project_tasks} project tasks into {args.database}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Serializer benchmark
+Times the old listing path (ORM objects -> to_dict() -> jsonify) against
+column tuples -> precompiled row serializers -> json_response, for tasks and
+projects with their tasks, with orjson and with the stdlib encoder. Every
+variant's bytes are checked against the old path before timing.
+
+Usage (from backend/):
+    python -m benchmarks.serializer_bench --tasks 100000 --projects 1000
+"""
+
+from datetime import datetime
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks import seed
+
+
+def best_of(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': round(min(samples), 2), 'median_ms': round(statistics.median(samples), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--project-tasks', type=int, default=50, help='tasks per project')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # app modules read their configuration at import time
+    os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='dashboard-bench-'), 'bench.db')
+    os.environ['SQL_ECHO'] = '0'
+    os.environ['SQL_METRICS'] = '0'
+    from flask import jsonify
+    from sqlalchemy import select
+    from run import app
+    from app.database import db_session, read_session
+    from app.models.tasks import Task
+    from app.models.projects import Project
+    from app.services import project_queries, serializers
+    from app.services.serializers import TASK, json_response
+
+    seed.seed(db_session, args.tasks, args.projects, args.project_tasks)
+    db_session.remove()
+
+    def old_tasks():
+        return jsonify([task.to_dict() for task in read_session.query(Task).all()]).get_data()
+
+    def new_tasks():
+        return json_response(TASK.fetch(read_session, select(*TASK.columns))).get_data()
+
+    def old_projects():
+        projects = read_session.query(Project).order_by(Project.id).all()
+        return jsonify([project.to_dict(include_tasks=True) for project in projects]).get_data()
+
+    def new_projects():
+        return json_response(project_queries.fetch_projects(read_session)).get_data()
+
+    def fresh(fn):
+        # Each run starts from an empty identity map, like a new request
+        def run():
+            read_session.remove()
+            return fn()
+        return run
+
+    orjson = serializers.orjson
+    results = {'volumes': {'tasks': args.tasks, 'projects': args.projects, 'projectTasks': args.project_tasks}}
+    with app.test_request_context():
+        for name, old, new in (('tasks', old_tasks, new_tasks), ('projects', old_projects, new_projects)):
+            expected = fresh(old)()
+            results[name] = {'bytes': len(expected), 'to_dict+jsonify': best_of(fresh(old), args.repeat)}
+            for backend in ('orjson', 'json'):
+                if backend == 'orjson' and orjson is None:
+                    continue
+                serializers.orjson = orjson if backend == 'orjson' else None
+                assert fresh(new)() == expected, f'{name}: {backend} output differs from jsonify'
+                results[name][f'tuples+{backend}'] = best_of(fresh(new), args.repeat)
+            serializers.orjson = orjson
+
+    results['timestamp'] = datetime.now().isoformat(timespec='seconds')
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
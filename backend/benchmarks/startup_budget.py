@@ -0,0 +1,131 @@
+"""
+Startup budget check
+Imports run.py (app creation, init_db and blueprint registration) in fresh
+interpreters with -X importtime and fails when startup exceeds the budget,
+when a module that should load lazily shows up, or when init_db() re-runs
+the schema checks although PRAGMA user_version already matches. The first run sets up
+the throwaway database schema; the best of the following runs is reported,
+together with the slowest top-level imports.
+
+Usage (from backend/):
+    python -m benchmarks.startup_budget [--budget-ms 1000] [--runs 3] [--json]
+
+Exits with status 1 on any failure. tests/test_startup_budget.py runs the
+same check as part of the test suite; there the wall-clock budget
+(STARTUP_BUDGET_MS) is a 'perf' test with a generous margin.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '1000'))
+
+SCHEMA_CHECK_MESSAGE = 'Database tables created successfully!'
+
+# run.py is imported from here, wherever the check is started from
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy stacks that must only load on first use of their routes
+LAZY_MODULES = ['googleapiclient', 'google_auth_oauthlib', 'google.oauth2', 'pandas']
+
+# Time the import in-process so interpreter start-up is left out
+PROBE = (
+    'import time; started = time.perf_counter(); import run; '
+    'print(round((time.perf_counter() - started) * 1000, 1))'
+)
+
+
+def parse_importtime(stderr):
+    """Return [(name, depth, self_us, cumulative_us)] from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # top-level imports are indented by one space
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def children_of(parent, modules):
+    """Direct imports of a top-level module (importtime lists them just before it)"""
+    names = [name for name, _, _, _ in modules]
+    children = []
+    for module in reversed(modules[:names.index(parent)]):
+        if module[1] == 0:
+            break
+        if module[1] == 1:
+            children.append(module)
+    return children
+
+
+def measure(env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    lines = result.stdout.strip().splitlines()
+    # init_db() only prints when it ran the schema checks instead of trusting user_version
+    schema_checked = any(SCHEMA_CHECK_MESSAGE in line for line in lines)
+    return float(lines[-1]), parse_importtime(result.stderr), schema_checked
+
+
+def check(budget_ms=STARTUP_BUDGET_MS, runs=3, top=10):
+    """Measure startup in fresh interpreters and return the report ('ok': within budget, lazy, schema checks skipped)"""
+    env = dict(os.environ)
+    env['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='dashboard-startup-'), 'startup.db')
+    env['SQL_ECHO'] = '0'
+
+    measure(env)  # creates and stamps the schema, like a first launch
+    timed = [measure(env) for _ in range(max(1, runs))]
+    startup_ms, modules, _ = min(timed, key=lambda run: run[0])
+
+    imported = {name for name, _, _, _ in modules}
+    eager = [name for name in LAZY_MODULES if name in imported]
+    schema_skipped = not any(schema_checked for _, _, schema_checked in timed)
+    slowest = sorted(children_of('run', modules), key=lambda module: -module[3])[:top]
+
+    return {
+        'startupMs': startup_ms,
+        'budgetMs': budget_ms,
+        'runsMs': [run[0] for run in timed],
+        'slowestImports': [{'module': name, 'cumulativeMs': round(cumulative / 1000, 1)}
+                           for name, _, _, cumulative in slowest],
+        'eagerlyImported': eager,
+        'schemaChecksSkipped': schema_skipped,
+        'ok': startup_ms <= budget_ms and not eager and schema_skipped
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to show')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    report = check(args.budget_ms, args.runs, args.top)
+    eager = report['eagerlyImported']
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Startup: {report['startupMs']}ms (budget {report['budgetMs']}ms, runs: {report['runsMs']})")
+        for item in report['slowestImports']:
+            print(f"  {item['cumulativeMs']:>8}ms  {item['module']}")
+        if eager:
+            print(f"Imported at startup but should load lazily: {', '.join(eager)}")
+        if not report['schemaChecksSkipped']:
+            print('init_db ran the schema checks although user_version matched')
+        print('OK' if report['ok'] else 'FAILED')
+
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+YouTube client micro-benchmark
+Compares the per-request cost of the old pattern (build() + fresh HTTP
+transport for every request) with a pooled client from app.services.youtube_clients.
+
+Both run a videos().list call against a local keep-alive HTTP server that
+stands in for Google, so the numbers are client overhead only.
+
+Usage (from backend/):
+    python -m benchmarks.youtube_client_bench --iterations 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from googleapiclient.discovery import build
+import httplib2
+
+from app.services import youtube_clients
+from benchmarks import fake_google
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean_ms': round(statistics.mean(samples), 3),
+        'p50_ms': round(statistics.median(samples), 3),
+        'p99_ms': round(sorted(samples)[int(len(samples) * 0.99) - 1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    server, endpoint = fake_google.start()
+    youtube_clients.API_ENDPOINT = endpoint
+
+    def per_request_build():
+        youtube = build('youtube', 'v3', developerKey='bench', http=httplib2.Http(),
+                        client_options={'api_endpoint': endpoint})
+        youtube.videos().list(part='snippet', id='bench').execute()
+
+    def pooled_client():
+        with youtube_clients.client(api_key='bench') as youtube:
+            youtube.videos().list(part='snippet', id='bench').execute()
+
+    results = {
+        'iterations': args.iterations,
+        'per_request_build': time_calls(per_request_build, args.iterations),
+        'pooled_client': time_calls(pooled_client, args.iterations),
+        'pool': youtube_clients.pool.stats()
+    }
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from flask import Flask, jsonify
+import click
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
@@ -15,9 +16,10 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['PERMANENT_SESSION_LIFETIME'] = 86400  # 24 hours in seconds
 
 # Enable CORS for Electron app
+CORS_ORIGINS = ["http://localhost:3000", "http://localhost:5173", "http://localhost:5174"]
 CORS(app, resources={
     r"/api/*": {
-        "origins": ["http://localhost:3000", "http://localhost:5173", "http://localhost:5174"],
+        "origins": CORS_ORIGINS,
         "supports_credentials": True
     }
 })
@@ -35,9 +37,73 @@ def cleanup(exception=None):
 from app.routes.youtube import youtube_bp
 from app.routes.tasks import tasks_bp
 from app.routes.projects import projects_bp
+from app.routes.batch import batch_bp
+from app.routes.calendar import calendar_bp
+from app.routes.health import health_bp
+from app.routes.search import search_bp
+from app.routes.jobs import jobs_bp
+from app.routes.events import events_bp
+from app.routes.metrics import metrics_bp
+from app.services import events, jobs, maintenance, metrics
+events.ALLOWED_ORIGINS = CORS_ORIGINS
 app.register_blueprint(youtube_bp, url_prefix='/api/youtube')
 app.register_blueprint(tasks_bp)
 app.register_blueprint(projects_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(calendar_bp)
+app.register_blueprint(health_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(metrics_bp)
+metrics.init_app(app)
+metrics.register_source('jobs', jobs.runner.stats)
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups():
+    """Recompute task stats rollups, project task counters and health rollups"""
+    maintenance.rebuild_rollups()
+    print("Task rollups, project counters and health rollups rebuilt successfully!")
+
+@app.cli.command('rebuild-search')
+def rebuild_search():
+    """Rebuild and optimize the full-text search indexes"""
+    from app.database import db_session
+    from app.services import search
+    search.rebuild(db_session)
+    db_session.commit()
+    print("Search indexes rebuilt successfully!")
+
+@app.cli.command('import-tasks')
+@click.argument('path')
+@click.option('--format', 'fmt', default=None, help='csv, jsonl or parquet (default: from extension)')
+@click.option('--chunk-size', default=10000, show_default=True)
+def import_tasks_command(path, fmt, chunk_size):
+    """Bulk import tasks from a CSV, JSON Lines or Parquet file"""
+    from app.database import db_session
+    from app.services import task_transfer
+    fmt = fmt or task_transfer.format_from_filename(path)
+    try:
+        result = task_transfer.import_tasks(db_session, path, fmt, chunk_size)
+    except task_transfer.ImportAborted as e:
+        raise click.ClickException(str(e))
+    print(f"Imported {result['imported']} tasks ({result['skipped']} skipped) "
+          f"in {result['seconds']}s - {result['rowsPerSecond']} rows/s")
+
+@app.cli.command('export-tasks')
+@click.argument('path')
+@click.option('--format', 'fmt', default=None, help='csv, jsonl or parquet (default: from extension)')
+@click.option('--chunk-size', default=10000, show_default=True)
+def export_tasks_command(path, fmt, chunk_size):
+    """Export all tasks to a CSV, JSON Lines or Parquet file"""
+    from app.database import read_session
+    from app.services import task_transfer
+    fmt = fmt or task_transfer.format_from_filename(path)
+    stats = {}
+    with open(path, 'wb') as f:
+        for chunk in task_transfer.export_chunks(read_session, fmt, chunk_size, stats):
+            f.write(chunk)
+    print(f"Exported {stats['exported']} tasks in {stats['seconds']}s - {stats['rowsPerSecond']} rows/s")
 
 @app.route('/')
 def index():
@@ -62,4 +128,7 @@ if __name__ == '__main__':
     print("🚀 Starting Dashboard Backend...")
     print("📍 Backend running on http://localhost:5000")
     print("✅ CORS enabled for frontend")
+    # The reloader's parent process only watches files; jobs run in the serving child
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        jobs.runner.start()
     app.run(debug=True, port=5000, host='127.0.0.1')
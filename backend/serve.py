@@ -0,0 +1,239 @@
+"""
+Production server
+Serves the app from a bounded pool of worker threads on werkzeug's WSGI server,
+instead of the single-threaded, auto-reloading development server in run.py.
+
+- Threads, not processes: the /api/events broker, the metrics and the
+  YouTube client pool live in process memory, and SQLite already takes
+  one writer at a time (DATABASE_PROFILE defaults to production here: WAL,
+  a pooled read-only engine sized to the thread count, and a single writer
+  connection).
+- Before the socket accepts traffic, the ORM mappers are configured, every
+  reader connection is opened, and the YouTube discovery document and clients
+  are built.
+- Connections idle for SERVE_IDLE_TIMEOUT seconds are closed. SQL statements
+  that run past a request's REQUEST_TIMEOUT budget are interrupted, so the
+  request fails instead of holding a worker. Streamed bodies and bulk imports
+  are not limited.
+- SIGTERM/SIGINT stop accepting new connections, wait up to SHUTDOWN_TIMEOUT
+  for in-flight requests, then close the database engines.
+- Worker counters (busy, queued, handled, timeouts) are reported under
+  'workers' in GET /api/metrics.
+- Background jobs and their schedules start with the server and get the
+  same SHUTDOWN_TIMEOUT to finish.
+
+Usage (from backend/):
+    python serve.py [--host 127.0.0.1] [--port 5000] [--threads 8]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import argparse
+import logging
+import os
+import signal
+import sqlite3
+import threading
+import time
+
+SERVE_HOST = os.getenv('SERVE_HOST', '127.0.0.1')
+SERVE_PORT = int(os.getenv('SERVE_PORT', '5000'))
+SERVE_THREADS = int(os.getenv('SERVE_THREADS', '8'))
+SERVE_IDLE_TIMEOUT = float(os.getenv('SERVE_IDLE_TIMEOUT', '10'))  # seconds a connection may sit idle
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '30'))  # SQL time budget per request, 0 = none
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', '30'))
+YOUTUBE_WARM_CLIENTS = int(os.getenv('YOUTUBE_WARM_CLIENTS', '2'))  # per API key, built at startup
+
+# SQLite calls the progress handler every this many VM instructions
+PROGRESS_INTERVAL = 10000
+
+# Bulk endpoints whose SQL time grows with the upload, exempt from REQUEST_TIMEOUT
+UNLIMITED_PATHS = ('/api/tasks/import', '/api/health/samples')
+
+_local = threading.local()
+
+
+class WorkerStats:
+    def __init__(self, threads):
+        self.threads = threads
+        self.started = time.time()
+        self.busy = 0
+        self.queued = 0
+        self.handled = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def change(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'threads': self.threads,
+                'busy': self.busy,
+                'queued': self.queued,
+                'handled': self.handled,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'uptimeSeconds': round(time.time() - self.started)
+            }
+
+
+class DeadlineMiddleware:
+    """Give each request a deadline that interrupt_overdue() enforces on SQL statements"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        limited = REQUEST_TIMEOUT and environ.get('PATH_INFO') not in UNLIMITED_PATHS
+        _local.deadline = time.monotonic() + REQUEST_TIMEOUT if limited else None
+        try:
+            return self.app(environ, start_response)
+        finally:
+            _local.deadline = None
+
+
+def install_deadline(engine, stats):
+    """Make the engine's connections abort statements that outlive the current request's deadline"""
+    from sqlalchemy import event
+
+    def interrupt_overdue():
+        deadline = getattr(_local, 'deadline', None)
+        if deadline is not None and time.monotonic() > deadline:
+            _local.deadline = None  # count a request once, let its error handling run
+            stats.change(timeouts=1)
+            return 1  # SQLite raises OperationalError('interrupted')
+        return 0
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            dbapi_connection.set_progress_handler(interrupt_overdue, PROGRESS_INTERVAL)
+
+
+def make_server(app, host, port, threads):
+    from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+    class RequestHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, bounded by the idle timeout below
+        timeout = SERVE_IDLE_TIMEOUT
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """Hands accepted connections to a fixed thread pool; accept() blocks while every slot is taken"""
+        multithread = True
+
+        def __init__(self):
+            self.stats = WorkerStats(threads)
+            self.executor = ThreadPoolExecutor(threads, thread_name_prefix='worker')
+            # A few connections may wait for a thread; beyond that they wait in the listen backlog
+            self.slots = threading.BoundedSemaphore(threads * 2)
+            super().__init__(host, port, DeadlineMiddleware(app), handler=RequestHandler)
+
+        def process_request(self, request, client_address):
+            self.slots.acquire()
+            self.stats.change(queued=1)
+            self.executor.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            self.stats.change(queued=-1, busy=1)
+            try:
+                self.finish_request(request, client_address)
+                self.stats.change(handled=1)
+            except Exception:
+                self.stats.change(errors=1)
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self.stats.change(busy=-1)
+                self.slots.release()
+
+        def wait_idle(self, timeout):
+            """Wait for in-flight connections to finish; returns False if some are still running"""
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if self.stats.busy == 0 and self.stats.queued == 0:
+                    return True
+                time.sleep(0.05)
+            return False
+
+    return PooledWSGIServer()
+
+
+def warm_up(threads):
+    """Do the first-request work up front: mappers, reader connections, YouTube clients"""
+    from sqlalchemy import text
+    from sqlalchemy.orm import configure_mappers
+    from app.database import read_engine
+    from app.services import youtube_clients
+
+    configure_mappers()
+
+    # Open every pooled reader connection (PRAGMAs and mmap set up) before traffic arrives
+    with ExitStack() as stack:
+        for _ in range(min(threads, read_engine.pool.size())):
+            stack.enter_context(read_engine.connect()).execute(text('SELECT 1'))
+
+    youtube_clients.discovery_document()
+    api_key = os.getenv('YOUTUBE_API_KEY')
+    if api_key and YOUTUBE_WARM_CLIENTS:
+        youtube_clients.pool.warm(YOUTUBE_WARM_CLIENTS, api_key=api_key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default=SERVE_HOST)
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    parser.add_argument('--threads', type=int, default=SERVE_THREADS)
+    args = parser.parse_args()
+
+    # app.database reads its configuration at import time
+    os.environ.setdefault('DATABASE_PROFILE', 'production')
+    os.environ.setdefault('DATABASE_READERS', str(args.threads))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    from run import app
+    from app.database import engine, read_engine
+    from app.services import jobs, metrics
+
+    server = make_server(app, args.host, args.port, args.threads)
+    metrics.register_source('workers', server.stats.to_dict)
+    for target in {engine, read_engine}:
+        install_deadline(target, server.stats)
+        target.dispose()  # connections opened at startup predate the progress handler
+
+    started = time.perf_counter()
+    warm_up(args.threads)
+    print(f"Warmed up in {time.perf_counter() - started:.2f}s")
+    jobs.runner.start()
+
+    def stop(signum, frame):
+        print("Shutting down: no longer accepting connections")
+        # shutdown() waits for serve_forever() to return, so it cannot run on this (the serving) thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    if hasattr(signal, 'SIGBREAK'):  # Ctrl+Break on Windows
+        signal.signal(signal.SIGBREAK, stop)
+
+    print(f"🚀 Dashboard Backend serving on http://{args.host}:{server.port} with {args.threads} worker threads")
+    server.serve_forever()
+    server.server_close()
+
+    if not server.wait_idle(SHUTDOWN_TIMEOUT):
+        print(f"{server.stats.busy} requests still running after {SHUTDOWN_TIMEOUT}s, exiting anyway")
+    server.executor.shutdown(wait=False, cancel_futures=True)
+    if not jobs.runner.shutdown(SHUTDOWN_TIMEOUT):
+        print("Background jobs still running, exiting anyway")
+    engine.dispose()
+    read_engine.dispose()
+    print("Stopped")
+
+
+if __name__ == '__main__':
+    main()
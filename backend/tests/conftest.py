@@ -0,0 +1,46 @@
+"""
+Test setup
+The app reads its configuration when first imported, so the environment is
+pointed at a throwaway database before anything from app/ or run.py loads.
+Every test starts from empty tables.
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='dashboard-tests-'), 'test.db')
+os.environ['DATABASE_PROFILE'] = 'development'
+os.environ['SQL_ECHO'] = '0'
+os.environ['EVENTS_PORT'] = '0'
+os.environ['YOUTUBE_CACHE_BACKEND'] = 'none'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app():
+    from run import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from app.database import Base, db_session, read_session
+    for table in reversed(Base.metadata.sorted_tables):
+        db_session.execute(table.delete())
+    db_session.commit()
+    db_session.remove()
+    read_session.remove()
+    yield app.test_client()
+    db_session.remove()
+    read_session.remove()
+
+
+@pytest.fixture
+def session(client):
+    from app.database import db_session
+    yield db_session
+    db_session.rollback()
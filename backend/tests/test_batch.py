@@ -0,0 +1,52 @@
+def batch(client, operations):
+    return client.post('/api/batch', json={'operations': operations})
+
+
+def test_references_resolve_to_ids_created_earlier_in_the_batch(client):
+    response = batch(client, [
+        {'op': 'create', 'entity': 'project', 'data': {'name': 'Move'}},
+        {'op': 'create', 'entity': 'project_task', 'project_id': '$0', 'data': {'title': 'Pack'}},
+        {'op': 'toggle', 'entity': 'project_task', 'project_id': '$0', 'id': '$1'}
+    ])
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    project_id = results[0]['result']['id']
+    assert results[1]['result']['project_id'] == project_id
+    assert results[2]['result']['completed'] is True
+
+
+def test_a_failing_operation_rolls_back_the_whole_batch(client):
+    response = batch(client, [
+        {'op': 'create', 'entity': 'task', 'data': {'title': 'Not kept'}},
+        {'op': 'create', 'entity': 'project', 'data': {'name': 'Not kept either'}},
+        {'op': 'update', 'entity': 'task', 'id': 999999, 'data': {'title': 'Missing'}}
+    ])
+    assert response.status_code == 404
+    assert response.get_json()['index'] == 2
+    assert client.get('/api/tasks').get_json() == []
+    assert client.get('/api/projects').get_json() == []
+
+
+def test_invalid_references_and_shapes_are_client_errors(client):
+    for operations in (
+        [{'op': 'delete', 'entity': 'task', 'id': '$5'}],
+        [['not', 'an', 'object']],
+        [{'op': 'create', 'entity': 'task', 'data': ['not', 'an', 'object']}],
+        [{'op': 'create', 'entity': 'widget'}],
+        [{'op': 'toggle', 'entity': 'task', 'id': 1}]
+    ):
+        response = batch(client, operations)
+        assert response.status_code == 400, operations
+        assert response.get_json()['index'] == 0
+
+
+def test_references_must_name_an_earlier_operation(client):
+    for ref in ('$-1', '$1', '$2', '$x', '$'):
+        response = batch(client, [
+            {'op': 'create', 'entity': 'task', 'data': {'title': 'Kept?'}},
+            {'op': 'delete', 'entity': 'task', 'id': ref}
+        ])
+        assert response.status_code == 400, ref
+        assert response.get_json()['index'] == 1
+        assert 'earlier operation' in response.get_json()['error']
+    assert client.get('/api/tasks').get_json() == []
@@ -0,0 +1,54 @@
+def changes(client, kind, since=None):
+    url = f'/api/{kind}/changes' + (f'?since={since}' if since is not None else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_project_delete_tombstones_its_tasks(client):
+    project = client.post('/api/projects', json={'name': 'Garden'}).get_json()
+    steps = [client.post(f"/api/projects/{project['id']}/tasks", json={'title': title}).get_json()
+             for title in ('Dig', 'Plant')]
+    snapshot = changes(client, 'projects')
+    assert [item['id'] for item in snapshot['projects']] == [project['id']]
+    assert sorted(item['id'] for item in snapshot['project_tasks']) == sorted(step['id'] for step in steps)
+
+    client.delete(f"/api/projects/{project['id']}")
+    delta = changes(client, 'projects', snapshot['version'])
+    assert delta['projects'] == [] and delta['project_tasks'] == []
+    assert delta['deleted'] == {'projects': [project['id']],
+                                'project_tasks': sorted(step['id'] for step in steps)}
+    assert delta['version'] > snapshot['version']
+
+    # Nothing new after the high-water mark
+    empty = changes(client, 'projects', delta['version'])
+    assert empty['projects'] == [] and empty['deleted'] == {'projects': [], 'project_tasks': []}
+
+
+def test_only_rows_written_after_since_are_returned(client):
+    first = client.post('/api/tasks', json={'title': 'First'}).get_json()
+    second = client.post('/api/tasks', json={'title': 'Second'}).get_json()
+    version = changes(client, 'tasks')['version']
+
+    client.put(f"/api/tasks/{first['id']}", json={'title': 'First, renamed'})
+    client.delete(f"/api/tasks/{second['id']}")
+    delta = changes(client, 'tasks', version)
+    assert [(task['id'], task['title']) for task in delta['tasks']] == [(first['id'], 'First, renamed')]
+    assert delta['deleted'] == [second['id']]
+
+
+def test_counter_updates_do_not_roll_back_the_project_version(client, session):
+    from app.models.projects import Project
+    from app.services import mutations
+    project = client.post('/api/projects', json={'name': 'Move'}).get_json()
+    step = client.post(f"/api/projects/{project['id']}/tasks", json={'title': 'Pack'}).get_json()
+
+    # An unflushed project edit followed by a counter update, committed together
+    mutations.update_project(session, project['id'], {'name': 'Move out'})
+    toggled = mutations.toggle_project_task(session, project['id'], step['id'])
+    session.commit()
+
+    stored = session.get(Project, project['id'])
+    assert stored.name == 'Move out'
+    assert stored.completed_count == 1
+    assert stored.version == toggled.version
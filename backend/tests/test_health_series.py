@@ -0,0 +1,64 @@
+def day_points(client, metric, start, end):
+    response = client.get(f'/api/health/{metric}?from={start}&to={end}&resolution=day')
+    assert response.status_code == 200
+    return {point['t'][:10]: (point['count'], point['sum'], point['min'], point['max'])
+            for point in response.get_json()['points']}
+
+
+def append(client, samples):
+    response = client.post('/api/health/samples', json={'samples': samples})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_rollups_follow_appends_replacements_and_deletes(client):
+    append(client, [
+        {'metric': 'water', 'timestamp': '2024-03-01T08:00:00', 'value': 1},
+        {'metric': 'water', 'timestamp': '2024-03-01T20:00:00', 'value': 2},
+        {'metric': 'water', 'timestamp': '2024-03-02T09:00:00', 'value': 4}
+    ])
+    assert day_points(client, 'water', '2024-03-01', '2024-03-02') == {
+        '2024-03-01': (2, 3.0, 1.0, 2.0), '2024-03-02': (1, 4.0, 4.0, 4.0)
+    }
+
+    # A reading at an existing timestamp replaces it
+    append(client, [{'metric': 'water', 'timestamp': '2024-03-01T20:00:00', 'value': 5}])
+    assert day_points(client, 'water', '2024-03-01', '2024-03-01') == {'2024-03-01': (2, 6.0, 1.0, 5.0)}
+
+    response = client.delete('/api/health/water/samples?from=2024-03-02&to=2024-03-02')
+    assert response.get_json() == {'deleted': 1}
+    assert day_points(client, 'water', '2024-03-01', '2024-03-02') == {'2024-03-01': (2, 6.0, 1.0, 5.0)}
+
+
+def test_week_rollup_matches_raw_samples(client):
+    samples = [{'metric': 'steps', 'timestamp': f'2024-01-{day:02d}T{hour:02d}:00:00', 'value': day * hour}
+               for day in range(1, 29) for hour in (7, 12, 19)]
+    append(client, samples)
+    response = client.get('/api/health/steps?from=2024-01-01&to=2024-01-28&resolution=week').get_json()
+    assert response['source'] == 'week'
+    assert sum(point['count'] for point in response['points']) == len(samples)
+    assert sum(point['sum'] for point in response['points']) == sum(sample['value'] for sample in samples)
+
+
+def test_metric_changes_invalidate_the_metrics_etag(client):
+    etag = client.get('/api/health/metrics').headers['ETag']
+    client.post('/api/health/metrics', json={'name': 'weight', 'unit': 'kg'})
+    response = client.get('/api/health/metrics', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [metric['unit'] for metric in response.get_json()] == ['kg']
+
+
+def test_ranges_accept_epoch_seconds(client):
+    append(client, [
+        {'metric': 'water', 'timestamp': 1700000000, 'value': 1},  # 2023-11-14T22:13:20
+        {'metric': 'water', 'timestamp': '1700003600', 'value': 2},
+        {'metric': 'water', 'timestamp': 1700090000, 'value': 4}
+    ])
+    response = client.get('/api/health/water?from=1700000000&to=1700086400&resolution=raw')
+    assert response.status_code == 200
+    # A 10-digit epoch ?to= is an instant, not a date-only value widened to the whole day
+    assert [point['value'] for point in response.get_json()['points']] == [1.0, 2.0]
+    assert response.get_json()['to'] == '2023-11-15T22:13:20'
+
+    response = client.get('/api/health/water?from=2023-11-14&to=1700003600&resolution=raw')
+    assert [point['value'] for point in response.get_json()['points']] == [1.0]
@@ -0,0 +1,23 @@
+import threading
+import time
+from app.services.jobs import JobRunner
+
+
+def test_jobs_queued_at_shutdown_end_cancelled():
+    release = threading.Event()
+    runner = JobRunner(workers=1)
+    runner.register('wait', lambda: release.wait(5))
+    runner.register('noop', lambda number: number)
+
+    running = runner.submit('wait')
+    while running.status == 'queued':
+        time.sleep(0.01)
+    queued = [runner.submit('noop', {'number': number}) for number in range(3)]
+    threading.Timer(0.2, release.set).start()
+    assert runner.shutdown(timeout=5)
+
+    assert running.status == 'completed'
+    assert [job.status for job in queued] == ['cancelled'] * 3
+    assert all(job.finished_at for job in queued)
+    assert runner.stats()['queued'] == 0 and runner.stats()['cancelled'] == 3
+    assert runner.list(status='queued') == []
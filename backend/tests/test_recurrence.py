@@ -0,0 +1,93 @@
+from datetime import date
+from types import SimpleNamespace
+from app.services import recurrence
+
+
+def series(category, start, **rule):
+    fields = {'id': 1, 'interval': 1, 'weekdays': None, 'month_day': None, 'end_date': None}
+    fields.update(rule)
+    return SimpleNamespace(category=category, start_date=start, **fields)
+
+
+def expand(rule, start, end):
+    return [day.isoformat() for day in recurrence.occurrences(rule, start, end)]
+
+
+def test_monthly_on_the_31st_clamps_to_short_months():
+    rule = series('Monthly', date(2024, 1, 31))
+    assert expand(rule, date(2024, 1, 1), date(2024, 5, 31)) == [
+        '2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30', '2024-05-31'
+    ]
+    assert expand(rule, date(2023, 2, 1), date(2023, 2, 28)) == []  # before the series started
+
+
+def test_monthly_last_day_and_counting_back_from_it():
+    last = series('Monthly', date(2023, 1, 1), month_day=-1)
+    assert expand(last, date(2023, 1, 1), date(2023, 3, 31)) == ['2023-01-31', '2023-02-28', '2023-03-31']
+    week_before = series('Monthly', date(2023, 1, 1), month_day=-8)
+    assert expand(week_before, date(2023, 2, 1), date(2023, 2, 28)) == ['2023-02-21']
+
+
+def test_monthly_interval_counts_from_the_start_month():
+    rule = series('Monthly', date(2024, 1, 15), interval=3)
+    assert expand(rule, date(2024, 3, 1), date(2025, 1, 31)) == [
+        '2024-04-15', '2024-07-15', '2024-10-15', '2025-01-15'
+    ]
+
+
+def test_weekly_on_chosen_weekdays():
+    # Monday 2024-01-01; Monday, Wednesday and Sunday
+    rule = series('Weekly', date(2024, 1, 1), weekdays=recurrence.weekday_mask([0, 2, 6]))
+    assert expand(rule, date(2024, 1, 1), date(2024, 1, 14)) == [
+        '2024-01-01', '2024-01-03', '2024-01-07', '2024-01-08', '2024-01-10', '2024-01-14'
+    ]
+
+
+def test_weekly_defaults_to_the_start_weekday_and_respects_the_interval():
+    rule = series('Weekly', date(2024, 1, 3), interval=2)  # a Wednesday, every other week
+    assert expand(rule, date(2024, 1, 1), date(2024, 2, 5)) == ['2024-01-03', '2024-01-17', '2024-01-31']
+    # Starting mid-range far from the series start lands on the same cadence
+    assert expand(rule, date(2030, 1, 1), date(2030, 1, 31)) == [
+        day for day in expand(rule, date(2024, 1, 1), date(2030, 1, 31)) if day >= '2030-01-01'
+    ]
+
+
+def test_daily_interval_and_end_date():
+    rule = series('Daily', date(2024, 2, 27), interval=2, end_date=date(2024, 3, 4))
+    assert expand(rule, date(2024, 1, 1), date(2024, 12, 31)) == [
+        '2024-02-27', '2024-02-29', '2024-03-02', '2024-03-04'
+    ]
+    assert recurrence.is_occurrence(rule, date(2024, 3, 2))
+    assert not recurrence.is_occurrence(rule, date(2024, 3, 3))
+
+
+def changes(client, since=None):
+    response = client.get('/api/tasks/changes' + (f'?since={since}' if since is not None else ''))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_series_writes_and_deletes_are_synced(client):
+    series = client.post('/api/tasks/series', json={
+        'title': 'Stretch', 'category': 'Daily', 'start_date': '2024-01-01'
+    }).get_json()
+    version = changes(client)['version']
+
+    client.delete(f"/api/tasks/series/{series['id']}/occurrences/2024-01-02")
+    delta = changes(client, version)
+    assert [item['skipped_dates'] for item in delta['series']] == [['2024-01-02']]
+
+    client.delete(f"/api/tasks/series/{series['id']}")
+    delta = changes(client, delta['version'])
+    assert delta['series'] == [] and delta['deleted_series'] == [series['id']]
+
+
+def test_deleted_occurrence_stays_deleted(client):
+    series = client.post('/api/tasks/series', json={
+        'title': 'Stretch', 'category': 'Daily', 'start_date': '2024-01-01'
+    }).get_json()
+    task = client.patch(f"/api/tasks/series/{series['id']}/occurrences/2024-01-02/complete").get_json()
+    client.delete(f"/api/tasks/{task['id']}")
+
+    occurrences = client.get('/api/tasks/occurrences?from=2024-01-01&to=2024-01-03').get_json()
+    assert [item['occurrence_date'] for item in occurrences] == ['2024-01-01', '2024-01-03']
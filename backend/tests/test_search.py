@@ -0,0 +1,34 @@
+def search(client, query, kinds=None):
+    url = f'/api/search?q={query}' + (f'&type={kinds}' if kinds else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return [(hit['type'], hit['id']) for hit in response.get_json()['results']]
+
+
+def test_index_follows_inserts_updates_and_deletes(client):
+    task = client.post('/api/tasks', json={'title': 'Buy coffee beans', 'notes': 'the dark roast'}).get_json()
+    project = client.post('/api/projects', json={'name': 'Coffee corner'}).get_json()
+
+    assert sorted(search(client, 'coffee')) == sorted([('task', task['id']), ('project', project['id'])])
+    assert search(client, 'roast', 'task') == [('task', task['id'])]
+    assert search(client, 'bea') == [('task', task['id'])]  # the last word matches as a prefix
+
+    client.put(f"/api/tasks/{task['id']}", json={'title': 'Buy tea'})
+    assert search(client, 'coffee') == [('project', project['id'])]
+
+    client.delete(f"/api/projects/{project['id']}")
+    assert search(client, 'coffee') == []
+
+
+def test_query_syntax_is_searched_literally(client):
+    task = client.post('/api/tasks', json={'title': 'Plan trip'}).get_json()
+    assert search(client, 'trip "') == [('task', task['id'])]
+    assert search(client, 'trip OR plan') == []  # OR is a word to match, not an operator
+    assert client.get('/api/search?q=NEAR(a b) AND -x*').status_code == 200
+    assert client.get('/api/search?q=x&type=widget').status_code == 400
+
+
+def test_snippets_escape_the_stored_text(client):
+    client.post('/api/tasks', json={'title': '<img src=x onerror=alert(1)> coffee & cake'})
+    [hit] = client.get('/api/search?q=coffee').get_json()['results']
+    assert hit['snippet'] == '&lt;img src=x onerror=alert(1)&gt; <mark>coffee</mark> &amp; cake'
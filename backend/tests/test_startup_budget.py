@@ -0,0 +1,27 @@
+import pytest
+from benchmarks import startup_budget
+
+# Wall-clock timing on a shared machine is noisy; the perf check only fails
+# well past the budget, and can be deselected with -m "not perf"
+PERF_MARGIN = 3
+
+
+@pytest.fixture(scope='module')
+def report():
+    return startup_budget.check(runs=2)
+
+
+def test_heavy_stacks_are_not_imported_at_startup(report):
+    assert report['eagerlyImported'] == [], f"imported at startup: {report['eagerlyImported']}"
+
+
+def test_init_db_skips_schema_checks_when_user_version_matches(report):
+    assert report['schemaChecksSkipped']
+
+
+@pytest.mark.perf
+def test_startup_time_is_within_budget(report):
+    assert report['startupMs'] <= report['budgetMs'] * PERF_MARGIN, (
+        f"startup took {report['startupMs']}ms (budget {report['budgetMs']}ms); slowest imports: "
+        + ', '.join(f"{item['module']} {item['cumulativeMs']}ms" for item in report['slowestImports'])
+    )
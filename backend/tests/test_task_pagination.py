@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def tasks(client):
+    """Ten tasks sharing three dates (so pages break inside a date) plus two undated ones"""
+    ids = []
+    for i in range(10):
+        ids.append(client.post('/api/tasks', json={'title': f'Task {i}', 'date': f'2024-01-0{i % 3 + 1}'}).get_json()['id'])
+    for i in range(2):
+        ids.append(client.post('/api/tasks', json={'title': f'Undated {i}'}).get_json()['id'])
+    return ids
+
+
+def walk(client, limit):
+    seen, cursor = [], None
+    while True:
+        url = f'/api/tasks?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        assert len(page['tasks']) <= limit
+        seen += page['tasks']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 5, 12, 50])
+def test_cursor_walk_returns_every_task_once_in_order(client, tasks, limit):
+    seen = walk(client, limit)
+    assert sorted(task['id'] for task in seen) == sorted(tasks)
+
+    # (date, id) order with undated tasks first; ties on date are broken by id
+    keys = [(task['date'] or '', task['id']) for task in seen]
+    assert keys == sorted(keys)
+
+
+def test_rows_inserted_behind_the_cursor_are_not_repeated(client, tasks):
+    first = client.get('/api/tasks?limit=4').get_json()
+    client.post('/api/tasks', json={'title': 'Late', 'date': '2023-12-31'})
+    rest = walk_from(client, first['next_cursor'])
+    ids = [task['id'] for task in first['tasks'] + rest]
+    assert len(ids) == len(set(ids)) == len(tasks)
+
+
+def walk_from(client, cursor):
+    seen = []
+    while cursor:
+        page = client.get(f'/api/tasks?limit=4&cursor={cursor}').get_json()
+        seen += page['tasks']
+        cursor = page['next_cursor']
+    return seen
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/api/tasks?limit=5&cursor=not-a-cursor').status_code == 400
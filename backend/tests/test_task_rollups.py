@@ -0,0 +1,56 @@
+from app.services import task_rollups
+
+
+def status_counts(client):
+    stats = client.get('/api/tasks/stats?days=1').get_json()
+    return {'completed': stats['completed'], 'pending': stats['pending'], 'inProgress': stats['inProgress'],
+            'total': stats['totalTasks']}
+
+
+def rebuilt_counts(session):
+    """What the rollups should hold, recomputed from the tasks table"""
+    task_rollups.rebuild(session)
+    counts = task_rollups.get_status_counts(session)
+    session.rollback()
+    return counts
+
+
+def test_create_complete_update_delete_keep_counts_in_step(client, session):
+    ids = [client.post('/api/tasks', json={'title': f'Task {i}'}).get_json()['id'] for i in range(4)]
+    assert status_counts(client) == {'completed': 0, 'pending': 4, 'inProgress': 0, 'total': 4}
+
+    client.patch(f'/api/tasks/{ids[0]}/complete')
+    client.put(f'/api/tasks/{ids[1]}', json={'status': 'in-progress'})
+    assert status_counts(client) == {'completed': 1, 'pending': 2, 'inProgress': 1, 'total': 4}
+
+    # Moving a task between statuses and deleting one move its contribution, not add to it
+    client.put(f'/api/tasks/{ids[1]}', json={'status': 'pending'})
+    client.delete(f'/api/tasks/{ids[0]}')
+    client.delete(f'/api/tasks/{ids[2]}')
+    assert status_counts(client) == {'completed': 0, 'pending': 2, 'inProgress': 0, 'total': 2}
+
+    assert task_rollups.get_status_counts(session) == rebuilt_counts(session)
+
+
+def test_completions_are_counted_per_day(client):
+    ids = [client.post('/api/tasks', json={'title': f'Task {i}'}).get_json()['id'] for i in range(3)]
+    for task_id in ids[:2]:
+        client.patch(f'/api/tasks/{task_id}/complete')
+
+    today = client.get('/api/tasks/stats?days=1').get_json()['weeklyCompletion']
+    assert [day['completed'] for day in today] == [2]
+
+    client.delete(f'/api/tasks/{ids[0]}')
+    today = client.get('/api/tasks/stats?days=1').get_json()['weeklyCompletion']
+    assert [day['completed'] for day in today] == [1]
+
+
+def test_failed_batch_leaves_counts_untouched(client, session):
+    client.post('/api/tasks', json={'title': 'Kept'})
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'create', 'entity': 'task', 'data': {'title': 'Rolled back'}},
+        {'op': 'complete', 'entity': 'task', 'id': 999999}
+    ]})
+    assert response.status_code == 404
+    assert status_counts(client)['total'] == 1
+    assert task_rollups.get_status_counts(session) == rebuilt_counts(session)
@@ -0,0 +1,30 @@
+import io
+import pytest
+
+
+def test_times_round_trip_through_export_and_import(client, session):
+    from app.models.tasks import Task
+    from app.services import task_transfer
+    source = io.BytesIO(b'title,time\nStretch,07:15:00\nStandup,09:30:00.250000\nNap,14:05\n')
+    assert task_transfer.import_tasks(session, source, 'csv')['imported'] == 3
+
+    exported = client.get('/api/tasks/export?format=csv').get_data()
+    session.query(Task).delete()
+    session.commit()
+    task_transfer.import_tasks(session, io.BytesIO(exported), 'csv')
+    assert [(task.title, task.time.isoformat()) for task in session.query(Task).order_by(Task.id)] == [
+        ('Stretch', '07:15:00'), ('Standup', '09:30:00.250000'), ('Nap', '14:05:00')
+    ]
+
+
+def test_a_failed_import_reports_the_rows_already_committed(client, session):
+    from app.models.tasks import Task
+    from app.services import task_transfer
+    source = io.BytesIO(b'title,notes\nOne,a\nTwo,b\nThree,c\nFour,d,too,many,fields\n')
+    with pytest.raises(task_transfer.ImportAborted) as aborted:
+        task_transfer.import_tasks(session, source, 'csv', chunk_size=2)
+    assert aborted.value.stats['imported'] == 2
+    assert [task.title for task in session.query(Task).order_by(Task.id)] == ['One', 'Two']
+    response = client.post('/api/tasks/import?format=csv', data=b'title\nFive\nSix,extra\n')
+    assert response.status_code == 400
+    assert response.get_json()['imported'] == 0
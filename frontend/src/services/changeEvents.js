@@ -0,0 +1,43 @@
+/**
+ * Change Events Service
+ * Subscribes to the backend's task/project change feed (Server-Sent Events)
+ */
+
+const API_URL = 'http://localhost:5000'
+
+/**
+ * Open the change feed and call onChange({ entity, id, op, version }) for every write.
+ * onReset is called when the server dropped the connection for falling behind;
+ * the caller should refetch (or use the /changes endpoints) before relying on events again.
+ * Returns a function that closes the feed.
+ */
+export const subscribeToChanges = (onChange, onReset) => {
+  let source = null
+  let closed = false
+
+  const open = async () => {
+    try {
+      // The stream lives on its own port: connect to it directly, since a
+      // cross-origin redirect would strip our Origin and fail CORS
+      const response = await fetch(`${API_URL}/api/events/stream`, { credentials: 'include' })
+      const { url } = await response.json()
+      if (closed) return
+
+      source = new EventSource(url, { withCredentials: true })
+      source.addEventListener('change', (event) => onChange(JSON.parse(event.data)))
+      source.addEventListener('reset', () => {
+        source.close()
+        if (onReset) onReset()
+        if (!closed) open()
+      })
+    } catch (error) {
+      console.error('Error opening change feed:', error)
+    }
+  }
+
+  open()
+  return () => {
+    closed = true
+    if (source) source.close()
+  }
+}